@@ -5,7 +5,9 @@ Suporta múltiplos providers: Ollama (local), OpenAI, Groq
 """
 import os
 import json
+import threading
 from datetime import datetime
+from conversation_journal import ConversationJournal
 
 
 class AIAssistant:
@@ -13,7 +15,7 @@ class AIAssistant:
     Assistente de IA que processa comandos de voz e gera respostas inteligentes
     """
 
-    def __init__(self, provider="ollama", model=None, api_key=None):
+    def __init__(self, provider="ollama", model=None, api_key=None, lazy_client=False):
         """
         Inicializa o assistente de IA.
 
@@ -21,11 +23,17 @@ class AIAssistant:
             provider (str): "ollama", "openai", ou "groq"
             model (str): Nome do modelo (opcional, usa padrão do provider)
             api_key (str): Chave de API (necessário para OpenAI/Groq)
+            lazy_client (bool): Adiar a importação/criação do cliente até
+                `ensure_client()` ou a primeira mensagem (boot rápido)
         """
         self.provider = provider.lower()
         self.api_key = api_key or os.getenv(f"{provider.upper()}_API_KEY")
         self.client = None
+        self.client_initialized = False
+        self._client_lock = threading.Lock()
         self.conversation_history = []
+        self.journal = None         # Diário JSONL (ver `open_journal`)
+        self.context_window = None  # Mensagens mantidas em memória com diário aberto
 
         # Modelos padrão por provider
         self.default_models = {
@@ -42,7 +50,22 @@ Responda em português brasileiro de forma concisa e clara.
 Se não souber algo, admita honestamente.
 Mantenha respostas curtas (máximo 2-3 frases) para facilitar a leitura."""
 
-        self._initialize_client()
+        if not lazy_client:
+            self.ensure_client()
+
+    def ensure_client(self):
+        """
+        Inicializa o cliente do provider uma única vez (seguro entre threads).
+
+        Returns:
+            bool: True se o cliente está disponível
+        """
+        if not self.client_initialized:
+            with self._client_lock:
+                if not self.client_initialized:
+                    self._initialize_client()
+                    self.client_initialized = True
+        return self.client is not None
 
     def _initialize_client(self):
         """Inicializa o cliente do provider escolhido"""
@@ -87,6 +110,22 @@ Mantenha respostas curtas (máximo 2-3 frases) para facilitar a leitura."""
             print(f"[ERRO] Provider '{self.provider}' não suportado")
             self.client = None
 
+    def prewarm(self, keep_alive="10m"):
+        """
+        Deixa o modelo pronto para a próxima mensagem: cria o cliente e, no
+        Ollama, carrega o modelo na memória (prompt vazio não gera texto).
+
+        Args:
+            keep_alive (str): Quanto tempo o Ollama mantém o modelo carregado
+        """
+        if not self.ensure_client():
+            return
+        if self.provider == "ollama":
+            try:
+                self.client.generate(model=self.model, prompt="", keep_alive=keep_alive)
+            except Exception as e:
+                print(f"[IA] Falha ao pré-carregar o modelo: {e}")
+
     def chat(self, user_message):
         """
         Envia uma mensagem para a IA e recebe resposta.
@@ -97,23 +136,17 @@ Mantenha respostas curtas (máximo 2-3 frases) para facilitar a leitura."""
         Returns:
             str: Resposta da IA
         """
-        if not self.client:
+        if not self.ensure_client():
             return "IA não disponível. Verifique a configuração."
 
         # Adicionar mensagem do usuário ao histórico
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
+        self._add_message("user", user_message)
 
         try:
             response = self._get_response()
 
             # Adicionar resposta ao histórico
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": response
-            })
+            self._add_message("assistant", response)
 
             return response
 
@@ -122,6 +155,16 @@ Mantenha respostas curtas (máximo 2-3 frases) para facilitar a leitura."""
             print(f"[ERRO] {error_msg}")
             return "Desculpe, ocorreu um erro ao processar sua mensagem."
 
+    def _add_message(self, role, content):
+        """Acrescenta ao histórico (e ao diário, uma linha por mensagem)"""
+        self.conversation_history.append({"role": role, "content": content})
+        if self.journal is not None:
+            self.journal.append(role, content)
+            # O arquivo guarda a conversa (inteira, salvo limite de retenção):
+            # em memória só a janela de contexto
+            if len(self.conversation_history) > self.context_window:
+                del self.conversation_history[:-self.context_window]
+
     def _get_response(self):
         """Obtém resposta do provider específico"""
         messages = [
@@ -149,6 +192,8 @@ Mantenha respostas curtas (máximo 2-3 frases) para facilitar a leitura."""
     def reset_conversation(self):
         """Limpa o histórico de conversa"""
         self.conversation_history = []
+        if self.journal is not None:
+            self.journal.reset()
         print("[IA] Histórico de conversa limpo")
 
     def get_conversation_summary(self):
@@ -160,8 +205,38 @@ Mantenha respostas curtas (máximo 2-3 frases) para facilitar a leitura."""
             "history": self.conversation_history
         }
 
+    def open_journal(self, filepath="conversation_history.jsonl", context_window=20,
+                     max_messages=None):
+        """
+        Persiste a conversa em um diário JSONL: cada mensagem é acrescentada
+        ao arquivo na hora (custo constante por turno) e, ao abrir, só as
+        últimas `context_window` mensagens são lidas.
+
+        Args:
+            filepath (str): Arquivo do diário (criado se não existir)
+            context_window (int): Mensagens mantidas em memória e enviadas à IA
+            max_messages (int): Limite de retenção do arquivo (None guarda a
+                conversa inteira; com limite, o arquivo é compactado de tempos
+                em tempos e perde o que veio antes do último reset)
+        """
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = ConversationJournal(filepath, header={"provider": self.provider,
+                                                             "model": self.model},
+                                           max_messages=max_messages)
+        self.context_window = context_window
+        self.conversation_history = self.journal.load_recent(context_window)
+        print(f"[IA] Diário da conversa: {self.journal.path} "
+              f"({len(self.conversation_history)} mensagens restauradas)")
+
+    def close_journal(self):
+        """Fecha o diário (as mensagens já estão gravadas)"""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
     def save_conversation(self, filepath="conversation_history.json"):
-        """Salva histórico de conversa em arquivo JSON"""
+        """Salva histórico de conversa em arquivo JSON (reescreve o arquivo todo)"""
         data = {
             "timestamp": datetime.now().isoformat(),
             "provider": self.provider,
@@ -3,11 +3,17 @@
 Assistente Virtual Controlado por Gestos
 Integra detecção de mãos, reconhecimento de gestos e reconhecimento de voz
 """
+from startup import BootSequence
 import cv2
-import mediapipe as mp
-from gesture_recognition import GestureRecognizer, get_action_from_gesture
+from gesture_recognition import GestureRecognizer, get_action_from_gesture, gesture_events, ACTION_COMMANDS
 from voice_recognition import VoiceRecorder
+from frame_source import CameraSource
+from hand_detector import BACKENDS, create_hand_detector
+from landmark_filter import LandmarkFilter
+from dynamic_gestures import DynamicGestureRecognizer
+from metrics import tracer, draw_metrics_overlay
 import threading
+import signal
 import time
 
 
@@ -16,22 +22,65 @@ class AssistenteGestos:
     Assistente virtual que responde a gestos das mãos
     """
 
-    def __init__(self):
-        """Inicializa o assistente"""
-        # MediaPipe para detecção de mãos
-        self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
+    def __init__(self, headless=False, frame_buffer_name=None, source=None,
+                 landmark_recorder=None, show_metrics=False, hand_detection=True,
+                 transcription_service=False, preroll_seconds=None, gesture_model=None,
+                 finger_mode="position", smoothing=False, detect_every=1,
+                 dynamic_gestures=False, inference_width=None, hand_backend="solutions",
+                 model_complexity=1, whisper_model="base"):
+        """
+        Inicializa o assistente.
+
+        Args:
+            headless (bool): Rodar sem janela (servidores sem display)
+            frame_buffer_name (str): Nome da memória compartilhada onde os
+                frames anotados são publicados (None desativa a publicação)
+            source (FrameSource): Fonte de frames (None usa a webcam 0 em 1280x720)
+            landmark_recorder (LandmarkRecorder): Grava os landmarks de cada frame (opcional)
+            show_metrics (bool): Mostrar latências por etapa sobre o vídeo
+            hand_detection (bool): Criar o detector MediaPipe local; False quando
+                as mãos são detectadas fora daqui (ex.: pool do multi_stream)
+            transcription_service (bool): Transcrever em um processo Whisper separado
+            preroll_seconds (float): Manter o microfone aberto e incluir estes
+                segundos anteriores ao gesto na gravação (None grava só após o gesto)
+            gesture_model (str): Modelo do classificador de gestos (.npz) no
+                lugar das regras por contagem de dedos (opcional)
+            finger_mode (str): "position" ou "angles" (dedos pelos ângulos das
+                articulações, robusto a mão inclinada ou girada)
+            smoothing (bool): Suavizar os landmarks (filtro One-Euro)
+            detect_every (int): Rodar o detector a cada N frames; nos demais os
+                landmarks são previstos pelo filtro (implica `smoothing`)
+            dynamic_gestures (bool): Reconhecer deslizar/círculos (próxima
+                faixa, volume) além das poses
+            inference_width (int): Largura da cópia reduzida entregue ao
+                MediaPipe (ex.: 320); o vídeo continua na resolução da câmera
+            hand_backend (str): "solutions" (síncrono) ou "tasks" (HandLandmarker
+                em LIVE_STREAM: o loop não espera a inferência)
+            model_complexity (int): Modelo de mãos 0 (leve) ou 1 (completo)
+            whisper_model (str): Modelo Whisper ("tiny", "base", "small"...)
+        """
+        # Subsistemas pesados são inicializados em paralelo, em segundo plano
+        self.boot = BootSequence()
+
+        # Detector de mãos (MediaPipe, criado no boot)
+        self.hand_detector = None
+        self.inference_width = inference_width
+        self.hand_backend = hand_backend
+        self.model_complexity = model_complexity
+
+        # Suavização/predição dos landmarks entre detecções
+        self.landmark_filter = (LandmarkFilter(detect_every=detect_every)
+                                if smoothing or detect_every > 1 else None)
+
+        # Gestos de movimento (deslizar, círculos)
+        self.dynamic_gestures = DynamicGestureRecognizer() if dynamic_gestures else None
 
         # Reconhecedor de gestos
-        self.gesture_recognizer = GestureRecognizer()
+        self.gesture_recognizer = GestureRecognizer(classifier=gesture_model, finger_mode=finger_mode)
 
         # Gravador de voz
-        self.voice_recorder = VoiceRecorder(model_size="base")
+        self.voice_recorder = VoiceRecorder(model_size=whisper_model, use_service=transcription_service,
+                                            decoding="command")
         self.voice_model_loaded = False
 
         # Estados do assistente
@@ -40,19 +89,51 @@ class AssistenteGestos:
         self.last_transcription = ""
 
         # Câmera
-        self.camera = cv2.VideoCapture(0)
-        self.resolution_x = 1280
-        self.resolution_y = 720
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution_x)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution_y)
+        with self.boot.step("camera"):
+            self.camera = source if source is not None else CameraSource(0, 1280, 720)
+        self.resolution_x, self.resolution_y = self.camera.resolution
 
         # Thread de gravação
         self.recording_thread = None
         self.is_recording = False
 
+        # Saída de vídeo
+        self.headless = headless
+        self.frame_buffer_name = frame_buffer_name
+        self.frame_buffer = None
+        self.running = False
+
+        # Gravação de landmarks
+        self.landmark_recorder = landmark_recorder
+
+        # Métricas de latência
+        self.show_metrics = show_metrics
+        self._metrics_snapshot = {}
+        self._metrics_snapshot_time = 0.0
+
+        # Boot em paralelo
+        self.hand_detection = hand_detection
+        if hand_detection:
+            self.boot.start("mediapipe", self._init_hand_detector)
+        self.load_voice_model()
+        if preroll_seconds is not None:
+            self.boot.start("microfone", self.voice_recorder.start_stream,
+                            preroll=preroll_seconds)
+
         print("Assistente inicializado!")
         print("Carregando modelo Whisper em segundo plano...")
 
+    def _init_hand_detector(self):
+        """Importa o MediaPipe e cria o detector de mãos"""
+        self.hand_detector = create_hand_detector(
+            self.hand_backend,
+            model_complexity=self.model_complexity,
+            max_num_hands=1,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.5,
+            inference_width=self.inference_width
+        )
+
     def load_voice_model(self):
         """Carrega o modelo Whisper em uma thread separada"""
         def load():
@@ -60,50 +141,42 @@ class AssistenteGestos:
             self.voice_model_loaded = True
             print("Modelo Whisper carregado!")
 
-        thread = threading.Thread(target=load, daemon=True)
-        thread.start()
+        self.boot.start("whisper", load)
 
-    def detect_hands(self, frame):
+    def detect_hands(self, frame, draw=True):
         """
         Detecta mãos no frame usando MediaPipe.
 
         Args:
             frame: Frame da câmera
+            draw (bool): Desenhar os landmarks no frame
 
         Returns:
             tuple: (frame_anotado, lista_de_maos)
         """
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = self.hands.process(frame_rgb)
-
-        all_hands = []
-        if result.multi_hand_landmarks:
-            for hand_side, hand_landmarks in zip(result.multi_handedness, result.multi_hand_landmarks):
-                hand_info = {}
-                coords = []
-
-                # Extrair coordenadas dos landmarks
-                for mark in hand_landmarks.landmark:
-                    coord_x = int(mark.x * self.resolution_x)
-                    coord_y = int(mark.y * self.resolution_y)
-                    coord_z = int(mark.z * self.resolution_x)
-                    coords.append((coord_x, coord_y, coord_z))
-
-                hand_info['coordenadas'] = coords
-                # Inverter lado por causa do espelhamento da câmera
-                if hand_side.classification[0].label == "Left":
-                    hand_info["side"] = "Right"
-                else:
-                    hand_info["side"] = "Left"
-
-                all_hands.append(hand_info)
+        if self.landmark_filter is None:
+            all_hands = self.hand_detector.detect(frame)
+            if draw:
+                self.hand_detector.draw(frame)
+            return frame, all_hands
+
+        all_hands = self.landmark_filter.track(lambda: self.hand_detector.detect(frame),
+                                               time.perf_counter())
+        if draw:
+            self.hand_detector.draw_hands(frame, all_hands)
+        return frame, all_hands
 
-                # Desenhar landmarks no frame
-                self.mp_drawing.draw_landmarks(
-                    frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
-                )
+    def update_gesture(self, hands):
+        """
+        Reconhece o gesto da primeira mão e processa a ação se ele mudou.
 
-        return frame, all_hands
+        Args:
+            hands (list): Mãos detectadas no frame atual
+        """
+        self.last_gesture, events = gesture_events(self.gesture_recognizer, hands, self.last_gesture,
+                                                   self.dynamic_gestures, time.perf_counter())
+        for event in events:
+            self.process_gesture(event)
 
     def start_recording(self):
         """Inicia gravação de voz em uma thread separada"""
@@ -132,6 +205,10 @@ class AssistenteGestos:
         Args:
             gesture (str): Nome do gesto reconhecido
         """
+        with tracer.span("process_gesture", gesture=gesture):
+            self._process_gesture(gesture)
+
+    def _process_gesture(self, gesture):
         action = get_action_from_gesture(gesture)
 
         if action == 'ACTIVATE' and self.state == 'IDLE':
@@ -151,6 +228,11 @@ class AssistenteGestos:
             self.state = 'ACTIVE'
             print("\n[ASSISTENTE] Gravacao cancelada.")
 
+        elif action in ACTION_COMMANDS and self.state == 'ACTIVE':
+            # Versão básica não executa comandos: apenas informa o gesto
+            print(f"\n[GESTO] {self.gesture_recognizer.get_gesture_description(gesture)} "
+                  f"-> {ACTION_COMMANDS[action]}")
+
     def draw_ui(self, frame):
         """
         Desenha interface do usuário no frame.
@@ -185,7 +267,10 @@ class AssistenteGestos:
                     font, font_scale, color, thickness)
 
         # Gesto atual
-        gesture_desc = self.gesture_recognizer.get_gesture_description(self.last_gesture)
+        if self.hand_detection and self.hand_detector is None and not self.camera.provides_landmarks:
+            gesture_desc = "Carregando detector de maos..."
+        else:
+            gesture_desc = self.gesture_recognizer.get_gesture_description(self.last_gesture)
         cv2.putText(frame, f"Gesto: {gesture_desc}", (20, 65),
                     font, 0.6, (255, 255, 255), 1)
 
@@ -217,8 +302,45 @@ class AssistenteGestos:
                     (self.resolution_x - 200, 65),
                     font, 0.5, model_color, 1)
 
+        # Latências por etapa (atualizadas a cada 0.5s para não ordenar amostras todo frame)
+        if self.show_metrics:
+            now = time.monotonic()
+            if now - self._metrics_snapshot_time > 0.5:
+                self._metrics_snapshot = tracer.snapshot()
+                self._metrics_snapshot_time = now
+            draw_metrics_overlay(frame, self._metrics_snapshot, origin=(20, 110))
+
         return frame
 
+    def publish_frame(self, frame):
+        """
+        Publica o frame anotado no buffer de memória compartilhada.
+
+        O buffer é criado no primeiro frame, com a resolução real entregue
+        pela câmera.
+
+        Args:
+            frame: Frame com UI desenhada
+        """
+        if self.frame_buffer is None:
+            from frame_buffer import SharedFrameBuffer
+            height, width = frame.shape[:2]
+            self.frame_buffer = SharedFrameBuffer.create(self.frame_buffer_name, width, height)
+            print(f"[VIDEO] Publicando frames em '{self.frame_buffer.name}' "
+                  f"(python frame_buffer.py {self.frame_buffer.name})")
+
+        self.frame_buffer.publish(frame)
+
+    def stop(self):
+        """Solicita o encerramento do loop principal"""
+        self.running = False
+
+    def _install_signal_handlers(self):
+        """Encerra o loop de forma limpa ao receber SIGTERM (modo serviço)"""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        signal.signal(signal.SIGTERM, lambda signum, stack: self.stop())
+
     def run(self):
         """Loop principal do assistente"""
         print("\n" + "="*60)
@@ -229,54 +351,168 @@ class AssistenteGestos:
         print("  - Um dedo (indicador) = Iniciar gravacao de voz")
         print("  - Punho fechado = Desativar assistente")
         print("  - Dois dedos (V) = Cancelar operacao")
-        print("\nPressione 'Esc' para sair")
+        if self.headless:
+            print("\nModo headless: Ctrl+C ou SIGTERM para sair")
+        else:
+            print("\nPressione 'Esc' para sair")
         print("="*60 + "\n")
 
-        # Carregar modelo Whisper em background
-        self.load_voice_model()
+        # Relatório de inicialização quando todos os subsistemas estiverem prontos
+        self.boot.print_report_when_done()
+
+        # Só desenhar quando alguém vai ver o frame (janela ou buffer compartilhado)
+        render = not self.headless or self.frame_buffer_name is not None
+
+        self.running = True
+        self._install_signal_handlers()
 
         try:
-            while self.camera.isOpened():
+            while self.running and self.camera.is_opened():
                 ret, frame = self.camera.read()
                 if not ret:
                     print("Erro ao capturar frame")
                     break
 
-                # Espelhar frame
-                frame = cv2.flip(frame, 1)
+                frame_start = time.perf_counter()
+                if self.camera.provides_landmarks:
+                    # Sessão gravada: mãos já detectadas, em coordenadas da tela
+                    hands = self.camera.last_hands
+                else:
+                    # Espelhar frame
+                    frame = cv2.flip(frame, 1)
+
+                    # Detectar mãos (detector ainda carregando: apenas exibir o vídeo)
+                    if self.hand_detector is None:
+                        hands = []
+                    else:
+                        with tracer.span("detect_hands"):
+                            frame, hands = self.detect_hands(frame, draw=render)
 
-                # Detectar mãos
-                frame, hands = self.detect_hands(frame)
+                if self.landmark_recorder is not None:
+                    self.landmark_recorder.write(hands)
 
                 # Reconhecer gesto
-                if hands:
-                    hand = hands[0]
-                    gesture = self.gesture_recognizer.recognize_gesture(hand)
-
-                    # Só processar se o gesto mudou
-                    if gesture != self.last_gesture:
-                        self.last_gesture = gesture
-                        self.process_gesture(gesture)
-                else:
-                    self.last_gesture = 'NONE'
+                self.update_gesture(hands)
+
+                if not render:
+                    tracer.record("frame", time.perf_counter() - frame_start)
+                    continue
 
                 # Desenhar UI
                 frame = self.draw_ui(frame)
 
-                # Mostrar frame
-                cv2.imshow("Assistente por Gestos", frame)
+                if self.frame_buffer_name is not None:
+                    self.publish_frame(frame)
 
-                # Verificar tecla
-                key = cv2.waitKey(1)
-                if key == 27:  # ESC
-                    break
+                tracer.record("frame", time.perf_counter() - frame_start)
+
+                if not self.headless:
+                    # Mostrar frame
+                    cv2.imshow("Assistente por Gestos", frame)
+                    self.boot.mark("primeiro_frame")
+
+                    # Verificar tecla
+                    key = cv2.waitKey(1)
+                    if key == 27:  # ESC
+                        break
+                    elif key == ord('m'):  # Liga/desliga o painel de latências
+                        self.show_metrics = not self.show_metrics
+
+        except KeyboardInterrupt:
+            pass
 
         finally:
+            self.running = False
             self.camera.release()
-            cv2.destroyAllWindows()
+            self.voice_recorder.stop_stream()
+            if self.landmark_recorder is not None:
+                self.landmark_recorder.close()
+            print(f"[DESEMPENHO] {self.camera.frames_read} frames em "
+                  f"{self.camera.elapsed():.1f}s ({self.camera.measured_fps():.1f} FPS)")
+            if self.frame_buffer is not None:
+                self.frame_buffer.close()
+                self.frame_buffer = None
+            if not self.headless:
+                cv2.destroyAllWindows()
+            tracer.close()
+            self.boot.shutdown()
             print("\nAssistente encerrado.")
 
 
 if __name__ == "__main__":
-    assistente = AssistenteGestos()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Assistente virtual controlado por gestos")
+    parser.add_argument("--headless", action="store_true",
+                        help="Rodar sem janela (ex.: como serviço em servidor Linux)")
+    parser.add_argument("--frame-buffer", metavar="NOME", default=None,
+                        help="Publicar frames anotados em memória compartilhada com este nome")
+    parser.add_argument("--source", default="0",
+                        help="Índice da câmera, arquivo de vídeo ou diretório de imagens")
+    parser.add_argument("--fast", action="store_true",
+                        help="Reproduzir fontes gravadas o mais rápido possível (benchmark)")
+    parser.add_argument("--record-landmarks", metavar="BASE", default=None,
+                        help="Gravar os landmarks detectados em BASE.lmk/.idx/.json")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Expor latências por etapa em http://127.0.0.1:PORTA/metrics")
+    parser.add_argument("--metrics-log", metavar="ARQUIVO", default=None,
+                        help="Gravar cada etapa medida em um log JSONL")
+    parser.add_argument("--metrics-overlay", action="store_true",
+                        help="Mostrar latências sobre o vídeo (tecla 'm' alterna)")
+    parser.add_argument("--transcription-service", action="store_true",
+                        help="Rodar o Whisper em um processo separado (vídeo fluido durante a transcrição)")
+    parser.add_argument("--preroll", type=float, metavar="SEG", default=None,
+                        help="Microfone sempre aberto: gravar SEG segundos antes do gesto")
+    parser.add_argument("--gesture-model", metavar="ARQUIVO", default=None,
+                        help="Classificador de gestos treinado (gesture_classifier.py train)")
+    parser.add_argument("--finger-angles", action="store_true",
+                        help="Decidir dedos levantados pelos ângulos das articulações (mão girada)")
+    parser.add_argument("--smooth", action="store_true",
+                        help="Suavizar os landmarks (filtro One-Euro)")
+    parser.add_argument("--detect-every", type=int, metavar="N", default=None,
+                        help="Detectar mãos a cada N frames e prever os landmarks nos demais")
+    parser.add_argument("--dynamic-gestures", action="store_true",
+                        help="Deslizar = próxima/anterior, círculo = volume")
+    parser.add_argument("--inference-width", type=int, metavar="PX", default=None,
+                        help="Detectar mãos em uma cópia reduzida do frame (ex.: 320 = 320x180; 0 = original)")
+    parser.add_argument("--hand-backend", choices=BACKENDS, default="solutions",
+                        help="tasks: HandLandmarker assíncrono (precisa de hand_landmarker.task)")
+    parser.add_argument("--model-complexity", type=int, choices=(0, 1), default=None,
+                        help="Modelo de mãos: 0 = leve, 1 = completo (backend solutions)")
+    parser.add_argument("--whisper-model", default=None,
+                        help="Modelo Whisper (tiny, base, small...; padrão: perfil da máquina)")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="Medir esta máquina e salvar o perfil de modelos/taxas antes de iniciar")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        tracer.start_http_server(args.metrics_port)
+    if args.metrics_log:
+        tracer.open_log(args.metrics_log)
+
+    # Modelos e taxas: linha de comando > perfil da máquina (calibration.py) > padrões
+    from calibration import resolve_settings, startup_profile
+    from frame_source import open_source
+    settings = resolve_settings(args, startup_profile(args.calibrate, llm=False))   # Sem IA conversacional aqui
+    source = open_source(args.source, realtime=not args.fast,
+                         width=settings["camera_width"], height=settings["camera_height"])
+
+    recorder = None
+    if args.record_landmarks:
+        from landmark_recorder import LandmarkRecorder
+        recorder = LandmarkRecorder(args.record_landmarks, resolution=source.resolution)
+
+    assistente = AssistenteGestos(headless=args.headless, frame_buffer_name=args.frame_buffer,
+                                  source=source, landmark_recorder=recorder,
+                                  show_metrics=args.metrics_overlay,
+                                  transcription_service=args.transcription_service,
+                                  preroll_seconds=args.preroll,
+                                  gesture_model=args.gesture_model,
+                                  finger_mode="angles" if args.finger_angles else "position",
+                                  smoothing=args.smooth, detect_every=settings["detect_every"],
+                                  dynamic_gestures=args.dynamic_gestures,
+                                  inference_width=settings["inference_width"] or None,
+                                  hand_backend=args.hand_backend,
+                                  model_complexity=settings["model_complexity"],
+                                  whisper_model=settings["whisper_model"])
     assistente.run()
@@ -3,15 +3,26 @@
 Assistente Virtual Inteligente Controlado por Gestos
 Integra: Gestos + Voz + IA Conversacional + Comandos do Sistema
 """
+from startup import BootSequence, lazy_import
 import cv2
-import mediapipe as mp
-from gesture_recognition import GestureRecognizer, get_action_from_gesture
+from gesture_recognition import GestureRecognizer, get_action_from_gesture, gesture_events, ACTION_COMMANDS
 from voice_recognition import VoiceRecorder
+from frame_source import CameraSource
+from hand_detector import BACKENDS, create_hand_detector
+from landmark_filter import LandmarkFilter
+from dynamic_gestures import DynamicGestureRecognizer
+from metrics import tracer, draw_metrics_overlay
 from ai_assistant import AIAssistant
 from command_executor import CommandExecutor
+from command_prefetch import CommandPrefetcher
+import os
+import tempfile
 import threading
+import signal
 import time
-import pyttsx3
+
+# Módulos pesados: importados em segundo plano pela sequência de boot
+pyttsx3 = lazy_import("pyttsx3")
 
 
 class AssistenteIA:
@@ -19,7 +30,14 @@ class AssistenteIA:
     Assistente virtual inteligente que combina gestos, voz, IA e TTS
     """
 
-    def __init__(self, ai_provider="ollama", ai_model=None, api_key=None, use_tts=True):
+    def __init__(self, ai_provider="ollama", ai_model=None, api_key=None, use_tts=True,
+                 headless=False, frame_buffer_name=None, source=None,
+                 landmark_recorder=None, show_metrics=False, transcription_service=False,
+                 preroll_seconds=None, barge_in=False, conversation_journal=None,
+                 journal_max_messages=None,
+                 gesture_model=None, finger_mode="position", smoothing=False, detect_every=1,
+                 dynamic_gestures=False, inference_width=None, hand_backend="solutions",
+                 model_complexity=1, whisper_model="base"):
         """
         Inicializa o assistente inteligente.
 
@@ -28,41 +46,81 @@ class AssistenteIA:
             ai_model (str): Modelo específico (opcional)
             api_key (str): API key para OpenAI/Groq
             use_tts (bool): Usar síntese de voz para respostas
+            headless (bool): Rodar sem janela (servidores sem display)
+            frame_buffer_name (str): Nome da memória compartilhada onde os
+                frames anotados são publicados (None desativa a publicação)
+            source (FrameSource): Fonte de frames (None usa a webcam 0 em 1280x720)
+            landmark_recorder (LandmarkRecorder): Grava os landmarks de cada frame (opcional)
+            show_metrics (bool): Mostrar latências por etapa sobre o vídeo
+            transcription_service (bool): Transcrever em um processo Whisper separado
+            preroll_seconds (float): Manter o microfone aberto e incluir estes
+                segundos anteriores ao gesto na gravação, sem contagem
+                regressiva (None mantém o "Escutando" + contagem de 3s)
+            barge_in (bool): Tocar o TTS pelo stream do microfone com
+                cancelamento de eco: falar por cima interrompe a resposta e já
+                grava o próximo comando (implica pre-roll, padrão 1s)
+            conversation_journal (str): Arquivo JSONL onde a conversa com a IA
+                é gravada a cada mensagem e retomada ao reiniciar (opcional)
+            journal_max_messages (int): Limite de retenção do diário (None
+                guarda a conversa inteira; com limite, o arquivo é compactado)
+            gesture_model (str): Modelo do classificador de gestos (.npz) no
+                lugar das regras por contagem de dedos (opcional)
+            finger_mode (str): "position" ou "angles" (dedos pelos ângulos das
+                articulações, robusto a mão inclinada ou girada)
+            smoothing (bool): Suavizar os landmarks (filtro One-Euro)
+            detect_every (int): Rodar o detector a cada N frames; nos demais os
+                landmarks são previstos pelo filtro (implica `smoothing`)
+            dynamic_gestures (bool): Reconhecer deslizar/círculos (próxima
+                faixa, volume) além das poses
+            inference_width (int): Largura da cópia reduzida entregue ao
+                MediaPipe (ex.: 320); o vídeo continua na resolução da câmera
+            hand_backend (str): "solutions" (síncrono) ou "tasks" (HandLandmarker
+                em LIVE_STREAM: o loop não espera a inferência)
+            model_complexity (int): Modelo de mãos 0 (leve) ou 1 (completo)
+            whisper_model (str): Modelo Whisper ("tiny", "base", "small"...)
         """
-        # MediaPipe para detecção de mãos
-        self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
+        # Subsistemas pesados são inicializados em paralelo, em segundo plano,
+        # para que a janela da câmera apareça imediatamente
+        self.boot = BootSequence()
 
-        # Módulos
-        self.gesture_recognizer = GestureRecognizer()
-        self.voice_recorder = VoiceRecorder(model_size="base")
-        self.command_executor = CommandExecutor()
+        # Detector de mãos (MediaPipe, criado no boot)
+        self.hand_detector = None
+        self.inference_width = inference_width
+        self.hand_backend = hand_backend
+        self.model_complexity = model_complexity
 
-        # IA Conversacional
+        # Suavização/predição dos landmarks entre detecções
+        self.landmark_filter = (LandmarkFilter(detect_every=detect_every)
+                                if smoothing or detect_every > 1 else None)
+
+        # Gestos de movimento (deslizar, círculos)
+        self.dynamic_gestures = DynamicGestureRecognizer() if dynamic_gestures else None
+
+        # Módulos
+        self.gesture_recognizer = GestureRecognizer(classifier=gesture_model, finger_mode=finger_mode)
+        self.voice_recorder = VoiceRecorder(model_size=whisper_model, use_service=transcription_service,
+                                            decoding="command")
+        # Executor de comandos (histórico SQLite, catálogo e índice semântico; criado no boot)
+        self.command_executor = None
+        self.prefetcher = None
+
+        # IA Conversacional (cliente conectado no boot)
         self.ai_assistant = AIAssistant(
             provider=ai_provider,
             model=ai_model,
-            api_key=api_key
+            api_key=api_key,
+            lazy_client=True
         )
+        if conversation_journal:
+            self.ai_assistant.open_journal(conversation_journal,
+                                           max_messages=journal_max_messages)
 
-        # TTS (Text-to-Speech)
+        # TTS (Text-to-Speech, criado no boot)
         self.use_tts = use_tts
         self.tts_engine = None
         self.tts_is_speaking = False  # Flag para controlar se TTS está falando
-        if use_tts:
-            try:
-                self.tts_engine = pyttsx3.init()
-                self.tts_engine.setProperty('rate', 150)  # Velocidade
-                self.tts_engine.setProperty('volume', 0.9)  # Volume
-                print("[TTS] Síntese de voz ativada")
-            except:
-                print("[AVISO] TTS não disponível")
-                self.tts_engine = None
+        self.barge_in = barge_in
+        self._tts_lock = threading.Lock()
 
         # Estados
         self.state = 'IDLE'  # IDLE, ACTIVE, RECORDING, PROCESSING, WAITING
@@ -71,13 +129,14 @@ class AssistenteIA:
         self.last_response = ""
         self.voice_model_loaded = False
         self.recording_countdown = 0  # Contador de delay antes de gravar
+        if barge_in and preroll_seconds is None:
+            preroll_seconds = 1.0
+        self.preroll_seconds = preroll_seconds
 
         # Câmera
-        self.camera = cv2.VideoCapture(0)
-        self.resolution_x = 1280
-        self.resolution_y = 720
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution_x)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution_y)
+        with self.boot.step("camera"):
+            self.camera = source if source is not None else CameraSource(0, 1280, 720)
+        self.resolution_x, self.resolution_y = self.camera.resolution
 
         # Threading
         self.recording_thread = None
@@ -85,9 +144,79 @@ class AssistenteIA:
         self.processing_thread = None
         self.is_processing = False
 
+        # Saída de vídeo
+        self.headless = headless
+        self.frame_buffer_name = frame_buffer_name
+        self.frame_buffer = None
+        self.running = False
+
+        # Gravação de landmarks
+        self.landmark_recorder = landmark_recorder
+
+        # Métricas de latência
+        self.show_metrics = show_metrics
+        self.command_started_at = None  # Instante do gesto de gravar
+        self._metrics_snapshot = {}
+        self._metrics_snapshot_time = 0.0
+
+        # Boot em paralelo
+        self.boot.start("mediapipe", self._init_hand_detector)
+        self.load_voice_model()
+        if use_tts:
+            self.boot.start("tts", self._init_tts)
+        self.boot.start("ia", self.ai_assistant.ensure_client)
+        self.boot.start("comandos", self._init_commands)
+        if preroll_seconds is not None:
+            self.boot.start("microfone", self.voice_recorder.start_stream,
+                            preroll=preroll_seconds, echo_cancel=barge_in,
+                            on_barge_in=self._on_barge_in)
+
         print("[ASSISTENTE IA] Inicializado!")
         print(f"[IA] Provider: {ai_provider}, Modelo: {ai_model or 'padrão'}")
 
+    def _init_hand_detector(self):
+        """Importa o MediaPipe e cria o detector de mãos"""
+        self.hand_detector = create_hand_detector(
+            self.hand_backend,
+            model_complexity=self.model_complexity,
+            max_num_hands=1,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.5,
+            inference_width=self.inference_width
+        )
+
+    def _init_commands(self):
+        """Abre o histórico, compila o catálogo e vetoriza as intenções"""
+        executor = CommandExecutor()
+        self.voice_recorder.set_vocabulary(executor.get_available_commands())
+        # Catálogo editado com o assistente rodando: atualizar o prompt do Whisper
+        executor.catalog.listeners.append(self.voice_recorder.set_vocabulary)
+        if executor.intents is not None:
+            executor.intents.build(executor.catalog.index, executor.catalog.path)
+        # Preparar os comandos mais prováveis (pelo histórico) ao ativar
+        self.prefetcher = CommandPrefetcher(executor, self.ai_assistant)
+        self.command_executor = executor
+
+    def _wait_commands(self):
+        """Executor de comandos, esperando o boot se preciso (None se falhou)"""
+        try:
+            self.boot.wait("comandos")
+        except Exception:
+            return None
+        return self.command_executor
+
+    def _init_tts(self):
+        """Inicializa a síntese de voz"""
+        try:
+            engine = pyttsx3.init()
+            engine.setProperty('rate', 150)  # Velocidade
+            engine.setProperty('volume', 0.9)  # Volume
+            self.tts_engine = engine
+            print("[TTS] Síntese de voz ativada")
+        except Exception:
+            print("[AVISO] TTS não disponível")
+            self.tts_engine = None
+
     def load_voice_model(self):
         """Carrega o modelo Whisper em background"""
         def load():
@@ -95,52 +224,89 @@ class AssistenteIA:
             self.voice_model_loaded = True
             print("[WHISPER] Modelo carregado!")
 
-        thread = threading.Thread(target=load, daemon=True)
-        thread.start()
-
-    def detect_hands(self, frame):
-        """Detecta mãos no frame"""
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = self.hands.process(frame_rgb)
-
-        all_hands = []
-        if result.multi_hand_landmarks:
-            for hand_side, hand_landmarks in zip(result.multi_handedness, result.multi_hand_landmarks):
-                hand_info = {}
-                coords = []
-
-                for mark in hand_landmarks.landmark:
-                    coord_x = int(mark.x * self.resolution_x)
-                    coord_y = int(mark.y * self.resolution_y)
-                    coord_z = int(mark.z * self.resolution_x)
-                    coords.append((coord_x, coord_y, coord_z))
-
-                hand_info['coordenadas'] = coords
-                if hand_side.classification[0].label == "Left":
-                    hand_info["side"] = "Right"
-                else:
-                    hand_info["side"] = "Left"
+        self.boot.start("whisper", load)
+
+    def detect_hands(self, frame, draw=True):
+        """
+        Detecta mãos no frame usando MediaPipe.
 
-                all_hands.append(hand_info)
-                self.mp_drawing.draw_landmarks(
-                    frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
-                )
+        Args:
+            frame: Frame da câmera
+            draw (bool): Desenhar os landmarks no frame
 
+        Returns:
+            tuple: (frame_anotado, lista_de_maos)
+        """
+        if self.landmark_filter is None:
+            all_hands = self.hand_detector.detect(frame)
+            if draw:
+                self.hand_detector.draw(frame)
+            return frame, all_hands
+
+        all_hands = self.landmark_filter.track(lambda: self.hand_detector.detect(frame),
+                                               time.perf_counter())
+        if draw:
+            self.hand_detector.draw_hands(frame, all_hands)
         return frame, all_hands
 
-    def speak(self, text):
-        """Fala um texto usando TTS"""
+    def speak(self, text, trace_start=None):
+        """
+        Fala um texto usando TTS.
+
+        Args:
+            text (str): Texto a falar
+            trace_start (float): Início do comando (perf_counter) para medir
+                a latência total gesto -> resposta falada
+        """
         if self.tts_engine and self.use_tts:
             def tts_speak():
                 self.tts_is_speaking = True
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
+                if self.voice_recorder.playback is not None:
+                    # Eco cancelado: sem folga depois da fala, e o usuário pode interromper
+                    with tracer.span("speak"):
+                        self._speak_through_stream(text, trace_start)
+                    self.tts_is_speaking = False
+                    return
+
+                with tracer.span("speak"):
+                    self.tts_engine.say(text)
+                    self.tts_engine.runAndWait()
+                if trace_start is not None:
+                    tracer.record("gesture_to_response", time.perf_counter() - trace_start)
                 # Aguardar 1 segundo extra após terminar de falar
                 time.sleep(1.0)
                 self.tts_is_speaking = False
 
             thread = threading.Thread(target=tts_speak, daemon=True)
             thread.start()
+        elif trace_start is not None:
+            tracer.record("gesture_to_response", time.perf_counter() - trace_start)
+
+    def _speak_through_stream(self, text, trace_start=None):
+        """Sintetiza a fala em WAV e toca pelo stream duplex do microfone"""
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with self._tts_lock:
+                self.tts_engine.save_to_file(text, path)
+                self.tts_engine.runAndWait()
+            if trace_start is not None:
+                tracer.record("gesture_to_response", time.perf_counter() - trace_start)
+            self.voice_recorder.stop_playback()  # Uma fala nova substitui a anterior
+            self.voice_recorder.play_file(path)
+        except Exception as e:
+            print(f"[TTS] Erro ao tocar fala: {e}")
+        finally:
+            os.remove(path)
+
+    def _on_barge_in(self):
+        """Usuário falou por cima da resposta: interromper e gravar o próximo comando"""
+        print("\n[BARGE-IN] Resposta interrompida")
+        self.tts_is_speaking = False
+        if self.state == 'ACTIVE' and self.voice_model_loaded and not self.is_recording:
+            self.state = 'RECORDING'
+            self.command_started_at = time.perf_counter()
+            self.start_recording()
 
     def process_command(self, command_text):
         """
@@ -153,21 +319,28 @@ class AssistenteIA:
         self.is_processing = True
         self.state = 'PROCESSING'
 
+        trace_start = self.command_started_at
+
         def process():
             # 1. Tentar executar comando do sistema
-            success, result = self.command_executor.execute(command_text)
+            executor = self._wait_commands()
+            success, result = False, None
+            if executor is not None:
+                with tracer.span("command_execute"):
+                    success, result = executor.execute(command_text)
 
             if success:
                 print(f"[COMANDO] {result}")
                 self.last_response = result
-                self.speak(result)
+                self.speak(result, trace_start=trace_start)
             else:
                 # 2. Perguntar para a IA
                 print(f"[IA] Processando: {command_text}")
-                response = self.ai_assistant.chat(command_text)
+                with tracer.span("ai_chat"):
+                    response = self.ai_assistant.chat(command_text)
                 print(f"[IA] Resposta: {response}")
                 self.last_response = response
-                self.speak(response)
+                self.speak(response, trace_start=trace_start)
 
             self.is_processing = False
             self.state = 'ACTIVE'
@@ -182,20 +355,27 @@ class AssistenteIA:
 
         def record():
             self.is_recording = True
-            self.state = 'WAITING'  # Estado de espera
-            print("\n[AGUARDANDO] Preparando para gravar...")
-            self.speak("Escutando")
 
-            # Aguardar TTS terminar de falar + delay extra
-            while self.tts_is_speaking:
-                time.sleep(0.1)
+            if self.voice_recorder.stream is None:
+                self.state = 'WAITING'  # Estado de espera
+                print("\n[AGUARDANDO] Preparando para gravar...")
+                self.speak("Escutando")
 
-            # Countdown visual de 3 segundos
-            for i in range(3, 0, -1):
-                self.recording_countdown = i
-                time.sleep(1.0)
+                with tracer.span("countdown"):
+                    # Aguardar TTS terminar de falar + delay extra
+                    while self.tts_is_speaking:
+                        time.sleep(0.1)
+
+                    # Countdown visual de 3 segundos
+                    for i in range(3, 0, -1):
+                        self.recording_countdown = i
+                        time.sleep(1.0)
+
+                self.recording_countdown = 0
+            else:
+                self.voice_recorder.stop_playback()
 
-            self.recording_countdown = 0
+            # Com o microfone sempre aberto, o pre-roll já contém o início da fala
             self.state = 'RECORDING'
             print("[GRAVANDO] Fale AGORA!")
 
@@ -218,12 +398,30 @@ class AssistenteIA:
         self.recording_thread = threading.Thread(target=record, daemon=True)
         self.recording_thread.start()
 
+    def update_gesture(self, hands):
+        """
+        Reconhece o gesto da primeira mão e processa a ação se ele mudou.
+
+        Args:
+            hands (list): Mãos detectadas no frame atual
+        """
+        self.last_gesture, events = gesture_events(self.gesture_recognizer, hands, self.last_gesture,
+                                                   self.dynamic_gestures, time.perf_counter())
+        for event in events:
+            self.process_gesture(event)
+
     def process_gesture(self, gesture):
         """Processa gestos e atualiza estado"""
+        with tracer.span("process_gesture", gesture=gesture):
+            self._process_gesture(gesture)
+
+    def _process_gesture(self, gesture):
         action = get_action_from_gesture(gesture)
 
         if action == 'ACTIVATE' and self.state == 'IDLE':
             self.state = 'ACTIVE'
+            if self.prefetcher is not None:   # Ainda no boot: nada a preparar
+                self.prefetcher.on_active()
             self.speak("Assistente ativado")
             print("\n[ASSISTENTE] Ativado!")
 
@@ -236,6 +434,7 @@ class AssistenteIA:
 
         elif action == 'RECORD' and self.state == 'ACTIVE' and self.voice_model_loaded:
             self.state = 'RECORDING'
+            self.command_started_at = time.perf_counter()
             self.start_recording()
 
         elif action == 'CANCEL':
@@ -243,6 +442,16 @@ class AssistenteIA:
                 self.state = 'ACTIVE'
                 print("\n[ASSISTENTE] Gravação cancelada")
 
+        elif action in ACTION_COMMANDS and self.state == 'ACTIVE':
+            # Gesto equivalente a um comando de voz (ex.: volume), sem falar a resposta
+            threading.Thread(target=self._run_gesture_command,
+                             args=(ACTION_COMMANDS[action],), daemon=True).start()
+
+    def _run_gesture_command(self, command_text):
+        executor = self._wait_commands()
+        success, result = executor.execute(command_text) if executor is not None else (False, None)
+        print(f"[GESTO] {result if success else f'Comando indisponível: {command_text}'}")
+
     def draw_ui(self, frame):
         """Desenha interface visual"""
         font = cv2.FONT_HERSHEY_SIMPLEX
@@ -277,7 +486,10 @@ class AssistenteIA:
                     font, font_scale, color, thickness)
 
         # Gesto
-        gesture_desc = self.gesture_recognizer.get_gesture_description(self.last_gesture)
+        if self.hand_detector is None and not self.camera.provides_landmarks:
+            gesture_desc = "Carregando detector de maos..."
+        else:
+            gesture_desc = self.gesture_recognizer.get_gesture_description(self.last_gesture)
         cv2.putText(frame, f"Gesto: {gesture_desc}", (20, 65),
                     font, 0.6, (255, 255, 255), 1)
 
@@ -290,7 +502,13 @@ class AssistenteIA:
 
         # IA Status
         ai_color = (0, 255, 0) if self.ai_assistant.client else (255, 0, 0)
-        ai_status = "OK" if self.ai_assistant.client else "OFF"
+        if self.ai_assistant.client:
+            ai_status = "OK"
+        elif self.ai_assistant.client_initialized:
+            ai_status = "OFF"
+        else:
+            ai_status = "Carregando..."
+            ai_color = (0, 165, 255)
         cv2.putText(frame, f"IA ({self.ai_assistant.provider}): {ai_status}",
                     (self.resolution_x - 250, 65),
                     font, 0.5, ai_color, 1)
@@ -369,8 +587,37 @@ class AssistenteIA:
                 cv2.putText(frame, "REC", (70, 55),
                             font, 0.7, (0, 0, 255), 2)
 
+        # Latências por etapa (atualizadas a cada 0.5s para não ordenar amostras todo frame)
+        if self.show_metrics:
+            now = time.monotonic()
+            if now - self._metrics_snapshot_time > 0.5:
+                self._metrics_snapshot = tracer.snapshot()
+                self._metrics_snapshot_time = now
+            draw_metrics_overlay(frame, self._metrics_snapshot, origin=(20, 130))
+
         return frame
 
+    def publish_frame(self, frame):
+        """Publica o frame anotado no buffer de memória compartilhada"""
+        if self.frame_buffer is None:
+            from frame_buffer import SharedFrameBuffer
+            height, width = frame.shape[:2]
+            self.frame_buffer = SharedFrameBuffer.create(self.frame_buffer_name, width, height)
+            print(f"[VIDEO] Publicando frames em '{self.frame_buffer.name}' "
+                  f"(python frame_buffer.py {self.frame_buffer.name})")
+
+        self.frame_buffer.publish(frame)
+
+    def stop(self):
+        """Solicita o encerramento do loop principal"""
+        self.running = False
+
+    def _install_signal_handlers(self):
+        """Encerra o loop de forma limpa ao receber SIGTERM (modo serviço)"""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        signal.signal(signal.SIGTERM, lambda signum, stack: self.stop())
+
     def run(self):
         """Loop principal"""
         print("\n" + "="*70)
@@ -385,49 +632,181 @@ class AssistenteIA:
         print("  • Comandos do sistema (abrir apps, volume, etc)")
         print(f"  • IA conversacional ({self.ai_assistant.provider})")
         print(f"  • Síntese de voz (TTS): {'Ativa' if self.use_tts else 'Desativada'}")
-        print("\nPressione 'Esc' para sair")
+        if self.headless:
+            print("\nModo headless: Ctrl+C ou SIGTERM para sair")
+        else:
+            print("\nPressione 'Esc' para sair")
         print("="*70 + "\n")
 
-        self.load_voice_model()
+        self.boot.print_report_when_done()
+
+        # Só desenhar quando alguém vai ver o frame (janela ou buffer compartilhado)
+        render = not self.headless or self.frame_buffer_name is not None
+
+        self.running = True
+        self._install_signal_handlers()
 
         try:
-            while self.camera.isOpened():
+            while self.running and self.camera.is_opened():
                 ret, frame = self.camera.read()
                 if not ret:
                     break
 
-                frame = cv2.flip(frame, 1)
-                frame, hands = self.detect_hands(frame)
+                frame_start = time.perf_counter()
+                if self.camera.provides_landmarks:
+                    hands = self.camera.last_hands
+                else:
+                    frame = cv2.flip(frame, 1)
+                    if self.hand_detector is None:
+                        hands = []  # Detector ainda carregando: apenas exibir o vídeo
+                    else:
+                        with tracer.span("detect_hands"):
+                            frame, hands = self.detect_hands(frame, draw=render)
 
-                if hands:
-                    hand = hands[0]
-                    gesture = self.gesture_recognizer.recognize_gesture(hand)
+                if self.landmark_recorder is not None:
+                    self.landmark_recorder.write(hands)
 
-                    if gesture != self.last_gesture:
-                        self.last_gesture = gesture
-                        self.process_gesture(gesture)
-                else:
-                    self.last_gesture = 'NONE'
+                self.update_gesture(hands)
+
+                if not render:
+                    tracer.record("frame", time.perf_counter() - frame_start)
+                    continue
 
                 frame = self.draw_ui(frame)
-                cv2.imshow("Assistente IA por Gestos", frame)
 
-                key = cv2.waitKey(1)
-                if key == 27:  # ESC
-                    break
+                if self.frame_buffer_name is not None:
+                    self.publish_frame(frame)
+
+                tracer.record("frame", time.perf_counter() - frame_start)
+
+                if not self.headless:
+                    cv2.imshow("Assistente IA por Gestos", frame)
+                    self.boot.mark("primeiro_frame")
+
+                    key = cv2.waitKey(1)
+                    if key == 27:  # ESC
+                        break
+                    elif key == ord('m'):  # Liga/desliga o painel de latências
+                        self.show_metrics = not self.show_metrics
+
+        except KeyboardInterrupt:
+            pass
 
         finally:
+            self.running = False
             self.camera.release()
-            cv2.destroyAllWindows()
+            self.voice_recorder.stop_stream()
+            if self.landmark_recorder is not None:
+                self.landmark_recorder.close()
+            print(f"[DESEMPENHO] {self.camera.frames_read} frames em "
+                  f"{self.camera.elapsed():.1f}s ({self.camera.measured_fps():.1f} FPS)")
+            if self.frame_buffer is not None:
+                self.frame_buffer.close()
+                self.frame_buffer = None
+            if not self.headless:
+                cv2.destroyAllWindows()
+            self.ai_assistant.close_journal()
+            tracer.close()
+            self.boot.shutdown()
             print("\nAssistente encerrado.")
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Assistente IA controlado por gestos")
+    parser.add_argument("--headless", action="store_true",
+                        help="Rodar sem janela (ex.: como serviço em servidor Linux)")
+    parser.add_argument("--frame-buffer", metavar="NOME", default=None,
+                        help="Publicar frames anotados em memória compartilhada com este nome")
+    parser.add_argument("--source", default="0",
+                        help="Índice da câmera, arquivo de vídeo ou diretório de imagens")
+    parser.add_argument("--fast", action="store_true",
+                        help="Reproduzir fontes gravadas o mais rápido possível (benchmark)")
+    parser.add_argument("--record-landmarks", metavar="BASE", default=None,
+                        help="Gravar os landmarks detectados em BASE.lmk/.idx/.json")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Expor latências por etapa em http://127.0.0.1:PORTA/metrics")
+    parser.add_argument("--metrics-log", metavar="ARQUIVO", default=None,
+                        help="Gravar cada etapa medida em um log JSONL")
+    parser.add_argument("--metrics-overlay", action="store_true",
+                        help="Mostrar latências sobre o vídeo (tecla 'm' alterna)")
+    parser.add_argument("--transcription-service", action="store_true",
+                        help="Rodar o Whisper em um processo separado (vídeo fluido durante a transcrição)")
+    parser.add_argument("--preroll", type=float, metavar="SEG", default=None,
+                        help="Microfone sempre aberto: gravar SEG segundos antes do gesto, sem contagem")
+    parser.add_argument("--barge-in", action="store_true",
+                        help="Cancelamento de eco: falar por cima da resposta a interrompe")
+    parser.add_argument("--journal", metavar="ARQUIVO", default=None,
+                        help="Gravar a conversa com a IA em JSONL e retomá-la ao reiniciar")
+    parser.add_argument("--journal-max", type=int, metavar="N", default=None,
+                        help="Manter só as últimas N mensagens no diário (compacta o arquivo; "
+                             "padrão: guarda tudo)")
+    parser.add_argument("--gesture-model", metavar="ARQUIVO", default=None,
+                        help="Classificador de gestos treinado (gesture_classifier.py train)")
+    parser.add_argument("--finger-angles", action="store_true",
+                        help="Decidir dedos levantados pelos ângulos das articulações (mão girada)")
+    parser.add_argument("--smooth", action="store_true",
+                        help="Suavizar os landmarks (filtro One-Euro)")
+    parser.add_argument("--detect-every", type=int, metavar="N", default=None,
+                        help="Detectar mãos a cada N frames e prever os landmarks nos demais")
+    parser.add_argument("--dynamic-gestures", action="store_true",
+                        help="Deslizar = próxima/anterior, círculo = volume")
+    parser.add_argument("--inference-width", type=int, metavar="PX", default=None,
+                        help="Detectar mãos em uma cópia reduzida do frame (ex.: 320 = 320x180; 0 = original)")
+    parser.add_argument("--hand-backend", choices=BACKENDS, default="solutions",
+                        help="tasks: HandLandmarker assíncrono (precisa de hand_landmarker.task)")
+    parser.add_argument("--model-complexity", type=int, choices=(0, 1), default=None,
+                        help="Modelo de mãos: 0 = leve, 1 = completo (backend solutions)")
+    parser.add_argument("--whisper-model", default=None,
+                        help="Modelo Whisper (tiny, base, small...; padrão: perfil da máquina)")
+    parser.add_argument("--ai-model", default=None,
+                        help="Modelo do Ollama (padrão: perfil da máquina)")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="Medir esta máquina e salvar o perfil de modelos/taxas antes de iniciar")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        tracer.start_http_server(args.metrics_port)
+    if args.metrics_log:
+        tracer.open_log(args.metrics_log)
+
+    # Modelos e taxas: linha de comando > perfil da máquina (calibration.py) > padrões
+    from calibration import resolve_settings, startup_profile
+    from frame_source import open_source
+    settings = resolve_settings(args, startup_profile(args.calibrate, llm=True))
+    source = open_source(args.source, realtime=not args.fast,
+                         width=settings["camera_width"], height=settings["camera_height"])
+
+    recorder = None
+    if args.record_landmarks:
+        from landmark_recorder import LandmarkRecorder
+        recorder = LandmarkRecorder(args.record_landmarks, resolution=source.resolution)
+
     # Configurar aqui o provider de IA
     assistente = AssistenteIA(
         ai_provider="ollama",          # Opcoes: "ollama", "openai", "groq"
-        ai_model="deepseek-r1:1.5b",   # Modelo menor (1.1GB) - ideal para pouca RAM
+        ai_model=settings["ai_model"],  # Perfil da máquina (padrão deepseek-r1:1.5b, 1.1GB)
         api_key=None,                  # Necessário para OpenAI/Groq
-        use_tts=True                   # Ativar síntese de voz
+        use_tts=True,                  # Ativar síntese de voz
+        headless=args.headless,
+        frame_buffer_name=args.frame_buffer,
+        source=source,
+        landmark_recorder=recorder,
+        show_metrics=args.metrics_overlay,
+        transcription_service=args.transcription_service,
+        preroll_seconds=args.preroll,
+        barge_in=args.barge_in,
+        conversation_journal=args.journal,
+        journal_max_messages=args.journal_max,
+        gesture_model=args.gesture_model,
+        finger_mode="angles" if args.finger_angles else "position",
+        smoothing=args.smooth,
+        detect_every=settings["detect_every"],
+        dynamic_gestures=args.dynamic_gestures,
+        inference_width=settings["inference_width"] or None,
+        hand_backend=args.hand_backend,
+        model_complexity=settings["model_complexity"],
+        whisper_model=settings["whisper_model"]
     )
     assistente.run()
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento dos áudios gravados
+Diretório gerenciado com cota de tamanho e idade: quando a cota estoura, os
+arquivos usados há mais tempo são apagados primeiro (LRU). Opcionalmente
+grava comprimido (FLAC ou Opus, via soundfile) em vez de WAV.
+
+Só os arquivos criados pelo próprio armazenamento (nome
+"<prefixo>_AAAAMMDD_HHMMSS_micro.<ext>") entram na cota: outros áudios no
+mesmo diretório nunca são apagados.
+
+Configuração por variáveis de ambiente (ou argumentos do AudioStore):
+    AUDIO_STORE_DIR       diretório (padrão: temp/ ao lado deste arquivo)
+    AUDIO_STORE_FORMAT    wav, flac ou opus (padrão: wav)
+    AUDIO_STORE_MAX_MB    tamanho máximo total (padrão: 200)
+    AUDIO_STORE_MAX_DAYS  idade máxima dos arquivos (padrão: 7)
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from startup import lazy_import
+
+wavfile = lazy_import("scipy.io.wavfile")
+soundfile = lazy_import("soundfile")
+
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
+
+# formato -> (extensão, formato e subtipo do soundfile)
+FORMATS = {
+    "wav": (".wav", None, None),
+    "flac": (".flac", "FLAC", "PCM_16"),
+    "opus": (".ogg", "OGG", "OPUS"),
+}
+
+# Um AudioStore por diretório: vários gravadores no mesmo diretório dividem a cota
+_shared_stores = {}
+_shared_lock = threading.Lock()
+
+
+class AudioStore:
+    """
+    Diretório de áudios com cota de tamanho/idade e remoção LRU.
+
+    Uso:
+        store = AudioStore(max_bytes=50 * 1024 * 1024, audio_format="flac")
+        path = store.save(audio, 16000)
+    """
+
+    def __init__(self, directory=None, max_bytes=None, max_age=None, audio_format=None,
+                 prefix="comando"):
+        """
+        Args:
+            directory (str): Diretório dos áudios (convertido para caminho absoluto)
+            max_bytes (int): Tamanho máximo total em bytes
+            max_age (float): Idade máxima dos arquivos em segundos (None ou 0 desativa)
+            audio_format (str): "wav", "flac" ou "opus" (estes dois exigem soundfile)
+            prefix (str): Prefixo dos arquivos gravados; só arquivos com este
+                prefixo (e o carimbo de data) são indexados e apagados
+        """
+        directory = directory or os.getenv("AUDIO_STORE_DIR") or DEFAULT_DIRECTORY
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("AUDIO_STORE_MAX_MB", "200")) * 1024 * 1024)
+        if max_age is None:
+            max_age = float(os.getenv("AUDIO_STORE_MAX_DAYS", "7")) * 86400
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.audio_format = self._check_format(audio_format or os.getenv("AUDIO_STORE_FORMAT", "wav"))
+        self.prefix = prefix
+        extensions = "|".join(re.escape(extension) for extension, _, _ in FORMATS.values())
+        self._own_name = re.compile(rf"{re.escape(prefix)}_\d{{8}}_\d{{6}}_\d{{6}}({extensions})",
+                                    re.IGNORECASE)
+
+        self._lock = threading.Lock()
+        self._files = OrderedDict()   # caminho -> (bytes, último uso); do menos ao mais recente
+        self.total_bytes = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def _check_format(audio_format):
+        audio_format = audio_format.lower()
+        if audio_format not in FORMATS:
+            raise ValueError(f"Formato de áudio desconhecido: {audio_format} "
+                             f"(opções: {', '.join(FORMATS)})")
+        if audio_format != "wav":
+            try:
+                soundfile.available_formats()
+            except (ImportError, OSError) as e:
+                print(f"[AUDIO] {audio_format.upper()} indisponível ({e}), gravando WAV")
+                return "wav"
+        return audio_format
+
+    def _scan(self):
+        """Indexa os arquivos já gravados por um AudioStore (último uso = modificação)"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and self._own_name.fullmatch(entry.name):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+
+        with self._lock:
+            for mtime, path, size in sorted(entries):
+                self._files[path] = (size, mtime)
+                self.total_bytes += size
+        self.enforce_quota()
+
+    def new_path(self):
+        """Caminho absoluto para um novo arquivo no formato configurado"""
+        extension = FORMATS[self.audio_format][0]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        return os.path.join(self.directory, f"{self.prefix}_{timestamp}{extension}")
+
+    def save(self, audio, sample_rate):
+        """
+        Grava um áudio e aplica a cota.
+
+        Args:
+            audio (numpy.ndarray): Áudio float32 em [-1, 1]
+            sample_rate (int): Taxa de amostragem
+
+        Returns:
+            str: Caminho absoluto do arquivo
+        """
+        path = self.new_path()
+        samples = np.clip(np.asarray(audio, dtype=np.float32).reshape(-1), -1.0, 1.0)
+
+        if self.audio_format == "wav":
+            wavfile.write(path, sample_rate, np.int16(samples * 32767))
+        else:
+            _, file_format, subtype = FORMATS[self.audio_format]
+            if self.audio_format == "opus" and sample_rate not in (8000, 12000, 16000, 24000, 48000):
+                raise ValueError(f"Opus não suporta {sample_rate} Hz")
+            soundfile.write(path, samples, sample_rate, format=file_format, subtype=subtype)
+
+        self.add(path)
+        return path
+
+    def add(self, path):
+        """Registra um arquivo gravado por fora e aplica a cota"""
+        size = os.path.getsize(path)
+        with self._lock:
+            previous = self._files.pop(path, None)
+            if previous is not None:
+                self.total_bytes -= previous[0]
+            self._files[path] = (size, time.time())
+            self.total_bytes += size
+        self.enforce_quota(keep=path)
+
+    def touch(self, path):
+        """Marca um arquivo como usado agora (vai para o fim da fila de remoção)"""
+        with self._lock:
+            if path in self._files:
+                size, _ = self._files.pop(path)
+                self._files[path] = (size, time.time())
+
+    def remove(self, path):
+        """Apaga um arquivo do armazenamento"""
+        with self._lock:
+            entry = self._files.pop(path, None)
+            if entry is not None:
+                self.total_bytes -= entry[0]
+        os.remove(path)
+
+    def load(self, path):
+        """
+        Lê um áudio do armazenamento.
+
+        Returns:
+            tuple: (áudio float32 mono, taxa de amostragem)
+        """
+        self.touch(path)
+        if path.lower().endswith(".wav"):
+            sample_rate, data = wavfile.read(path)
+            if data.dtype.kind in "iu":
+                data = data.astype(np.float32) / np.iinfo(data.dtype).max
+        else:
+            data, sample_rate = soundfile.read(path, dtype="float32")
+        if data.ndim > 1:
+            data = data.mean(axis=1)
+        return data.astype(np.float32), sample_rate
+
+    def enforce_quota(self, keep=None):
+        """
+        Apaga arquivos velhos demais e, se o total passar de `max_bytes`, os
+        usados há mais tempo.
+
+        Args:
+            keep (str): Arquivo que nunca é apagado (o que acabou de ser gravado)
+
+        Returns:
+            int: Arquivos apagados
+        """
+        now = time.time()
+        victims = []
+        with self._lock:
+            for path, (size, last_used) in list(self._files.items()):
+                if path == keep:
+                    continue
+                too_old = self.max_age and now - last_used > self.max_age
+                if not too_old and self.total_bytes <= self.max_bytes:
+                    break   # Ordenado por último uso: os seguintes são mais recentes
+                del self._files[path]
+                self.total_bytes -= size
+                victims.append(path)
+
+        for path in victims:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[AUDIO] Não foi possível apagar {path}: {e}")
+        return len(victims)
+
+    def usage(self):
+        """
+        Returns:
+            tuple: (quantidade de arquivos, bytes ocupados)
+        """
+        with self._lock:
+            return len(self._files), self.total_bytes
+
+
+def shared_store(directory=None, **kwargs):
+    """
+    AudioStore compartilhado do diretório (criado na primeira chamada).
+
+    Gravadores que usam o mesmo diretório precisam do mesmo índice: com um
+    AudioStore por gravador, cada um só conhece os próprios arquivos e a
+    cota do diretório estoura.
+
+    Args:
+        directory (str): Diretório dos áudios (padrão: AUDIO_STORE_DIR ou temp/)
+        **kwargs: Demais argumentos do AudioStore (usados só na criação)
+
+    Returns:
+        AudioStore: O armazenamento do diretório
+    """
+    directory = directory or os.getenv("AUDIO_STORE_DIR") or DEFAULT_DIRECTORY
+    key = os.path.realpath(os.path.expanduser(directory))
+    with _shared_lock:
+        store = _shared_stores.get(key)
+        if store is None:
+            store = _shared_stores[key] = AudioStore(directory=key, **kwargs)
+        return store
+
+
+# Exemplo de uso: mostra o uso atual e aplica a cota
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Armazenamento dos áudios gravados")
+    parser.add_argument("--dir", default=None, help="Diretório (padrão: AUDIO_STORE_DIR ou temp/)")
+    parser.add_argument("--max-mb", type=float, default=None, help="Tamanho máximo total em MB")
+    parser.add_argument("--max-days", type=float, default=None, help="Idade máxima em dias")
+    args = parser.parse_args()
+
+    store = AudioStore(
+        directory=args.dir,
+        max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None,
+        max_age=args.max_days * 86400 if args.max_days is not None else None,
+    )
+    files, total = store.usage()
+    print(f"{store.directory}: {files} arquivos, {total / 1024 / 1024:.1f} MB "
+          f"(cota {store.max_bytes / 1024 / 1024:.0f} MB, formato {store.audio_format})")
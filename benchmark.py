@@ -0,0 +1,586 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks do pipeline gesto -> ação
+Mede o throughput de cada etapa com dados sintéticos ou gravados (sem
+webcam, microfone, modelo Whisper nem provider de IA real) e salva os
+resultados em JSON para comparar versões
+
+Uso:
+    python benchmark.py                          # Roda tudo
+    python benchmark.py -k gesture               # Apenas benchmarks com "gesture" no nome
+    python benchmark.py -o atual.json --compare base.json
+    python benchmark.py -k detect_hands --footage gravacao.mp4   # Backends do MediaPipe
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Registra uma função de benchmark.
+
+    A função recebe o dicionário de opções e retorna (chamada, descrição):
+    `chamada` é o callable sem argumentos que será cronometrado.
+    """
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class SkipBenchmark(Exception):
+    """Dependência indisponível para um benchmark"""
+
+
+def measure(call, rounds=20, min_round_time=0.05):
+    """
+    Cronometra um callable.
+
+    Calibra quantas chamadas cabem em `min_round_time`, depois roda
+    `rounds` rodadas com esse número de chamadas.
+
+    Args:
+        call (callable): Função sem argumentos a medir
+        rounds (int): Número de rodadas
+        min_round_time (float): Duração mínima de cada rodada em segundos
+
+    Returns:
+        dict: Estatísticas por chamada (em segundos) e operações por segundo
+    """
+    timer = time.perf_counter
+
+    # Aquecimento + calibração
+    number = 1
+    while number < 1_000_000:
+        start = timer()
+        for _ in range(number):
+            call()
+        elapsed = timer() - start
+        if elapsed >= min_round_time:
+            break
+        number = min(1_000_000, max(number * 2, int(number * min_round_time / max(elapsed, 1e-9))))
+
+    samples = []
+    for _ in range(rounds):
+        start = timer()
+        for _ in range(number):
+            call()
+        samples.append((timer() - start) / number)
+
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "calls_per_round": number,
+        "rounds": rounds,
+        "min": samples[0],
+        "mean": statistics.fmean(samples),
+        "median": median,
+        "p95": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_sec": 1.0 / median if median > 0 else float("inf"),
+    }
+
+
+# ===== DADOS SINTÉTICOS =====
+
+def synthetic_hand(rng, width=1280, height=720):
+    """Gera uma mão com landmarks aleatórios plausíveis"""
+    cx, cy = rng.randint(200, width - 200), rng.randint(200, height - 200)
+    coords = [(cx + rng.randint(-150, 150), cy + rng.randint(-150, 150), rng.randint(-60, 20))
+              for _ in range(21)]
+    return {'coordenadas': coords, 'side': rng.choice(('Left', 'Right'))}
+
+
+def load_hands(options):
+    """Mãos gravadas (--landmarks) ou sintéticas para os benchmarks de gestos"""
+    if options.get("landmarks"):
+        from landmark_recorder import LandmarkStream
+        stream = LandmarkStream(options["landmarks"])
+        hands = [hand for _, frame_hands in stream for hand in frame_hands]
+        if hands:
+            return hands
+    rng = random.Random(42)
+    return [synthetic_hand(rng) for _ in range(1000)]
+
+
+def cycle(items):
+    """Callable que devolve os itens em sequência circular"""
+    state = {"i": 0}
+    count = len(items)
+
+    def next_item():
+        item = items[state["i"]]
+        state["i"] = (state["i"] + 1) % count
+        return item
+    return next_item
+
+
+# ===== BENCHMARKS =====
+
+@benchmark("gesture.count_fingers")
+def bench_count_fingers(options):
+    from gesture_recognition import GestureRecognizer
+    recognizer = GestureRecognizer()
+    next_hand = cycle(load_hands(options))
+    return lambda: recognizer.count_fingers(next_hand()), "GestureRecognizer.count_fingers por mão"
+
+
+@benchmark("gesture.count_fingers_angles")
+def bench_count_fingers_angles(options):
+    from gesture_recognition import GestureRecognizer
+    recognizer = GestureRecognizer(finger_mode="angles")
+    next_hand = cycle(load_hands(options))
+    return lambda: recognizer.count_fingers(next_hand()), "count_fingers pelos ângulos das articulações"
+
+
+@benchmark("gesture.recognize_gesture")
+def bench_recognize_gesture(options):
+    from gesture_recognition import GestureRecognizer
+    recognizer = GestureRecognizer()
+    next_hand = cycle(load_hands(options))
+    return lambda: recognizer.recognize_gesture(next_hand()), "GestureRecognizer.recognize_gesture por mão"
+
+
+@benchmark("gesture.classifier")
+def bench_gesture_classifier(options):
+    from gesture_classifier import GestureClassifier, features
+    from gesture_recognition import GestureRecognizer
+    import numpy as np
+
+    # Modelo treinado rapidamente com os rótulos das regras
+    hands = load_hands(options)
+    rules = GestureRecognizer()
+    labels = [rules.recognize_gesture(hand) for hand in hands]
+    classes = sorted(set(labels))
+    classifier = GestureClassifier(classes)
+    classifier.fit(np.array([features(hand) for hand in hands]),
+                   np.array([classes.index(label) for label in labels]), epochs=5)
+
+    recognizer = GestureRecognizer(classifier=classifier)
+    next_hand = cycle(hands)
+    return lambda: recognizer.recognize_gesture(next_hand()), "GestureClassifier (MLP) por mão"
+
+
+class _FakeLandmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class _FakeHandResult:
+    """Imita o resultado de mp.solutions.hands.Hands.process com uma mão"""
+
+    def __init__(self, rng):
+        landmarks = type("Landmarks", (), {})()
+        landmarks.landmark = [_FakeLandmark(rng.random(), rng.random(), rng.random() * 0.1)
+                              for _ in range(21)]
+        classification = type("Classification", (), {"label": "Left"})()
+        handedness = type("Handedness", (), {"classification": [classification]})()
+        self.multi_hand_landmarks = [landmarks]
+        self.multi_handedness = [handedness]
+
+
+@benchmark("detect_hands.extraction")
+def bench_detect_hands(options):
+    try:
+        import numpy as np
+        from assistente_gestos import AssistenteGestos
+        from hand_detector import HandDetector
+    except ImportError as e:
+        raise SkipBenchmark(str(e))
+
+    result = _FakeHandResult(random.Random(7))
+    fake_hands = type("FakeHands", (), {"process": lambda self, img: result})()
+
+    # Instância sem __init__ (não abre câmera nem carrega o MediaPipe)
+    assistant = AssistenteGestos.__new__(AssistenteGestos)
+    assistant.hand_detector = HandDetector(hands=fake_hands)
+    assistant.landmark_filter = None
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+    return (lambda: assistant.detect_hands(frame, draw=False),
+            "detect_hands (cvtColor + extração de 21 landmarks, inferência simulada)")
+
+
+def _footage_frames(options, limit=150):
+    """Frames espelhados de uma gravação (--footage), como no loop dos assistentes"""
+    if not options.get("footage"):
+        raise SkipBenchmark("sem --footage")
+    try:
+        import cv2
+        from frame_source import open_source
+    except ImportError as e:
+        raise SkipBenchmark(str(e))
+
+    source = open_source(options["footage"], realtime=False)
+    frames = []
+    try:
+        while len(frames) < limit:
+            ret, frame = source.read()
+            if not ret:
+                break
+            frames.append(cv2.flip(frame, 1))
+    finally:
+        source.release()
+    if not frames:
+        raise SkipBenchmark(f"nenhum frame em {options['footage']}")
+    return frames
+
+
+def _backend_bench(options, backend, description, **detector_options):
+    frames = _footage_frames(options)
+    try:
+        from hand_detector import create_hand_detector
+        detector = create_hand_detector(backend, inference_width=options.get("inference_width"),
+                                        **detector_options)
+    except (ImportError, FileNotFoundError) as e:
+        raise SkipBenchmark(str(e))
+
+    next_frame = cycle(frames)
+    return lambda: detector.detect(next_frame()), description
+
+
+@benchmark("detect_hands.solutions_lite")
+def bench_backend_solutions_lite(options):
+    return _backend_bench(options, "solutions", "mp.solutions.hands, model_complexity=0 (síncrono)",
+                          model_complexity=0)
+
+
+@benchmark("detect_hands.solutions_full")
+def bench_backend_solutions_full(options):
+    return _backend_bench(options, "solutions", "mp.solutions.hands, model_complexity=1 (síncrono)",
+                          model_complexity=1)
+
+
+@benchmark("detect_hands.tasks_video")
+def bench_backend_tasks_video(options):
+    return _backend_bench(options, "tasks", "HandLandmarker em VIDEO (síncrono: custo da inferência)",
+                          running_mode="video")
+
+
+@benchmark("detect_hands.tasks_live")
+def bench_backend_tasks_live(options):
+    return _backend_bench(options, "tasks",
+                          "HandLandmarker em LIVE_STREAM (tempo que o loop fica bloqueado por frame)",
+                          running_mode="live_stream")
+
+
+@benchmark("gesture.dynamic_update")
+def bench_dynamic_gestures(options):
+    from dynamic_gestures import DynamicGestureRecognizer
+
+    recognizer = DynamicGestureRecognizer()
+    next_hand = cycle(load_hands(options))
+    clock = {"t": 0.0}
+
+    def step():
+        clock["t"] += 1 / 30
+        return recognizer.update([next_hand()], clock["t"])
+    return step, "DynamicGestureRecognizer.update (ring buffer, features O(1)) por frame"
+
+
+@benchmark("landmarks.one_euro")
+def bench_landmark_filter(options):
+    from landmark_filter import LandmarkFilter
+
+    smoother = LandmarkFilter()
+    next_hand = cycle(load_hands(options))
+    clock = {"t": 0.0}
+
+    def step():
+        clock["t"] += 1 / 30
+        return smoother.update([next_hand()], clock["t"])
+    return step, "LandmarkFilter.update (One-Euro, 21 landmarks) por frame"
+
+
+@benchmark("command.execute_large_table")
+def bench_command_execute(options):
+    from command_catalog import DEFAULT_PATH
+    from command_executor import CommandExecutor
+    from command_history import CommandHistory
+
+    # Catálogo padrão + atalhos sintéticos, em um arquivo temporário
+    with open(DEFAULT_PATH, 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    aliases = options.get("aliases", 5000)
+    catalog["commands"] += [{"action": "reply", "aliases": [f"atalho sintetico {i:05d}"], "message": "ok"}
+                            for i in range(aliases)]
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, ensure_ascii=False)
+    # Só as palavras-chave (o índice semântico tem o próprio benchmark)
+    executor = CommandExecutor(history=CommandHistory(":memory:"), catalog_path=path, intents=False)
+    os.remove(path)
+
+    queries = cycle([
+        f"executar atalho sintetico {aliases - 1:05d}",   # Acerto no fim da tabela
+        "frase que nao corresponde a nenhum comando",     # Falha (varre a tabela toda)
+    ])
+    return (lambda: executor.execute(queries()),
+            f"CommandExecutor.execute com {len(executor.commands)} aliases")
+
+
+@benchmark("command.intent_match")
+def bench_intent_match(options):
+    from command_catalog import CommandCatalog
+    from intent_index import IntentIndex
+
+    catalog = CommandCatalog()
+    # Arquivo ainda inexistente (um .npz vazio seria lido como índice inválido)
+    with tempfile.TemporaryDirectory(prefix="bench_intents_") as directory:
+        intents = IntentIndex(path=os.path.join(directory, "intents.npz"))
+        intents.build(catalog.index)   # Vetores do catálogo: uma vez, fora da medição
+
+    phrases = cycle(["aumenta o som", "tira um print da tela", "qual a capital da frança",
+                     "toca a próxima", "me conte uma piada"])
+    return (lambda: intents.match(phrases(), catalog.index),
+            f"IntentIndex.match (embedding hash + similaridade com {len(intents.vectors.keywords)} textos)")
+
+
+class _StubWhisper:
+    """Modelo Whisper falso: mede só a sobrecarga ao redor da transcrição"""
+
+    def transcribe(self, audio, **kwargs):
+        return {"text": " comando de teste", "segments": [], "language": kwargs.get("language")}
+
+
+def _make_voice_recorder(decoding="default"):
+    # O VoiceRecorder só importa o SciPy no primeiro uso: verifica antes
+    if importlib.util.find_spec("scipy") is None:
+        raise SkipBenchmark("No module named 'scipy'")
+    try:
+        import numpy as np
+        from voice_recognition import VoiceRecorder
+    except ImportError as e:
+        raise SkipBenchmark(str(e))
+
+    recorder = VoiceRecorder(model_size="tiny", decoding=decoding)
+    recorder.model = _StubWhisper()
+    audio = (np.random.default_rng(0).standard_normal((5 * recorder.sample_rate, 1)) * 0.1
+             ).astype(np.float32)
+    return recorder, audio
+
+
+@benchmark("voice.save_audio")
+def bench_save_audio(options):
+    recorder, audio = _make_voice_recorder()
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_audio_"), "bench.wav")
+    return lambda: recorder.save_audio(audio, path), "VoiceRecorder.save_audio (5 s, WAV 16 kHz)"
+
+
+@benchmark("voice.transcribe_stub")
+def bench_transcribe(options):
+    recorder, audio = _make_voice_recorder()
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_audio_"), "bench.wav")
+    recorder.save_audio(audio, path)
+    model = options.get("whisper_model")
+    if model:
+        recorder.model = None
+        recorder.model_size = model
+        recorder.load_model()
+    return (lambda: recorder.transcribe_audio(path),
+            f"VoiceRecorder.transcribe_audio ({model or 'modelo falso'})")
+
+
+@benchmark("voice.transcribe_command")
+def bench_transcribe_command(options):
+    from command_executor import CommandExecutor
+    from command_history import CommandHistory
+
+    recorder, audio = _make_voice_recorder(decoding="command")
+    executor = CommandExecutor(history=CommandHistory(":memory:"))
+    recorder.set_vocabulary(executor.get_available_commands())
+    audio[:recorder.sample_rate] = 0   # 1 s de silêncio removido antes de decodificar
+    model = options.get("whisper_model")
+    if model:
+        recorder.model = None
+        recorder.model_size = model
+        recorder.load_model()
+    return (lambda: recorder.transcribe_audio(audio),
+            f"transcribe_audio perfil 'command' ({model or 'modelo falso'})")
+
+
+class _FakeOllama:
+    """Provider local falso com a mesma interface do cliente ollama"""
+
+    def chat(self, model, messages, **kwargs):
+        return {"message": {"role": "assistant", "content": "Resposta curta de teste."}}
+
+
+@benchmark("ai.chat_fake_provider")
+def bench_ai_chat(options):
+    from ai_assistant import AIAssistant
+
+    ai = AIAssistant(provider="ollama")
+    ai.client = _FakeOllama()
+
+    def chat():
+        # Conversa de tamanho realista (não cresce indefinidamente)
+        if len(ai.conversation_history) >= 20:
+            ai.conversation_history = []
+        ai.chat("Qual é a capital do Brasil?")
+
+    return chat, "AIAssistant.chat com provider falso (sobrecarga local)"
+
+
+@benchmark("ai.chat_journal")
+def bench_ai_chat_journal(options):
+    from ai_assistant import AIAssistant
+
+    ai = AIAssistant(provider="ollama")
+    ai.client = _FakeOllama()
+    ai.open_journal(os.path.join(tempfile.mkdtemp(prefix="bench_journal_"), "conversa.jsonl"))
+
+    # O diário cresce a cada rodada: o custo por turno deve continuar constante
+    return (lambda: ai.chat("Qual é a capital do Brasil?"),
+            "AIAssistant.chat com diário JSONL (acréscimo por turno)")
+
+
+# ===== EXECUÇÃO =====
+
+def git_version():
+    """Identificador da versão atual do código"""
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "desconhecida"
+
+
+def run_benchmarks(options, name_filter=None, quiet=False):
+    """
+    Roda os benchmarks registrados.
+
+    Args:
+        options (dict): Opções repassadas às funções de benchmark
+        name_filter (str): Substring para selecionar benchmarks
+        quiet (bool): Suprimir prints das funções medidas
+
+    Returns:
+        dict: Resultados por nome de benchmark
+    """
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+
+        try:
+            call, description = setup(options)
+        except SkipBenchmark as e:
+            print(f"  {name:<32} PULADO ({e})")
+            results[name] = {"skipped": str(e)}
+            continue
+
+        stdout = sys.stdout
+        if quiet:
+            sys.stdout = open(os.devnull, 'w')
+        try:
+            stats = measure(call, rounds=options.get("rounds", 20))
+        finally:
+            if quiet:
+                sys.stdout.close()
+                sys.stdout = stdout
+
+        stats["description"] = description
+        results[name] = stats
+        print(f"  {name:<32} {stats['median'] * 1e6:>12.2f} µs  "
+              f"(p95 {stats['p95'] * 1e6:.2f} µs, {stats['ops_per_sec']:,.0f} ops/s)")
+    return results
+
+
+def compare(results, baseline_path, threshold=0.10):
+    """
+    Compara resultados com uma execução anterior.
+
+    Args:
+        results (dict): Resultados atuais
+        baseline_path (str): JSON gerado por uma execução anterior
+        threshold (float): Piora relativa da mediana considerada regressão
+
+    Returns:
+        list: Nomes dos benchmarks que regrediram
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    print(f"\nComparação com {baseline_path} (versão {baseline.get('version')}):")
+    regressions = []
+    for name, stats in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old or "median" not in old or "median" not in stats:
+            continue
+        change = stats["median"] / old["median"] - 1.0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- REGRESSÃO"
+            regressions.append(name)
+        print(f"  {name:<32} {change:+8.1%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline gesto -> ação")
+    parser.add_argument("-k", dest="filter", default=None, help="Rodar apenas benchmarks contendo este texto")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="Arquivo JSON de saída")
+    parser.add_argument("--compare", metavar="JSON", default=None, help="Resultados anteriores para comparação")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Piora relativa considerada regressão")
+    parser.add_argument("--rounds", type=int, default=20, help="Rodadas por benchmark")
+    parser.add_argument("--aliases", type=int, default=5000, help="Aliases sintéticos na tabela de comandos")
+    parser.add_argument("--landmarks", default=None, help="Gravação de landmarks para os benchmarks de gestos")
+    parser.add_argument("--whisper-model", default=None, help="Usar um modelo Whisper real (ex.: tiny)")
+    parser.add_argument("--footage", default=None,
+                        help="Vídeo ou diretório de imagens para comparar os backends de detecção")
+    parser.add_argument("--inference-width", type=int, default=None,
+                        help="Largura de inferência nos benchmarks com --footage")
+    args = parser.parse_args()
+
+    options = {
+        "rounds": args.rounds,
+        "aliases": args.aliases,
+        "landmarks": args.landmarks,
+        "whisper_model": args.whisper_model,
+        "footage": args.footage,
+        "inference_width": args.inference_width,
+    }
+
+    print("\n" + "="*60)
+    print("BENCHMARKS DO PIPELINE")
+    print("="*60)
+    results = run_benchmarks(options, args.filter, quiet=True)
+
+    report = {
+        "version": git_version(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "options": options,
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em: {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n[X] {len(regressions)} regressão(ões) acima de {args.threshold:.0%}")
+            sys.exit(1)
+    print("="*60 + "\n")
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+Calibração da máquina e perfil de configuração
+Na primeira execução (ou com --calibrate) mede rapidamente o custo de cada
+subsistema nesta máquina: inferência de mãos, RTF do Whisper e tokens/s do
+modelo de IA local. Depois escolhe, para cada um, a opção mais pesada que
+ainda cabe na latência alvo. O perfil é salvo em JSON e reaproveitado nas
+próximas inicializações; argumentos passados na linha de comando têm
+precedência sobre o perfil.
+
+Configuração: MACHINE_PROFILE (padrão: machine_profile.json ao lado deste arquivo)
+
+Uso:
+    python calibration.py                     # Calibra e salva o perfil
+    python calibration.py --show              # Mostra o perfil salvo
+    python assistente_ia.py --calibrate       # Recalibra antes de iniciar
+"""
+import json
+import math
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "machine_profile.json")
+
+PROFILE_VERSION = 1
+
+# Valores usados sem perfil (os mesmos que os assistentes usavam fixos)
+DEFAULT_SETTINGS = {
+    "whisper_model": "base",
+    "ai_model": "deepseek-r1:1.5b",
+    "model_complexity": 1,
+    "inference_width": 0,       # 0 = resolução da câmera
+    "detect_every": 1,
+    "camera_width": 1280,
+    "camera_height": 720,
+}
+
+# Opções em ordem de custo; a calibração fica com a mais pesada que cabe no alvo
+HAND_LADDER = ((1, 0), (1, 640), (0, 640), (0, 320))    # (model_complexity, inference_width)
+WHISPER_LADDER = ("tiny", "base", "small")
+OLLAMA_LADDER = ("llama3.2:1b", "deepseek-r1:1.5b", "llama3.2:3b")
+
+COMMAND_SECONDS = 3.0   # Duração típica de um comando de voz
+REPLY_TOKENS = 60       # Resposta típica (2-3 frases)
+
+
+def load_profile(path=None):
+    """
+    Lê o perfil salvo.
+
+    Returns:
+        dict or None: Perfil ou None se não existir / for inválido
+    """
+    path = path or os.getenv("MACHINE_PROFILE") or DEFAULT_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"[PERFIL] Perfil inválido em {path}, usando padrões: {e}")
+        return None
+    if profile.get("version") != PROFILE_VERSION:
+        return None
+    return profile
+
+
+def save_profile(profile, path=None):
+    """Grava o perfil (arquivo temporário + rename: nunca fica pela metade)"""
+    path = path or os.getenv("MACHINE_PROFILE") or DEFAULT_PATH
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def resolve_settings(args=None, profile=None):
+    """
+    Combina padrões, perfil e linha de comando (nesta ordem de precedência).
+
+    Args:
+        args (argparse.Namespace): Argumentos; atributos None ou ausentes
+            não sobrescrevem o perfil
+        profile (dict): Perfil carregado (opcional)
+
+    Returns:
+        dict: Configuração final com as chaves de DEFAULT_SETTINGS
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    if profile:
+        settings.update({key: value for key, value in profile.get("settings", {}).items()
+                         if key in DEFAULT_SETTINGS})
+    for key in DEFAULT_SETTINGS:
+        value = getattr(args, key, None)
+        if value is not None:
+            settings[key] = value
+    return settings
+
+
+def _median_time(call, repeat, warmup=2):
+    for _ in range(warmup):
+        call()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+# ===== MEDIÇÕES =====
+
+def _calibration_frames(footage=None, count=20):
+    """Frames gravados ou ruído 1280x720 (sem mão: detector de palma em todo frame, pior caso)"""
+    if footage:
+        import cv2
+        from frame_source import open_source
+        source = open_source(footage, realtime=False)
+        frames = []
+        try:
+            while len(frames) < count:
+                ret, frame = source.read()
+                if not ret:
+                    break
+                frames.append(cv2.flip(frame, 1))
+        finally:
+            source.release()
+        if frames:
+            return frames
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def measure_hands(budget, footage=None, repeat=20):
+    """
+    Mede a detecção de mãos nas opções de HAND_LADDER até uma caber no orçamento.
+
+    Args:
+        budget (float): Tempo máximo de detecção por frame (s)
+
+    Returns:
+        tuple: (medições {"c1@0": s, ...}, configuração escolhida)
+    """
+    from hand_detector import HandDetector
+
+    frames = _calibration_frames(footage)
+    timings = {}
+    for complexity, width in HAND_LADDER:
+        detector = HandDetector(model_complexity=complexity, inference_width=width or None)
+        state = {"i": 0}
+
+        def detect():
+            detector.detect(frames[state["i"] % len(frames)])
+            state["i"] += 1
+        try:
+            elapsed = _median_time(detect, repeat)
+        finally:
+            detector.close()
+        timings[f"c{complexity}@{width or 'full'}"] = elapsed
+        print(f"[CALIBRAÇÃO] Mãos (complexidade {complexity}, largura {width or 'original'}): "
+              f"{elapsed * 1000:.1f} ms")
+        if elapsed <= budget:
+            return timings, {"model_complexity": complexity, "inference_width": width,
+                             "detect_every": 1}
+
+    # Nem a opção mais leve cabe: detectar a cada N frames (filtro prevê os demais)
+    detect_every = min(3, math.ceil(elapsed / budget))
+    settings = {"model_complexity": complexity, "inference_width": width,
+                "detect_every": detect_every}
+    if detect_every > 1:
+        settings.update(camera_width=960, camera_height=540)
+    return timings, settings
+
+
+def _calibration_audio(audio=None, sample_rate=16000):
+    """Áudio gravado ou sinal sintético com envelope de fala (COMMAND_SECONDS)"""
+    if audio:
+        from voice_recognition import whisper
+        return whisper.load_audio(audio)
+    t = np.arange(int(COMMAND_SECONDS * sample_rate)) / sample_rate
+    rng = np.random.default_rng(0)
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3.0 * t) ** 2   # ~6 "sílabas" por segundo
+    signal = 0.1 * envelope * voiced + 0.005 * rng.standard_normal(len(t))
+    return signal.astype(np.float32)
+
+
+def measure_whisper(max_rtf, audio=None, repeat=2):
+    """
+    Mede o RTF dos modelos de WHISPER_LADDER, do menor para o maior, até um
+    passar de `max_rtf`.
+
+    Returns:
+        tuple: (medições {modelo: rtf}, modelo escolhido)
+    """
+    from voice_recognition import DECODING_PROFILES, whisper
+
+    samples = _calibration_audio(audio)
+    duration = len(samples) / 16000
+    timings = {}
+    chosen = WHISPER_LADDER[0]
+    for size in WHISPER_LADDER:
+        model = whisper.load_model(size)
+        elapsed = _median_time(
+            lambda m=model: m.transcribe(samples, language="pt", **DECODING_PROFILES["command"]),
+            repeat, warmup=1
+        )
+        model = None   # Liberar antes de carregar o próximo
+        rtf = timings[size] = elapsed / duration
+        print(f"[CALIBRAÇÃO] Whisper '{size}': RTF {rtf:.2f}")
+        if rtf > max_rtf:
+            break
+        chosen = size
+    return timings, chosen
+
+
+def measure_ollama(min_tokens_per_second, prompt="Explique em duas frases o que é um arco-íris."):
+    """
+    Mede tokens/s dos modelos de OLLAMA_LADDER instalados, do menor para o
+    maior, até um ficar abaixo de `min_tokens_per_second`.
+
+    Returns:
+        tuple: (medições {modelo: tokens/s}, modelo escolhido ou None)
+    """
+    import ollama
+
+    listed = ollama.list()
+    models = listed.get("models", []) if isinstance(listed, dict) else getattr(listed, "models", [])
+    installed = set()
+    for model in models:
+        if isinstance(model, dict):
+            installed.add(model.get("model") or model.get("name"))
+        else:
+            installed.add(model.model)
+    timings = {}
+    chosen = None
+    for name in OLLAMA_LADDER:
+        if name not in installed:
+            continue
+        ollama.generate(model=name, prompt="", keep_alive="1m")   # Carregar antes de medir
+        response = ollama.generate(model=name, prompt=prompt,
+                                   options={"num_predict": REPLY_TOKENS, "temperature": 0})
+        eval_count, eval_duration = response["eval_count"], response["eval_duration"]
+        rate = timings[name] = eval_count / (eval_duration / 1e9) if eval_duration else 0.0
+        print(f"[CALIBRAÇÃO] Ollama '{name}': {rate:.1f} tokens/s")
+        if rate < min_tokens_per_second:
+            break
+        chosen = name
+    if chosen is None and timings:
+        chosen = min(timings, key=lambda name: OLLAMA_LADDER.index(name))
+    return timings, chosen
+
+
+def calibrate(path=None, target_fps=30.0, transcribe_latency=1.5, reply_latency=3.0,
+              footage=None, audio=None, llm=True):
+    """
+    Mede a máquina, escolhe as configurações e salva o perfil.
+
+    Cada etapa que falhar ou não for medida (dependência ausente, Ollama
+    parado...) mantém o valor do perfil anterior, ou o padrão.
+
+    Args:
+        path (str): Arquivo do perfil (padrão: MACHINE_PROFILE ou machine_profile.json)
+        target_fps (float): FPS alvo do vídeo; a detecção de mãos pode usar
+            metade do tempo de cada frame
+        transcribe_latency (float): Segundos máximos para transcrever um
+            comando de COMMAND_SECONDS
+        reply_latency (float): Segundos máximos para gerar REPLY_TOKENS
+        footage (str): Vídeo/diretório para medir as mãos (padrão: ruído sintético)
+        audio (str): Áudio de comando para medir o Whisper (padrão: sintético)
+        llm (bool): Medir o Ollama
+
+    Returns:
+        dict: Perfil salvo
+    """
+    targets = {"target_fps": target_fps, "transcribe_latency": transcribe_latency,
+               "reply_latency": reply_latency}
+    previous = load_profile(path) or {}
+    settings = dict(previous.get("settings", {}))
+    measurements = dict(previous.get("measurements", {}))
+    start = time.perf_counter()
+
+    stages = [
+        ("hands", lambda: measure_hands(0.5 / target_fps, footage)),
+        ("whisper", lambda: measure_whisper(transcribe_latency / COMMAND_SECONDS, audio)),
+    ]
+    if llm:
+        stages.append(("ollama", lambda: measure_ollama(REPLY_TOKENS / reply_latency)))
+
+    for name, stage in stages:
+        try:
+            timings, chosen = stage()
+        except Exception as e:
+            print(f"[CALIBRAÇÃO] {name}: não medido ({e}); mantendo o valor atual")
+            continue
+        measurements[name] = timings
+        if name == "hands":
+            settings.update(chosen)
+        elif name == "whisper":
+            settings["whisper_model"] = chosen
+        elif chosen is not None:
+            settings["ai_model"] = chosen
+
+    profile = {
+        "version": PROFILE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "machine": platform.machine(),
+                    "cpus": os.cpu_count()},
+        "targets": targets,
+        "measurements": measurements,
+        "settings": resolve_settings(profile={"settings": settings}),
+    }
+    saved = save_profile(profile, path)
+    print(f"[CALIBRAÇÃO] Concluída em {time.perf_counter() - start:.1f}s; perfil salvo em {saved}")
+    describe(profile)
+    return profile
+
+
+def describe(profile):
+    """Mostra as configurações de um perfil"""
+    settings = profile["settings"]
+    hands = f"complexidade {settings['model_complexity']}, largura {settings['inference_width'] or 'original'}"
+    if settings["detect_every"] > 1:
+        hands += f", a cada {settings['detect_every']} frames"
+    print(f"[PERFIL] Whisper '{settings['whisper_model']}', IA '{settings['ai_model']}', "
+          f"mãos ({hands}), câmera {settings['camera_width']}x{settings['camera_height']}")
+
+
+def startup_profile(recalibrate=False, llm=True):
+    """
+    Perfil para a inicialização dos assistentes: recalibra se pedido, senão
+    reaproveita o salvo.
+
+    Returns:
+        dict or None: Perfil (None sem perfil salvo)
+    """
+    if recalibrate:
+        return calibrate(llm=llm)
+    profile = load_profile()
+    if profile is None:
+        print("[PERFIL] Sem perfil desta máquina (usando padrões); "
+              "rode com --calibrate para medir e ajustar")
+    else:
+        describe(profile)
+    return profile
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calibra os modelos e taxas para esta máquina")
+    parser.add_argument("--show", action="store_true", help="Mostrar o perfil salvo e sair")
+    parser.add_argument("-o", "--output", default=None, help="Arquivo do perfil")
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS alvo do vídeo")
+    parser.add_argument("--transcribe-latency", type=float, default=1.5,
+                        help="Segundos máximos para transcrever um comando de 3s")
+    parser.add_argument("--reply-latency", type=float, default=3.0,
+                        help="Segundos máximos para uma resposta curta da IA")
+    parser.add_argument("--footage", default=None, help="Vídeo ou diretório para medir as mãos")
+    parser.add_argument("--audio", default=None, help="Áudio de comando para medir o Whisper")
+    parser.add_argument("--no-llm", action="store_true", help="Não medir o Ollama")
+    args = parser.parse_args()
+
+    if args.show:
+        profile = load_profile(args.output)
+        if profile is None:
+            print("Nenhum perfil salvo.")
+        else:
+            print(json.dumps(profile, ensure_ascii=False, indent=2))
+    else:
+        calibrate(args.output, target_fps=args.fps, transcribe_latency=args.transcribe_latency,
+                  reply_latency=args.reply_latency, footage=args.footage, audio=args.audio,
+                  llm=not args.no_llm)
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Catálogo de comandos em arquivo
+As palavras-chave dos comandos de voz ficam em commands.json (ou YAML, com
+PyYAML instalado) em vez de no código. Ao carregar, o catálogo é compilado
+em um índice: uma única expressão regular (árvore de prefixos das
+palavras-chave, dentro de um lookahead para achar sobreposições) e a
+prioridade de cada palavra-chave. O arquivo é vigiado pelo mtime e
+recarregado sem reiniciar o assistente; a troca do índice é atômica e um
+arquivo inválido mantém o índice anterior.
+
+Formato:
+    {"version": 1, "commands": [
+        {"action": "open_chrome", "description": "...", "aliases": ["chrome", "abrir chrome"]},
+        {"action": "launch", "aliases": ["spotify"], "message": "Abrindo Spotify",
+         "targets": {"Windows": ["spotify.exe"], "Darwin": [["open", "-a", "Spotify"]],
+                     "Linux": ["spotify"]}},
+        {"action": "open_url", "aliases": ["previsão do tempo"], "url": "https://..."},
+        {"action": "reply", "aliases": ["bom dia"], "message": "Bom dia!"}
+    ]}
+
+Prioridade: ordem do arquivo (a primeira palavra-chave contida no texto
+vence, como na tabela antiga); "priority" (maior primeiro) reordena um comando.
+
+Configuração: COMMAND_CATALOG (padrão: commands.json ao lado deste arquivo)
+"""
+import json
+import os
+import re
+import threading
+import time
+
+from startup import lazy_import
+
+yaml = lazy_import("yaml")
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "commands.json")
+
+
+def compile_keywords(keywords):
+    """
+    Compila palavras-chave em uma regex de árvore de prefixos.
+
+    Em cada posição do texto o lookahead captura a palavra-chave mais longa
+    que começa ali; as mais curtas que começam no mesmo ponto são prefixos
+    dela (ver `CatalogIndex.best_rank`).
+
+    Args:
+        keywords (list): Palavras-chave (minúsculas)
+
+    Returns:
+        re.Pattern: Padrão `(?=(...))` para usar com finditer
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Fim de palavra-chave com continuação: tenta a mais longa primeiro
+        return f"(?:{body})?" if "" in node else body
+
+    return re.compile(f"(?=({build(trie)}))")
+
+
+class CatalogIndex:
+    """Catálogo compilado (imutável; trocado inteiro a cada recarga)"""
+
+    def __init__(self, entries, actions):
+        """
+        Args:
+            entries (list): Comandos, já em ordem de prioridade
+            actions (list): Ação (callable) de cada comando
+        """
+        self.entries = entries
+        self.keywords = []          # Em ordem de prioridade
+        self.actions = {}           # palavra-chave -> callable(texto)
+        self.entry_of = {}          # palavra-chave -> comando
+        for entry, action in zip(entries, actions):
+            for alias in entry["aliases"]:
+                keyword = alias.lower().strip()
+                if keyword and keyword not in self.actions:
+                    self.keywords.append(keyword)
+                    self.actions[keyword] = action
+                    self.entry_of[keyword] = entry
+
+        # Melhor prioridade entre a palavra-chave e as que são prefixos dela
+        rank = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self.best_rank = {}
+        for keyword in self.keywords:
+            prefixes = (rank.get(keyword[:n]) for n in range(1, len(keyword) + 1))
+            best = min(r for r in prefixes if r is not None)
+            self.best_rank[keyword] = (best, self.keywords[best])
+        self.pattern = compile_keywords(self.keywords) if self.keywords else None
+
+    def match(self, text):
+        """
+        Palavra-chave de maior prioridade contida no texto.
+
+        Args:
+            text (str): Texto em minúsculas
+
+        Returns:
+            str or None: Palavra-chave encontrada
+        """
+        if self.pattern is None:
+            return None
+        best = None
+        for found in self.pattern.finditer(text):
+            candidate = self.best_rank[found.group(1)]
+            if best is None or candidate[0] < best[0]:
+                best = candidate
+                if best[0] == 0:
+                    break
+        return best[1] if best else None
+
+
+class CommandCatalog:
+    """
+    Catálogo de comandos carregado de arquivo, com recarga automática.
+
+    Uso:
+        catalog = CommandCatalog(resolve=executor.resolve_action)
+        keyword, action = catalog.match("abrir o chrome")
+    """
+
+    def __init__(self, path=None, resolve=None, check_interval=1.0):
+        """
+        Args:
+            path (str): Arquivo JSON/YAML (padrão: COMMAND_CATALOG ou commands.json)
+            resolve (callable): comando (dict) -> ação callable(texto); deve
+                levantar ValueError para ações desconhecidas
+            check_interval (float): Intervalo mínimo (s) entre verificações do mtime
+        """
+        self.path = os.path.abspath(path or os.getenv("COMMAND_CATALOG") or DEFAULT_PATH)
+        self.resolve = resolve or (lambda entry: None)
+        self.check_interval = check_interval
+        self.listeners = []   # Chamados com a lista de palavras-chave após recarregar
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._last_check = 0.0
+        self.index = self._load()
+
+    def _read(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            if self.path.lower().endswith((".yaml", ".yml")):
+                return yaml.safe_load(f)
+            return json.load(f)
+
+    def _load(self):
+        """Lê e compila o arquivo (levanta exceção se for inválido)"""
+        stat = os.stat(self.path)
+        data = self._read()
+        commands = data.get("commands") if isinstance(data, dict) else None
+        if not isinstance(commands, list):
+            raise ValueError(f"{self.path}: esperado {{\"commands\": [...]}}")
+
+        for i, entry in enumerate(commands):
+            if not isinstance(entry, dict) or not entry.get("action") or not entry.get("aliases"):
+                raise ValueError(f"{self.path}: comando {i} sem 'action' ou 'aliases'")
+
+        # Maior "priority" primeiro; empate mantém a ordem do arquivo
+        entries = sorted(commands, key=lambda entry: -entry.get("priority", 0))
+        index = CatalogIndex(entries, [self.resolve(entry) for entry in entries])
+        self._stamp = (stat.st_mtime_ns, stat.st_size)
+        return index
+
+    def refresh(self, force=False):
+        """
+        Recarrega o catálogo se o arquivo mudou.
+
+        Args:
+            force (bool): Verificar agora, ignorando `check_interval`
+
+        Returns:
+            bool: True se um novo índice foi carregado
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        if not self._lock.acquire(blocking=False):
+            return False   # Outra thread já está verificando
+        try:
+            self._last_check = now
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return False
+            if (stat.st_mtime_ns, stat.st_size) == self._stamp:
+                return False
+            try:
+                index = self._load()
+            except Exception as e:
+                self._stamp = (stat.st_mtime_ns, stat.st_size)   # Não tentar de novo até mudar
+                print(f"[COMANDOS] Catálogo inválido, mantendo o anterior: {e}")
+                return False
+            self.index = index   # Troca atômica: quem já pegou o índice antigo termina com ele
+        finally:
+            self._lock.release()
+
+        print(f"[COMANDOS] Catálogo recarregado: {len(index.entries)} comandos, "
+              f"{len(index.keywords)} palavras-chave")
+        for listener in self.listeners:
+            listener(index.keywords)
+        return True
+
+    def match(self, text):
+        """
+        Returns:
+            tuple: (palavra-chave, ação) ou (None, None)
+        """
+        index = self.index
+        keyword = index.match(text)
+        return (keyword, index.actions[keyword]) if keyword else (None, None)
+
+    @property
+    def keywords(self):
+        return self.index.keywords
+
+    @property
+    def entries(self):
+        return self.index.entries
+
+
+# Valida um catálogo e testa frases
+if __name__ == "__main__":
+    import sys
+
+    catalog = CommandCatalog(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"{catalog.path}: {len(catalog.entries)} comandos, {len(catalog.keywords)} palavras-chave")
+    for phrase in sys.argv[2:]:
+        keyword = catalog.index.match(phrase.lower())
+        action = catalog.index.entry_of[keyword]["action"] if keyword else "-"
+        print(f"  {phrase!r} -> {keyword} ({action})")
@@ -2,12 +2,71 @@
 """
 Executor de Comandos Customizados
 Mapeia comandos de voz para ações específicas do sistema
+(palavras-chave em commands.json, ver command_catalog.py; frases sem
+palavra-chave passam pelo índice semântico de intent_index.py)
 """
+import functools
 import os
+import shutil
 import subprocess
+import time
 import webbrowser
 from datetime import datetime
 import platform
+from command_catalog import CommandCatalog
+from command_history import CommandHistory
+from intent_index import IntentIndex
+from startup import lazy_import
+
+# Dependências opcionais/específicas do Windows, importadas só quando usadas
+pyautogui = lazy_import("pyautogui")
+comtypes = lazy_import("comtypes")
+pycaw = lazy_import("pycaw.pycaw")
+
+# Caminhos de instalação conhecidos no Windows, por aplicativo
+WINDOWS_EXECUTABLES = {
+    "chrome": [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    ],
+    "word": [
+        r"C:\Program Files\Microsoft Office\root\Office16\WINWORD.EXE",
+        r"C:\Program Files (x86)\Microsoft Office\root\Office16\WINWORD.EXE",
+        r"C:\Program Files\Microsoft Office\Office16\WINWORD.EXE",
+        r"C:\Program Files (x86)\Microsoft Office\Office16\WINWORD.EXE",
+    ],
+    "excel": [
+        r"C:\Program Files\Microsoft Office\root\Office16\EXCEL.EXE",
+        r"C:\Program Files (x86)\Microsoft Office\root\Office16\EXCEL.EXE",
+        r"C:\Program Files\Microsoft Office\Office16\EXCEL.EXE",
+        r"C:\Program Files (x86)\Microsoft Office\Office16\EXCEL.EXE",
+    ],
+    "powerpoint": [
+        r"C:\Program Files\Microsoft Office\root\Office16\POWERPNT.EXE",
+        r"C:\Program Files (x86)\Microsoft Office\root\Office16\POWERPNT.EXE",
+        r"C:\Program Files\Microsoft Office\Office16\POWERPNT.EXE",
+        r"C:\Program Files (x86)\Microsoft Office\Office16\POWERPNT.EXE",
+    ],
+    "vscode": [
+        r"C:\Users\{}\AppData\Local\Programs\Microsoft VS Code\Code.exe".format(os.getenv("USERNAME")),
+        r"C:\Program Files\Microsoft VS Code\Code.exe",
+        r"C:\Program Files (x86)\Microsoft VS Code\Code.exe",
+    ],
+    "postman": [
+        r"C:\Users\{}\AppData\Local\Postman\Postman.exe".format(os.getenv("USERNAME")),
+        r"C:\Program Files\Postman\Postman.exe",
+        r"C:\Program Files (x86)\Postman\Postman.exe",
+    ],
+}
+
+# Ações implementadas neste arquivo (método _<nome>), usáveis no catálogo
+BUILTIN_ACTIONS = (
+    "open_browser", "open_chrome", "open_firefox", "open_edge",
+    "open_calculator", "open_notepad", "open_explorer", "open_terminal",
+    "open_word", "open_excel", "open_powerpoint", "open_vscode", "open_postman",
+    "volume_up", "volume_down", "mute", "next_track", "previous_track",
+    "tell_time", "tell_date", "screenshot", "search_web",
+)
 
 
 class CommandExecutor:
@@ -15,80 +74,52 @@ class CommandExecutor:
     Executa comandos específicos do sistema baseados em palavras-chave
     """
 
-    def __init__(self):
-        """Inicializa o executor de comandos"""
+    def __init__(self, history=None, catalog_path=None, intents=True):
+        """
+        Inicializa o executor de comandos.
+
+        Args:
+            history (CommandHistory): Onde registrar os comandos (None usa o
+                banco padrão; CommandHistory(":memory:") não persiste)
+            catalog_path (str): Catálogo de comandos JSON/YAML (None usa
+                COMMAND_CATALOG ou commands.json)
+            intents (IntentIndex or bool): Índice semântico para frases sem
+                palavra-chave (True cria o padrão, False desativa)
+        """
         self.system = platform.system()  # Windows, Linux, Darwin (macOS)
-        self.command_history = []
-
-        # Mapeamento de comandos com PALAVRAS-CHAVE SIMPLES
-        self.commands = {
-            # Navegadores - Comandos naturais e diretos
-            "navegador": self._open_browser,
-            "abrir navegador": self._open_browser,
-            "chrome": self._open_chrome,
-            "abrir chrome": self._open_chrome,
-            "google chrome": self._open_chrome,
-            "firefox": self._open_firefox,
-            "abrir firefox": self._open_firefox,
-            "edge": self._open_edge,
-            "abrir edge": self._open_edge,
-
-            # Aplicativos - Palavra única OU comando completo
-            "calculadora": self._open_calculator,
-            "abrir calculadora": self._open_calculator,
-            "calc": self._open_calculator,
-            "bloco de notas": self._open_notepad,
-            "abrir bloco de notas": self._open_notepad,
-            "notepad": self._open_notepad,
-            "explorador": self._open_explorer,
-            "abrir explorador": self._open_explorer,
-            "pasta": self._open_explorer,
-            "arquivos": self._open_explorer,
-            "terminal": self._open_terminal,
-            "abrir terminal": self._open_terminal,
-            "cmd": self._open_terminal,
-            "prompt": self._open_terminal,
-
-            # Aplicativos Profissionais
-            "word": self._open_word,
-            "abrir word": self._open_word,
-            "microsoft word": self._open_word,
-            "excel": self._open_excel,
-            "abrir excel": self._open_excel,
-            "powerpoint": self._open_powerpoint,
-            "abrir powerpoint": self._open_powerpoint,
-            "vscode": self._open_vscode,
-            "abrir vscode": self._open_vscode,
-            "visual studio code": self._open_vscode,
-            "code": self._open_vscode,
-            "postman": self._open_postman,
-            "abrir postman": self._open_postman,
-
-            # Sistema
-            "aumentar volume": self._volume_up,
-            "volume alto": self._volume_up,
-            "diminuir volume": self._volume_down,
-            "volume baixo": self._volume_down,
-            "silenciar": self._mute,
-            "mudo": self._mute,
-
-            # Utilidades
-            "que horas são": self._tell_time,
-            "horas": self._tell_time,
-            "hora": self._tell_time,
-            "que dia é hoje": self._tell_date,
-            "data": self._tell_date,
-            "dia": self._tell_date,
-            "tirar screenshot": self._screenshot,
-            "screenshot": self._screenshot,
-            "print screen": self._screenshot,
-
-            # Pesquisa
-            "pesquisar": self._search_web,
-            "buscar": self._search_web,
-            "procurar": self._search_web,
+        self.history = history if history is not None else CommandHistory()
+        self.command_history = self.history.recent  # Só os mais recentes, em memória
+        self._executables = {}  # aplicativo -> caminho encontrado (ou None)
+
+        # Preparação antecipada por ação (ver `prewarm`)
+        self._prewarmers = {
+            "_open_browser": self._warm_browser,
+            "_open_chrome": lambda: (self._find_executable("chrome"), self._warm_browser()),
+            "_open_firefox": self._warm_browser,
+            "_search_web": self._warm_browser,
+            "_open_word": lambda: self._find_executable("word"),
+            "_open_excel": lambda: self._find_executable("excel"),
+            "_open_powerpoint": lambda: self._find_executable("powerpoint"),
+            "_open_vscode": lambda: self._find_executable("vscode"),
+            "_open_postman": lambda: self._find_executable("postman"),
+            "_volume_up": self._warm_volume,
+            "_volume_down": self._warm_volume,
+            "_screenshot": lambda: pyautogui.screenshot,  # Importar o pyautogui (lento)
+            "_next_track": lambda: pyautogui.press,
+            "_previous_track": lambda: pyautogui.press,
         }
 
+        # Palavras-chave -> ações: catálogo em arquivo, recarregado ao mudar
+        self.catalog = CommandCatalog(catalog_path, resolve=self.resolve_action)
+        if intents is True:
+            intents = IntentIndex()
+        self.intents = intents or None
+
+    @property
+    def commands(self):
+        """Palavra-chave -> ação, na ordem de prioridade do catálogo atual"""
+        return self.catalog.index.actions
+
     def execute(self, command_text):
         """
         Executa um comando baseado no texto transcrito.
@@ -104,25 +135,125 @@ class CommandExecutor:
 
         command_lower = command_text.lower().strip()
 
-        # Verificar comandos diretos
-        for keyword, action in self.commands.items():
-            if keyword in command_lower:
-                try:
-                    result = action(command_lower)
-                    self.command_history.append({
-                        "timestamp": datetime.now().isoformat(),
-                        "command": command_text,
-                        "keyword": keyword,
-                        "success": True
-                    })
-                    return True, result
-                except Exception as e:
-                    error_msg = f"Erro ao executar '{keyword}': {str(e)}"
-                    return False, error_msg
+        # Verificar comandos diretos (uma busca no índice do catálogo)
+        start = time.perf_counter()
+        self.catalog.refresh()
+        keyword, action = self.catalog.match(command_lower)
+        if keyword is None and self.intents is not None:
+            # Paráfrase ("aumenta o som"): comando mais parecido, se for claro
+            index = self.catalog.index
+            keyword, score = self.intents.match(command_lower, index, self.catalog.path)
+            if keyword is not None:
+                action = index.actions[keyword]
+                print(f"[COMANDOS] Intenção reconhecida: '{keyword}' (similaridade {score:.2f})")
+        if keyword is not None:
+            try:
+                result = action(command_lower)
+                self.history.record(command_text, keyword, time.perf_counter() - start,
+                                    True, result)
+                return True, result
+            except Exception as e:
+                error_msg = f"Erro ao executar '{keyword}': {str(e)}"
+                self.history.record(command_text, keyword, time.perf_counter() - start,
+                                    False, error_msg)
+                return False, error_msg
 
         # Comando não reconhecido
+        self.history.record(command_text, None, time.perf_counter() - start, False)
         return False, None
 
+    # ===== CATÁLOGO =====
+
+    def resolve_action(self, entry):
+        """
+        Ação de um comando do catálogo.
+
+        "launch", "open_url" e "reply" são genéricas (configuradas no próprio
+        catálogo); os demais nomes são métodos deste executor (ex.:
+        "open_chrome" -> _open_chrome).
+
+        Args:
+            entry (dict): Comando do catálogo
+
+        Returns:
+            callable: Função (texto) -> mensagem
+        """
+        name = entry["action"]
+        if name == "launch":
+            return functools.partial(self._launch, entry)
+        if name == "open_url":
+            return functools.partial(self._open_url, entry)
+        if name == "reply":
+            return lambda text: entry["message"]
+        if name not in BUILTIN_ACTIONS:
+            raise ValueError(f"Ação desconhecida no catálogo: {name}")
+        return getattr(self, "_" + name)
+
+    def _launch_target(self, entry):
+        """Primeiro alvo do sistema atual que existe (caminho ou comando no PATH)"""
+        targets = entry.get("targets", {})
+        for target in targets.get(self.system, targets.get("default", [])):
+            argv = [target] if isinstance(target, str) else list(target)
+            program = os.path.expandvars(os.path.expanduser(argv[0]))
+            found = program if os.path.isabs(program) and os.path.exists(program) else shutil.which(program)
+            if found:
+                return [found] + argv[1:]
+        return None
+
+    def _launch(self, entry, text):
+        """Abre um programa configurado no catálogo"""
+        argv = self._launch_target(entry)
+        name = entry["aliases"][0]
+        if argv is None:
+            return f"{name} não encontrado neste sistema"
+        subprocess.Popen(argv)
+        return entry.get("message", f"Abrindo {name}")
+
+    def _open_url(self, entry, text):
+        """Abre um endereço configurado no catálogo"""
+        webbrowser.open(entry["url"])
+        return entry.get("message", f"Abrindo {entry['url']}")
+
+    # ===== PRÉ-AQUECIMENTO =====
+
+    def prewarm(self, keyword):
+        """
+        Prepara a ação de uma palavra-chave para que a próxima execução seja
+        mais rápida (resolve o executável, importa módulos, registra o
+        navegador). Não executa a ação.
+
+        Args:
+            keyword (str): Palavra-chave do comando
+
+        Returns:
+            bool: True se havia algo a preparar
+        """
+        action = self.commands.get(keyword)
+        warm = self._prewarmers.get(getattr(action, "__name__", None))
+        if warm is None:
+            return False
+        try:
+            warm()
+        except Exception as e:
+            print(f"[PREFETCH] Falha ao preparar '{keyword}': {e}")
+        return True
+
+    def _find_executable(self, app):
+        """Caminho do executável de um aplicativo no Windows (resultado em cache)"""
+        if app not in self._executables:
+            self._executables[app] = next(
+                (path for path in WINDOWS_EXECUTABLES.get(app, []) if os.path.exists(path)), None
+            )
+        return self._executables[app]
+
+    def _warm_browser(self):
+        """Registra os navegadores do sistema (feito na 1ª chamada ao webbrowser)"""
+        webbrowser.get()
+
+    def _warm_volume(self):
+        if self.system == "Windows":
+            self._volume_endpoint()
+
     # ===== NAVEGADORES =====
 
     def _open_browser(self, text):
@@ -133,14 +264,10 @@ class CommandExecutor:
     def _open_chrome(self, text):
         """Abre o Google Chrome"""
         if self.system == "Windows":
-            paths = [
-                r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-                r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
-            ]
-            for path in paths:
-                if os.path.exists(path):
-                    subprocess.Popen([path])
-                    return "Abrindo Chrome"
+            path = self._find_executable("chrome")
+            if path:
+                subprocess.Popen([path])
+                return "Abrindo Chrome"
         webbrowser.open("https://www.google.com")
         return "Abrindo navegador padrão"
 
@@ -202,63 +329,40 @@ class CommandExecutor:
     def _open_word(self, text):
         """Abre o Microsoft Word"""
         if self.system == "Windows":
-            paths = [
-                r"C:\Program Files\Microsoft Office\root\Office16\WINWORD.EXE",
-                r"C:\Program Files (x86)\Microsoft Office\root\Office16\WINWORD.EXE",
-                r"C:\Program Files\Microsoft Office\Office16\WINWORD.EXE",
-                r"C:\Program Files (x86)\Microsoft Office\Office16\WINWORD.EXE",
-            ]
-            for path in paths:
-                if os.path.exists(path):
-                    subprocess.Popen([path])
-                    return "Abrindo Word"
+            path = self._find_executable("word")
+            if path:
+                subprocess.Popen([path])
+                return "Abrindo Word"
             return "Word não encontrado. Certifique-se que está instalado."
         return "Word disponível apenas no Windows"
 
     def _open_excel(self, text):
         """Abre o Microsoft Excel"""
         if self.system == "Windows":
-            paths = [
-                r"C:\Program Files\Microsoft Office\root\Office16\EXCEL.EXE",
-                r"C:\Program Files (x86)\Microsoft Office\root\Office16\EXCEL.EXE",
-                r"C:\Program Files\Microsoft Office\Office16\EXCEL.EXE",
-                r"C:\Program Files (x86)\Microsoft Office\Office16\EXCEL.EXE",
-            ]
-            for path in paths:
-                if os.path.exists(path):
-                    subprocess.Popen([path])
-                    return "Abrindo Excel"
+            path = self._find_executable("excel")
+            if path:
+                subprocess.Popen([path])
+                return "Abrindo Excel"
             return "Excel não encontrado. Certifique-se que está instalado."
         return "Excel disponível apenas no Windows"
 
     def _open_powerpoint(self, text):
         """Abre o Microsoft PowerPoint"""
         if self.system == "Windows":
-            paths = [
-                r"C:\Program Files\Microsoft Office\root\Office16\POWERPNT.EXE",
-                r"C:\Program Files (x86)\Microsoft Office\root\Office16\POWERPNT.EXE",
-                r"C:\Program Files\Microsoft Office\Office16\POWERPNT.EXE",
-                r"C:\Program Files (x86)\Microsoft Office\Office16\POWERPNT.EXE",
-            ]
-            for path in paths:
-                if os.path.exists(path):
-                    subprocess.Popen([path])
-                    return "Abrindo PowerPoint"
+            path = self._find_executable("powerpoint")
+            if path:
+                subprocess.Popen([path])
+                return "Abrindo PowerPoint"
             return "PowerPoint não encontrado. Certifique-se que está instalado."
         return "PowerPoint disponível apenas no Windows"
 
     def _open_vscode(self, text):
         """Abre o Visual Studio Code"""
         if self.system == "Windows":
-            paths = [
-                r"C:\Users\{}\AppData\Local\Programs\Microsoft VS Code\Code.exe".format(os.getenv("USERNAME")),
-                r"C:\Program Files\Microsoft VS Code\Code.exe",
-                r"C:\Program Files (x86)\Microsoft VS Code\Code.exe",
-            ]
-            for path in paths:
-                if os.path.exists(path):
-                    subprocess.Popen([path])
-                    return "Abrindo VS Code"
+            path = self._find_executable("vscode")
+            if path:
+                subprocess.Popen([path])
+                return "Abrindo VS Code"
             # Tentar pelo comando 'code'
             try:
                 subprocess.Popen(["code"])
@@ -275,15 +379,10 @@ class CommandExecutor:
     def _open_postman(self, text):
         """Abre o Postman"""
         if self.system == "Windows":
-            paths = [
-                r"C:\Users\{}\AppData\Local\Postman\Postman.exe".format(os.getenv("USERNAME")),
-                r"C:\Program Files\Postman\Postman.exe",
-                r"C:\Program Files (x86)\Postman\Postman.exe",
-            ]
-            for path in paths:
-                if os.path.exists(path):
-                    subprocess.Popen([path])
-                    return "Abrindo Postman"
+            path = self._find_executable("postman")
+            if path:
+                subprocess.Popen([path])
+                return "Abrindo Postman"
             return "Postman não encontrado. Certifique-se que está instalado."
         elif self.system == "Darwin":
             subprocess.Popen(["open", "-a", "Postman"])
@@ -294,47 +393,54 @@ class CommandExecutor:
 
     # ===== SISTEMA =====
 
-    def _volume_up(self, text):
-        """Aumenta o volume"""
+    def _volume_endpoint(self):
+        """Interface de volume mestre do Windows (via pycaw)"""
+        from ctypes import cast, POINTER
+
+        devices = pycaw.AudioUtilities.GetSpeakers()
+        interface = devices.Activate(pycaw.IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None)
+        return cast(interface, POINTER(pycaw.IAudioEndpointVolume))
+
+    def _change_volume(self, delta, message):
+        """Ajusta o volume mestre em `delta` (0.0 a 1.0)"""
         if self.system == "Windows":
-            # Usar biblioteca pycaw se disponível
             try:
-                from ctypes import cast, POINTER
-                from comtypes import CLSCTX_ALL
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-
-                devices = AudioUtilities.GetSpeakers()
-                interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-                volume = cast(interface, POINTER(IAudioEndpointVolume))
+                volume = self._volume_endpoint()
                 current = volume.GetMasterVolumeLevelScalar()
-                volume.SetMasterVolumeLevelScalar(min(1.0, current + 0.1), None)
-                return "Volume aumentado"
-            except:
+                volume.SetMasterVolumeLevelScalar(min(1.0, max(0.0, current + delta)), None)
+                return message
+            except Exception:
                 return "Controle de volume não disponível (instale: pip install pycaw)"
         return "Controle de volume não disponível neste sistema"
 
+    def _volume_up(self, text):
+        """Aumenta o volume"""
+        return self._change_volume(0.1, "Volume aumentado")
+
     def _volume_down(self, text):
         """Diminui o volume"""
-        if self.system == "Windows":
-            try:
-                from ctypes import cast, POINTER
-                from comtypes import CLSCTX_ALL
-                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-
-                devices = AudioUtilities.GetSpeakers()
-                interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-                volume = cast(interface, POINTER(IAudioEndpointVolume))
-                current = volume.GetMasterVolumeLevelScalar()
-                volume.SetMasterVolumeLevelScalar(max(0.0, current - 0.1), None)
-                return "Volume diminuído"
-            except:
-                return "Controle de volume não disponível"
-        return "Controle de volume não disponível neste sistema"
+        return self._change_volume(-0.1, "Volume diminuído")
 
     def _mute(self, text):
         """Silencia o áudio"""
         return "Função de silenciar não implementada"
 
+    def _media_key(self, key, message):
+        """Pressiona uma tecla de mídia (player em primeiro plano ou do sistema)"""
+        try:
+            pyautogui.press(key)
+            return message
+        except ImportError:
+            return "PyAutoGUI não instalado (pip install pyautogui)"
+
+    def _next_track(self, text):
+        """Próxima faixa"""
+        return self._media_key("nexttrack", "Próxima faixa")
+
+    def _previous_track(self, text):
+        """Faixa anterior"""
+        return self._media_key("prevtrack", "Faixa anterior")
+
     # ===== UTILIDADES =====
 
     def _tell_time(self, text):
@@ -353,7 +459,6 @@ class CommandExecutor:
     def _screenshot(self, text):
         """Tira screenshot"""
         try:
-            import pyautogui
             filename = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
             pyautogui.screenshot(filename)
             return f"Screenshot salva como {filename}"
@@ -378,7 +483,8 @@ class CommandExecutor:
 
     def get_available_commands(self):
         """Retorna lista de comandos disponíveis"""
-        return list(self.commands.keys())
+        self.catalog.refresh()
+        return list(self.catalog.keywords)
 
 
 # Teste do módulo
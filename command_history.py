@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Histórico persistente de comandos
+Cada comando executado (ou não reconhecido) vira uma linha em um banco
+SQLite em modo WAL, só com inserções, indexado por instante e palavra-chave
+para consultas rápidas. Em memória ficam apenas os mais recentes.
+
+Configuração: COMMAND_HISTORY_DB (padrão: command_history.db ao lado deste arquivo)
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "command_history.db")
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    transcription TEXT NOT NULL,
+    keyword TEXT,
+    latency REAL,
+    success INTEGER NOT NULL,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS commands_ts ON commands (ts, keyword);
+CREATE INDEX IF NOT EXISTS commands_keyword ON commands (keyword, success);
+"""
+
+
+class CommandHistory:
+    """
+    Histórico de comandos: SQLite (WAL) em disco + janela recente em memória.
+
+    Uso:
+        history = CommandHistory()
+        history.record("abrir chrome", "chrome", 0.12, True, "Abrindo Chrome...")
+        history.top_commands(hours=24)
+    """
+
+    def __init__(self, path=None, max_memory=200):
+        """
+        Args:
+            path (str): Arquivo do banco (":memory:" para não persistir)
+            max_memory (int): Comandos recentes mantidos em memória
+        """
+        self.path = path or os.getenv("COMMAND_HISTORY_DB") or DEFAULT_PATH
+        self.recent = deque(maxlen=max_memory)
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")  # Seguro com WAL, sem fsync por comando
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def record(self, transcription, keyword, latency, success, result=None, timestamp=None):
+        """
+        Registra um comando.
+
+        Args:
+            transcription (str): Texto transcrito, como recebido
+            keyword (str): Palavra-chave reconhecida (None se nenhuma)
+            latency (float): Segundos gastos executando a ação
+            success (bool): Se a ação foi executada sem erro
+            result (str): Mensagem da ação ou do erro
+            timestamp (float): Instante (time.time()); padrão: agora
+
+        Returns:
+            dict: Entrada registrada (a mesma guardada em `recent`)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        entry = {
+            "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
+            "command": transcription,
+            "keyword": keyword,
+            "latency": latency,
+            "success": success,
+            "result": result,
+        }
+        with self._lock:
+            self.recent.append(entry)
+            self.conn.execute(
+                "INSERT INTO commands (ts, transcription, keyword, latency, success, result) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (timestamp, transcription, keyword, latency, int(bool(success)), result)
+            )
+            self.conn.commit()
+        return entry
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def top_commands(self, hours=24, limit=10, now=None):
+        """
+        Palavras-chave mais usadas na janela.
+
+        Args:
+            hours (float): Tamanho da janela
+            limit (int): Quantidade de resultados
+            now (float): Fim da janela (padrão: agora)
+
+        Returns:
+            list: [(palavra-chave, quantidade), ...] em ordem decrescente
+        """
+        since = (time.time() if now is None else now) - hours * 3600
+        return self._query(
+            "SELECT keyword, COUNT(*) AS n FROM commands "
+            "WHERE ts >= ? AND keyword IS NOT NULL "
+            "GROUP BY keyword ORDER BY n DESC, keyword LIMIT ?",
+            (since, limit)
+        )
+
+    def failure_rate(self, hours=None, now=None):
+        """
+        Taxa de falha por palavra-chave (None agrupa os não reconhecidos).
+
+        Args:
+            hours (float): Janela (None considera todo o histórico)
+            now (float): Fim da janela (padrão: agora)
+
+        Returns:
+            dict: palavra-chave -> {"total", "failures", "rate"}
+        """
+        since = 0.0 if hours is None else (time.time() if now is None else now) - hours * 3600
+        rows = self._query(
+            "SELECT keyword, COUNT(*), SUM(success = 0) FROM commands "
+            "WHERE ts >= ? GROUP BY keyword",
+            (since,)
+        )
+        return {
+            keyword: {"total": total, "failures": failures, "rate": failures / total}
+            for keyword, total, failures in rows
+        }
+
+    def keyword_times(self, hours=24 * 30, now=None):
+        """
+        Instantes e palavras-chave dos comandos da janela.
+
+        Returns:
+            list: [(instante, palavra-chave), ...]; palavra-chave None = não
+                reconhecido (foi para a IA)
+        """
+        since = (time.time() if now is None else now) - hours * 3600
+        return self._query("SELECT ts, keyword FROM commands WHERE ts >= ?", (since,))
+
+    def count(self):
+        """Total de comandos registrados"""
+        return self._query("SELECT COUNT(*) FROM commands")[0][0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+# Resumo do histórico
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resumo do histórico de comandos")
+    parser.add_argument("--db", default=None, help="Arquivo do banco (padrão: COMMAND_HISTORY_DB)")
+    parser.add_argument("--hours", type=float, default=24, help="Janela dos mais usados")
+    args = parser.parse_args()
+
+    history = CommandHistory(args.db)
+    print(f"\n{history.count()} comandos em {history.path}")
+
+    print(f"\nMais usados nas últimas {args.hours:g} h:")
+    for keyword, count in history.top_commands(hours=args.hours):
+        print(f"  {keyword:<24}{count:>6}")
+
+    print("\nTaxa de falha por palavra-chave:")
+    rates = history.failure_rate()
+    for keyword, stats in sorted(rates.items(), key=lambda item: -item[1]["rate"]):
+        name = keyword if keyword is not None else "(não reconhecido)"
+        print(f"  {name:<24}{stats['failures']:>6}/{stats['total']:<6}{stats['rate']:>7.0%}")
+    history.close()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Pré-aquecimento dos comandos prováveis
+Usa o histórico de comandos para prever o que o usuário vai pedir (mesmos
+aplicativos, nos mesmos horários) e, quando o assistente é ativado, prepara
+essas ações em segundo plano: resolve executáveis, importa módulos, registra
+o navegador e pré-carrega o modelo de IA.
+"""
+import threading
+import time
+
+import numpy as np
+
+
+class CommandPredictor:
+    """
+    Pontua as palavras-chave do histórico por recência e por proximidade do
+    horário do dia atual.
+    """
+
+    def __init__(self, history, days=30, half_life_days=7.0, hour_width=1.5):
+        """
+        Args:
+            history (CommandHistory): Histórico de comandos
+            days (float): Quantos dias de histórico considerar
+            half_life_days (float): Meia-vida do peso de um comando antigo
+            hour_width (float): Largura (horas) da janela de horário parecido
+        """
+        self.history = history
+        self.days = days
+        self.half_life_days = half_life_days
+        self.hour_width = hour_width
+
+    def predict(self, limit=3, now=None):
+        """
+        Comandos mais prováveis agora.
+
+        Args:
+            limit (int): Quantidade de previsões
+            now (float): Instante da previsão (time.time(); padrão: agora)
+
+        Returns:
+            list: [(palavra-chave, pontuação), ...] em ordem decrescente;
+                palavra-chave None = pergunta para a IA
+        """
+        now = time.time() if now is None else now
+        rows = self.history.keyword_times(hours=self.days * 24, now=now)
+        if not rows:
+            return []
+
+        timestamps = np.fromiter((row[0] for row in rows), dtype=np.float64, count=len(rows))
+        keys = ["" if row[1] is None else row[1] for row in rows]
+        names, codes = np.unique(keys, return_inverse=True)
+
+        # Recência: decaimento exponencial
+        age_days = (now - timestamps) / 86400
+        recency = 0.5 ** (age_days / self.half_life_days)
+
+        # Horário do dia (hora local), distância circular em horas
+        offset = time.localtime(now).tm_gmtoff
+        hours = ((timestamps + offset) % 86400) / 3600
+        current = ((now + offset) % 86400) / 3600
+        distance = np.abs(hours - current)
+        distance = np.minimum(distance, 24 - distance)
+        same_time = np.exp(-(distance / self.hour_width) ** 2)
+
+        scores = np.bincount(codes, weights=recency * (0.25 + same_time), minlength=len(names))
+        order = np.argsort(-scores)[:limit]
+        return [(str(names[i]) or None, float(scores[i])) for i in order if scores[i] > 0]
+
+
+class CommandPrefetcher:
+    """
+    Prepara em segundo plano as ações previstas pelo CommandPredictor.
+
+    Uso:
+        prefetcher = CommandPrefetcher(executor, ai_assistant)
+        prefetcher.on_active()   # ao entrar no estado ACTIVE
+    """
+
+    def __init__(self, executor, ai_assistant=None, limit=3, cooldown=300.0):
+        """
+        Args:
+            executor (CommandExecutor): Executor (e seu histórico)
+            ai_assistant (AIAssistant): IA pré-carregada quando perguntas livres
+                estão entre as previsões (opcional)
+            limit (int): Quantas previsões preparar
+            cooldown (float): Segundos sem repetir o preparo da mesma ação
+        """
+        self.executor = executor
+        self.ai_assistant = ai_assistant
+        self.predictor = CommandPredictor(executor.history)
+        self.limit = limit
+        self.cooldown = cooldown
+        self.last_warmed = {}   # palavra-chave -> instante do último preparo
+        self.last_prediction = []
+        self._lock = threading.Lock()
+
+    def on_active(self):
+        """Dispara a previsão e o preparo sem bloquear quem chamou"""
+        threading.Thread(target=self.prefetch, daemon=True, name="prefetch").start()
+
+    def prefetch(self):
+        """
+        Prevê e prepara as ações mais prováveis.
+
+        Returns:
+            list: Palavras-chave preparadas nesta chamada
+        """
+        if not self._lock.acquire(blocking=False):
+            return []   # Já há um preparo em andamento
+        try:
+            start = time.perf_counter()
+            self.last_prediction = self.predictor.predict(self.limit)
+            warmed = []
+            now = time.monotonic()
+            for keyword, _ in self.last_prediction:
+                if now - self.last_warmed.get(keyword, -self.cooldown) < self.cooldown:
+                    continue
+                if keyword is None:
+                    if self.ai_assistant is None:
+                        continue
+                    self.ai_assistant.prewarm()
+                elif not self.executor.prewarm(keyword):
+                    continue
+                self.last_warmed[keyword] = now
+                warmed.append(keyword)
+
+            if warmed:
+                names = ", ".join(keyword or "IA" for keyword in warmed)
+                print(f"[PREFETCH] Preparado: {names} ({time.perf_counter() - start:.2f}s)")
+            return warmed
+        finally:
+            self._lock.release()
+
+
+# Mostra as previsões para o horário atual
+if __name__ == "__main__":
+    from command_history import CommandHistory
+
+    predictor = CommandPredictor(CommandHistory())
+    print("\nComandos mais prováveis agora:")
+    for keyword, score in predictor.predict(limit=5):
+        print(f"  {keyword or '(pergunta para a IA)':<24}{score:>8.2f}")
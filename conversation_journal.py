@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Diário da conversa em JSONL
+Cada mensagem é uma linha acrescentada ao fim do arquivo (custo constante
+por turno, independente do tamanho da conversa). Ao abrir, só o fim do
+arquivo é lido, até juntar a janela de contexto. Por padrão o arquivo
+guarda a conversa inteira; com um limite de retenção (`max_messages`) ele é
+compactado de tempos em tempos, descartando o que veio antes do último
+"reset" e as mensagens além do limite.
+
+Formato (uma linha JSON por registro):
+    {"type": "header", "provider": ..., "model": ..., "created": ...}
+    {"type": "message", "ts": ..., "role": "user", "content": ...}
+    {"type": "reset", "ts": ...}
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class ConversationJournal:
+    """
+    Arquivo JSONL só com acréscimos, com leitura lazy do final e compactação
+    opcional.
+
+    Uso:
+        journal = ConversationJournal("conversa.jsonl")
+        history = journal.load_recent(20)
+        journal.append("user", "Olá")
+    """
+
+    def __init__(self, path, header=None, compact_every=500, max_messages=None):
+        """
+        Args:
+            path (str): Arquivo JSONL
+            header (dict): Metadados gravados na 1ª linha de um arquivo novo
+            compact_every (int): Registros acrescentados entre compactações
+            max_messages (int): Mensagens mantidas ao compactar (None guarda
+                tudo e nunca compacta sozinho)
+        """
+        self.path = os.path.abspath(path)
+        self.header = header or {}
+        self.compact_every = compact_every
+        self.max_messages = max_messages
+        self.appended = 0
+        self._lock = threading.Lock()
+
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(self._header_line())
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _header_line(self):
+        record = {"type": "header", "created": datetime.now().isoformat()}
+        record.update(self.header)
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    def append(self, role, content):
+        """Acrescenta uma mensagem (uma linha, sem reescrever o arquivo)"""
+        self._write({"type": "message", "ts": datetime.now().isoformat(),
+                     "role": role, "content": content})
+
+    def reset(self):
+        """Marca o início de uma nova conversa (o anterior sai numa compactação)"""
+        self._write({"type": "reset", "ts": datetime.now().isoformat()})
+
+    def _write(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.appended += 1
+            due = self.max_messages is not None and self.appended >= self.compact_every
+        if due:
+            self.compact()
+
+    def load_recent(self, count):
+        """
+        Lê as últimas `count` mensagens da conversa atual, percorrendo o
+        arquivo de trás para frente (para no último "reset").
+
+        Args:
+            count (int): Tamanho da janela de contexto
+
+        Returns:
+            list: Mensagens {"role", "content"} em ordem cronológica
+        """
+        with self._lock:
+            records = self._tail(count)
+        return [{"role": record["role"], "content": record["content"]} for record in records]
+
+    def _tail(self, count, block_size=64 * 1024):
+        """Últimos `count` registros de mensagem da conversa atual, em ordem"""
+        records = []
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b""
+            while position > 0 and len(records) < count:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                lines = (f.read(step) + remainder).split(b"\n")
+                # A 1ª linha pode estar cortada: fica para o próximo bloco
+                remainder = lines.pop(0) if position > 0 else b""
+                if self._collect(reversed(lines), records, count):
+                    break
+
+        records.reverse()
+        return records
+
+    @staticmethod
+    def _collect(lines, records, count):
+        """Junta mensagens (do fim para o início); True ao achar um reset"""
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record.get("type")
+            if kind == "reset":
+                return True
+            if kind == "message":
+                records.append(record)
+                if len(records) >= count:
+                    return True
+        return False
+
+    def compact(self):
+        """
+        Reescreve o arquivo só com o cabeçalho e as últimas `max_messages`
+        mensagens da conversa atual (todas, se não houver limite), em troca
+        atômica. O que veio antes do último "reset" é descartado.
+        """
+        with self._lock:
+            limit = self.max_messages if self.max_messages is not None else float("inf")
+            records = self._tail(limit)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = f.readline()
+            # Arquivo sem cabeçalho (criado à mão ou por outra ferramenta): a 1ª
+            # linha é uma mensagem, que já está em `records`
+            try:
+                is_header = json.loads(header).get("type") == "header"
+            except (ValueError, AttributeError):
+                is_header = False
+            if not is_header:
+                header = self._header_line()
+
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(header)
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._file.close()
+            os.replace(temp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self.appended = 0
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "conversation_history.jsonl"
+    journal = ConversationJournal(path)
+    for message in journal.load_recent(20):
+        print(f"[{message['role']}] {message['content']}")
+    journal.close()
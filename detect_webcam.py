@@ -1,41 +1,18 @@
+import sys
 import cv2
-import mediapipe as mp
+from frame_source import open_source
+from hand_detector import HandDetector
 
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
+detector = HandDetector(max_num_hands=2, min_detection_confidence=0.5,
+                        min_tracking_confidence=0.5, side_inverted=False)
 
-hands = mp_hands.Hands()
-
-camera = cv2.VideoCapture(0)
-resolution_x = 1280
-resolution_y = 720
-camera.set(cv2.CAP_PROP_FRAME_WIDTH, resolution_x)
-camera.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution_y)
+# Fonte opcional na linha de comando: índice da câmera, vídeo ou diretório de imagens
+camera = open_source(sys.argv[1] if len(sys.argv) > 1 else 0)
 
 def find_coord_hand(img, side_inverted=False):
-    img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(img_rgb)
-    all_hands = []
-    if result.multi_hand_landmarks:
-        for hand_side, hand_landmarks in zip(result.multi_handedness, result.multi_hand_landmarks):
-            hand_info = {}
-            coords = []
-            for mark in hand_landmarks.landmark:
-                coord_x = int(mark.x * resolution_x)
-                coord_y = int(mark.y * resolution_y)
-                coord_z = int(mark.z * resolution_x)
-                coords.append((coord_x, coord_y, coord_z))
-                hand_info['coordenadas'] = coords
-            if side_inverted:
-                if hand_side.classification[0].label == "Left":
-                    hand_info["side"] = "Right"
-                else:
-                    hand_info["side"] = "Left"
-            else:
-                hand_info["side"] = hand_side.classification[0].label
-            all_hands.append(hand_info)
-
-            mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+    detector.side_inverted = side_inverted
+    all_hands = detector.detect(img)
+    detector.draw(img)
     return img, all_hands
 
 def fingers_raised(hand):
@@ -49,12 +26,12 @@ def fingers_raised(hand):
             fingers.append(False)  # Dedo abaixado
     return fingers
 
-while camera.isOpened():
+while camera.is_opened():
     ret, frame = camera.read()
-    frame = cv2.flip(frame, 1)  # Espelhar a imagem horizontalmente (Inverte esquerda/direita)
     if not ret:
         print("Frame vazio da camera, encerrando...")
-        continue
+        break
+    frame = cv2.flip(frame, 1)  # Espelhar a imagem horizontalmente (Inverte esquerda/direita)
     img, all_hands = find_coord_hand(frame)
 
     if len(all_hands) == 1:
@@ -64,4 +41,8 @@ while camera.isOpened():
     key = cv2.waitKey(1)
     cv2.imshow("Camera", img)
     if key == 27:  # Tecla 'Esc' para sair
-        break
\ No newline at end of file
+        break
+
+camera.release()
+detector.close()
+cv2.destroyAllWindows()
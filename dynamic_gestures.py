@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Gestos dinâmicos (deslizar e girar)
+Cada mão tem um buffer circular NumPy com a trajetória recente da base do
+dedo médio. Além da posição, cada linha guarda somas acumuladas (caminho
+percorrido, giro com sinal, tamanho da palma), então as features de
+qualquer janela saem da diferença entre duas linhas: O(1) por frame, sem
+reler o histórico.
+
+Eventos emitidos (mesmos nomes usados em GESTURE_ACTIONS):
+    SWIPE_LEFT, SWIPE_RIGHT  deslizar a mão na horizontal
+    CIRCLE_CW, CIRCLE_CCW    círculo no sentido horário / anti-horário (na tela)
+"""
+import math
+
+import numpy as np
+
+
+# Colunas de cada linha do buffer
+T, X, Y, PATH, TURN, PALM = range(6)
+
+# Ponto rastreado (base do dedo médio: estável enquanto os dedos mudam de pose)
+TRACKED_LANDMARK = 9
+
+
+class _Track:
+    """Trajetória de uma mão em um buffer circular com somas acumuladas"""
+
+    def __init__(self, capacity):
+        self.rows = np.zeros((capacity, 6))
+        self.capacity = capacity
+        self.count = 0          # Linhas escritas desde o último reset
+        self.direction = None   # Último deslocamento significativo (dx, dy)
+
+    def push(self, timestamp, x, y, palm, min_step):
+        if self.count:
+            last = self.rows[(self.count - 1) % self.capacity]
+            dx, dy = x - last[X], y - last[Y]
+            step = math.hypot(dx, dy)
+            path, turn = last[PATH] + step, last[TURN]
+            # Giro entre deslocamentos consecutivos; parada ou tremor da mão
+            # parada zera a direção (o próximo movimento não conta giro)
+            if step >= min_step * palm:
+                if self.direction is not None:
+                    px, py = self.direction
+                    turn += math.atan2(px * dy - py * dx, px * dx + py * dy)
+                self.direction = (dx, dy)
+            else:
+                self.direction = None
+            palm_sum = last[PALM] + palm
+        else:
+            path = turn = 0.0
+            palm_sum = palm
+
+        self.rows[self.count % self.capacity] = (timestamp, x, y, path, turn, palm_sum)
+        self.count += 1
+
+    def window(self, frames):
+        """
+        Diferenças entre o frame mais novo e o de `frames` frames atrás.
+
+        Returns:
+            tuple: (duração, dx, dy, caminho, giro, palma média) ou None
+        """
+        frames = min(frames, self.count, self.capacity)
+        if frames < 2:
+            return None
+        newest = self.rows[(self.count - 1) % self.capacity]
+        oldest = self.rows[(self.count - frames) % self.capacity]
+        palm = (newest[PALM] - oldest[PALM]) / (frames - 1)
+        return (newest[T] - oldest[T], newest[X] - oldest[X], newest[Y] - oldest[Y],
+                newest[PATH] - oldest[PATH], newest[TURN] - oldest[TURN], palm)
+
+    def reset(self):
+        self.count = 0
+        self.direction = None
+
+
+class DynamicGestureRecognizer:
+    """
+    Reconhece gestos de movimento a partir das mãos de cada frame.
+
+    Uso:
+        dynamic = DynamicGestureRecognizer()
+        for event in dynamic.update(hands, time.perf_counter()):
+            assistant.process_gesture(event)
+    """
+
+    def __init__(self, capacity=32, swipe_frames=10, swipe_distance=2.0, swipe_max_time=0.6,
+                 swipe_straightness=0.8, swipe_max_turn=45.0, circle_turns=0.85, circle_size=3.0,
+                 circle_max_time=1.5, min_step=0.1, cooldown=0.8):
+        """
+        Args:
+            capacity (int): Frames guardados por mão (janela do círculo)
+            swipe_frames (int): Frames da janela do deslizar
+            swipe_distance (float): Deslocamento horizontal mínimo, em palmas
+            swipe_max_time (float): Duração máxima do deslizar (s)
+            swipe_straightness (float): Deslocamento / caminho mínimo (1 = reta)
+            swipe_max_turn (float): Giro máximo (graus) no deslizar; separa o
+                deslizar do começo de um círculo
+            circle_turns (float): Voltas mínimas (giro acumulado / 360°)
+            circle_size (float): Caminho mínimo do círculo, em palmas
+            circle_max_time (float): Duração máxima do círculo (s)
+            min_step (float): Movimento mínimo por frame (em palmas) para contar giro
+            cooldown (float): Segundos sem novos eventos após um gesto
+        """
+        self.capacity = capacity
+        self.swipe_frames = swipe_frames
+        self.swipe_distance = swipe_distance
+        self.swipe_max_time = swipe_max_time
+        self.swipe_straightness = swipe_straightness
+        self.swipe_max_turn = math.radians(swipe_max_turn)
+        self.circle_turn = circle_turns * 2 * math.pi
+        self.circle_size = circle_size
+        self.circle_max_time = circle_max_time
+        self.min_step = min_step
+        self.cooldown = cooldown
+        self.tracks = {}   # lado (ou posição na lista) -> _Track
+        self.blocked_until = 0.0
+
+    def update(self, hands, timestamp):
+        """
+        Acrescenta um frame e verifica os gestos.
+
+        Args:
+            hands (list): Mãos no formato de `detect_hands`
+            timestamp (float): Instante do frame em segundos
+
+        Returns:
+            list: Eventos reconhecidos neste frame (normalmente vazio)
+        """
+        sides = [hand.get('side') for hand in hands]
+        keys = sides if None not in sides and len(set(sides)) == len(sides) else list(range(len(hands)))
+        for key in set(self.tracks) - set(keys):
+            del self.tracks[key]   # Mão saiu do quadro: trajetória recomeça
+
+        events = []
+        for key, hand in zip(keys, hands):
+            track = self.tracks.get(key)
+            if track is None:
+                track = self.tracks[key] = _Track(self.capacity)
+
+            coords = hand['coordenadas']
+            wrist, point = coords[0], coords[TRACKED_LANDMARK]
+            palm = max(math.hypot(point[0] - wrist[0], point[1] - wrist[1]), 1.0)
+            track.push(timestamp, point[0], point[1], palm, self.min_step)
+
+            if timestamp < self.blocked_until:
+                continue
+            event = self._classify(track)
+            if event is not None:
+                events.append(event)
+                self.blocked_until = timestamp + self.cooldown
+                for other in self.tracks.values():
+                    other.reset()
+                break
+        return events
+
+    def _classify(self, track):
+        circle = track.window(self.capacity)
+        if circle is not None:
+            duration, _, _, path, turn, palm = circle
+            if (abs(turn) >= self.circle_turn and path >= self.circle_size * palm
+                    and duration <= self.circle_max_time):
+                # y cresce para baixo: giro positivo é horário na tela
+                return 'CIRCLE_CW' if turn > 0 else 'CIRCLE_CCW'
+
+        swipe = track.window(self.swipe_frames)
+        if swipe is not None:
+            duration, dx, dy, path, turn, palm = swipe
+            if (abs(dx) >= self.swipe_distance * palm and abs(dx) >= 2 * abs(dy)
+                    and math.hypot(dx, dy) >= self.swipe_straightness * path
+                    and abs(turn) <= self.swipe_max_turn
+                    and duration <= self.swipe_max_time):
+                return 'SWIPE_RIGHT' if dx > 0 else 'SWIPE_LEFT'
+        return None
+
+    def reset(self):
+        self.tracks.clear()
+
+
+# Demonstração com trajetórias sintéticas
+if __name__ == "__main__":
+    def hand_at(x, y, palm=80):
+        coords = [(int(x), int(y + palm), 0)] * 21
+        coords[TRACKED_LANDMARK] = (int(x), int(y), 0)
+        return [{'coordenadas': coords, 'side': 'Right'}]
+
+    recognizer = DynamicGestureRecognizer()
+    t = 0.0
+    scripts = {
+        "parado": [(640, 360)] * 30,
+        "tremor": [(640 + 3 * math.sin(i * 1.7), 360 + 3 * math.cos(i * 2.3)) for i in range(90)],
+        "deslizar para a direita": [(300 + 40 * i, 360) for i in range(12)],
+        "deslizar para a esquerda": [(900 - 40 * i, 360) for i in range(12)],
+        "círculo horário": [(640 + 120 * math.cos(a), 360 + 120 * math.sin(a))
+                            for a in np.linspace(0, 2 * math.pi, 28)],
+        "círculo anti-horário": [(640 + 120 * math.cos(a), 360 - 120 * math.sin(a))
+                                 for a in np.linspace(0, 2 * math.pi, 28)],
+    }
+    for name, points in scripts.items():
+        points = [points[0]] * 5 + points   # Mão parada antes de cada gesto
+        events = []
+        for x, y in points:
+            t += 1 / 30
+            events += recognizer.update(hand_at(x, y), t)
+        t += recognizer.cooldown
+        print(f"{name:<26} -> {', '.join(events) or '(nada)'}")
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Cancelamento de eco da síntese de voz
+O áudio do TTS é tocado pelo mesmo stream que lê o microfone, então o sinal
+de referência (o que saiu no alto-falante) é conhecido amostra a amostra.
+Um filtro adaptativo NLMS estima o eco e o subtrai do microfone; o que sobra
+é a voz do usuário, usada para interromper a fala (barge-in).
+"""
+import threading
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class PlaybackQueue:
+    """
+    Fila de áudio a tocar, consumida pelo callback do stream duplex.
+
+    O callback chama `read(frames)` a cada bloco: o mesmo bloco vai para o
+    alto-falante e serve de referência para o cancelamento de eco.
+    """
+
+    def __init__(self):
+        self._chunks = deque()
+        self._offset = 0
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._finished.set()
+        self.interrupted = False
+
+    @property
+    def active(self):
+        """True enquanto houver áudio na fila"""
+        return not self._finished.is_set()
+
+    def play(self, samples):
+        """Enfileira áudio mono float32 (na taxa do stream)"""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if len(samples) == 0:
+            return
+        with self._lock:
+            self._chunks.append(samples)
+            self.interrupted = False
+            self._finished.clear()
+
+    def read(self, frames):
+        """Retira `frames` amostras da fila (completando com silêncio)"""
+        out = np.zeros(frames, dtype=np.float32)
+        filled = 0
+        with self._lock:
+            while filled < frames and self._chunks:
+                chunk = self._chunks[0]
+                count = min(frames - filled, len(chunk) - self._offset)
+                out[filled:filled + count] = chunk[self._offset:self._offset + count]
+                filled += count
+                self._offset += count
+                if self._offset == len(chunk):
+                    self._chunks.popleft()
+                    self._offset = 0
+            if not self._chunks:
+                self._finished.set()
+        return out
+
+    def stop(self):
+        """Descarta o que falta tocar"""
+        with self._lock:
+            if self._chunks:
+                self.interrupted = True
+            self._chunks.clear()
+            self._offset = 0
+            self._finished.set()
+
+    def wait(self, timeout=None):
+        """
+        Aguarda a fila esvaziar.
+
+        Returns:
+            bool: True se tocou até o fim, False se foi interrompida (ou timeout)
+        """
+        return self._finished.wait(timeout) and not self.interrupted
+
+
+class EchoCanceller:
+    """
+    Filtro adaptativo NLMS em blocos.
+
+    Estima o caminho alto-falante -> microfone (atraso do dispositivo +
+    acústica da sala) com `filter_length` coeficientes e subtrai o eco
+    previsto do sinal do microfone. Cada bloco é processado de uma vez com
+    operações vetorizadas, sem laço por amostra.
+    """
+
+    def __init__(self, filter_length=2048, step=0.3, min_reference_power=1e-6):
+        """
+        Args:
+            filter_length (int): Coeficientes do filtro (2048 = 128 ms a 16 kHz)
+            step (float): Passo de adaptação (0 < step < 1)
+            min_reference_power (float): Abaixo desta potência de referência
+                o filtro não adapta (nada tocando)
+        """
+        self.filter_length = filter_length
+        self.step = step
+        self.min_reference_power = min_reference_power
+        self.weights = np.zeros(filter_length, dtype=np.float32)
+        self.history = np.zeros(filter_length - 1, dtype=np.float32)
+
+    def reset(self):
+        """Esquece o caminho de eco estimado"""
+        self.weights[:] = 0
+        self.history[:] = 0
+
+    def process(self, mic, reference, adapt=True):
+        """
+        Remove o eco de um bloco do microfone.
+
+        Args:
+            mic (numpy.ndarray): Bloco do microfone
+            reference (numpy.ndarray): Bloco tocado no alto-falante (mesmo tamanho)
+            adapt (bool): Atualizar o filtro (False durante fala do usuário,
+                para o filtro não "aprender" a voz dele)
+
+        Returns:
+            tuple: (residual, echo) - microfone sem eco e eco estimado
+        """
+        mic = np.asarray(mic, dtype=np.float32)
+        signal = np.concatenate((self.history, np.asarray(reference, dtype=np.float32)))
+        self.history = signal[-(self.filter_length - 1):]
+
+        # Linha i: as últimas `filter_length` amostras de referência até a amostra i
+        frames = sliding_window_view(signal, self.filter_length)[:, ::-1]
+        echo = frames @ self.weights
+        residual = mic - echo
+
+        power = float(np.dot(signal, signal)) / len(signal)
+        if adapt and power > self.min_reference_power:
+            # Blocos maiores que o filtro somam mais gradientes: reduzir o passo
+            step = self.step * min(1.0, self.filter_length / len(mic))
+            self.weights += step * (residual @ frames) / (power * self.filter_length)
+
+        return residual, echo
+
+
+class BargeInDetector:
+    """
+    Detecta voz do usuário por cima da fala do assistente.
+
+    Acompanha o nível do residual enquanto só o eco está presente (média
+    móvel, que cai conforme o filtro converge); voz do usuário faz o residual
+    passar de `ratio` vezes esse nível por `hold_blocks` blocos seguidos.
+    """
+
+    def __init__(self, ratio=3.0, noise_floor=0.01, hold_blocks=3, smoothing=0.1):
+        """
+        Args:
+            ratio (float): Residual / nível do eco residual (RMS) que indica voz
+            noise_floor (float): RMS mínimo do residual para contar como voz
+            hold_blocks (int): Blocos seguidos acima do limiar
+            smoothing (float): Peso de cada bloco na média do nível do eco
+        """
+        self.ratio = ratio
+        self.noise_floor = noise_floor
+        self.hold_blocks = hold_blocks
+        self.smoothing = smoothing
+        self.level = None
+        self.count = 0
+
+    def update(self, residual):
+        """
+        Returns:
+            bool: True quando o usuário começou a falar
+        """
+        rms = float(np.sqrt(np.mean(residual ** 2)))
+        if self.level is None:
+            self.level = rms
+
+        if rms > max(self.noise_floor, self.ratio * self.level):
+            self.count += 1
+        else:
+            self.count = 0
+            self.level += self.smoothing * (rms - self.level)
+        return self.count >= self.hold_blocks
+
+    @property
+    def talking(self):
+        """True enquanto o residual está acima do limiar (congela a adaptação)"""
+        return self.count > 0
+
+    def reset(self):
+        """Esquece o nível do eco (chamado entre falas do assistente)"""
+        self.level = None
+        self.count = 0
+
+
+def resample(samples, source_rate, target_rate):
+    """Reamostragem linear (suficiente para voz sintetizada)"""
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    duration = len(samples) / source_rate
+    target_times = np.arange(int(duration * target_rate)) / target_rate
+    source_times = np.arange(len(samples)) / source_rate
+    return np.interp(target_times, source_times, samples).astype(np.float32)
+
+
+# Exemplo de uso: eco sintético com atraso e atenuação
+if __name__ == "__main__":
+    rate = 16000
+    rng = np.random.default_rng(0)
+    reference = rng.standard_normal(rate * 4).astype(np.float32) * 0.3
+    path = np.zeros(400, dtype=np.float32)
+    path[320], path[360] = 0.6, 0.2   # 20 ms de atraso + uma reflexão
+    echo = np.convolve(reference, path)[:len(reference)]
+    voice = np.zeros_like(reference)
+    voice[rate * 3:] = np.sin(2 * np.pi * 220 * np.arange(rate) / rate) * 0.3
+
+    canceller = EchoCanceller(filter_length=512)
+    detector = BargeInDetector()
+    block = 512
+    for start in range(0, len(reference), block):
+        mic = echo[start:start + block] + voice[start:start + block]
+        residual, _ = canceller.process(mic, reference[start:start + block],
+                                        adapt=not detector.talking)
+        if detector.update(residual):
+            print(f"Voz do usuário detectada em {start / rate:.2f}s")
+            break
+        if start % (rate // 2) < block:
+            erle = 10 * np.log10(np.mean(mic ** 2) / max(np.mean(residual ** 2), 1e-12))
+            print(f"{start / rate:.1f}s: atenuação do eco {erle:.1f} dB")
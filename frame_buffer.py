@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Buffer circular de frames em memória compartilhada
+Permite que o assistente rode sem janela (headless) e publique os frames
+anotados para um processo visualizador separado
+"""
+import time
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+
+# Identificador do layout do buffer ("HTFB" em ASCII)
+MAGIC = 0x48544642
+
+# Cabeçalho: magic, slots, altura, largura, canais, último sequencial publicado
+HEADER_FIELDS = 6
+HEADER_SIZE = HEADER_FIELDS * 8
+
+# Metadados por slot: sequencial (int64) + timestamp (float64)
+SLOT_META_SIZE = 16
+
+
+class SharedFrameBuffer:
+    """
+    Ring buffer de frames BGR em `multiprocessing.shared_memory`.
+
+    Um único processo escreve (o assistente) e qualquer número de processos
+    lê. Cada slot guarda um número de sequência escrito antes e depois da
+    cópia do frame, de forma que o leitor detecta (e descarta) um slot que
+    estava sendo sobrescrito durante a leitura, sem precisar de locks.
+    """
+
+    def __init__(self, shm, owner):
+        """
+        Use `SharedFrameBuffer.create` ou `SharedFrameBuffer.attach`.
+
+        Args:
+            shm (SharedMemory): Bloco de memória compartilhada já aberto
+            owner (bool): True se este processo criou o bloco
+        """
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+
+        self._header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if self._header[0] != MAGIC:
+            raise ValueError(f"Memória compartilhada '{shm.name}' não é um buffer de frames")
+
+        self.slots = int(self._header[1])
+        self.height = int(self._header[2])
+        self.width = int(self._header[3])
+        self.channels = int(self._header[4])
+        self.shape = (self.height, self.width, self.channels)
+
+        self._seqs = np.ndarray((self.slots,), dtype=np.int64, buffer=shm.buf,
+                                offset=HEADER_SIZE, strides=(SLOT_META_SIZE,))
+        self._times = np.ndarray((self.slots,), dtype=np.float64, buffer=shm.buf,
+                                 offset=HEADER_SIZE + 8, strides=(SLOT_META_SIZE,))
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=shm.buf,
+                                  offset=HEADER_SIZE + self.slots * SLOT_META_SIZE)
+
+    @classmethod
+    def create(cls, name, width, height, channels=3, slots=4):
+        """
+        Cria um novo buffer de frames.
+
+        Args:
+            name (str): Nome da memória compartilhada (None gera um nome aleatório)
+            width (int): Largura dos frames
+            height (int): Altura dos frames
+            channels (int): Número de canais (3 para BGR)
+            slots (int): Quantidade de frames mantidos no anel
+
+        Returns:
+            SharedFrameBuffer: Buffer pronto para escrita
+        """
+        frame_size = width * height * channels
+        size = HEADER_SIZE + slots * (SLOT_META_SIZE + frame_size)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = (MAGIC, slots, height, width, channels, -1)
+        meta = np.ndarray((slots, 2), dtype=np.int64, buffer=shm.buf, offset=HEADER_SIZE)
+        meta[:, 0] = -1
+        del header, meta
+
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Conecta-se a um buffer criado por outro processo.
+
+        Args:
+            name (str): Nome da memória compartilhada
+
+        Returns:
+            SharedFrameBuffer: Buffer pronto para leitura
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        # O resource_tracker removeria o bloco quando o leitor encerrasse,
+        # derrubando o buffer do assistente que ainda está rodando
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return cls(shm, owner=False)
+
+    @property
+    def latest_seq(self):
+        """Sequencial do último frame publicado (-1 se nenhum)"""
+        return int(self._header[5])
+
+    def publish(self, frame, timestamp=None):
+        """
+        Publica um frame no próximo slot do anel.
+
+        Args:
+            frame (numpy.ndarray): Frame BGR com o mesmo formato do buffer
+            timestamp (float): Instante do frame (usa time.time() se None)
+
+        Returns:
+            int: Sequencial atribuído ao frame
+        """
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame {frame.shape} não corresponde ao buffer {self.shape}")
+
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+
+        self._seqs[slot] = -1  # Slot inválido enquanto está sendo escrito
+        np.copyto(self._frames[slot], frame)
+        self._times[slot] = time.time() if timestamp is None else timestamp
+        self._seqs[slot] = seq
+        self._header[5] = seq
+        return seq
+
+    def read_latest(self, last_seq=-1, out=None):
+        """
+        Lê o frame mais recente, se for mais novo que `last_seq`.
+
+        Args:
+            last_seq (int): Último sequencial já lido por este leitor
+            out (numpy.ndarray): Array de destino reutilizável (opcional)
+
+        Returns:
+            tuple: (sequencial, timestamp, frame) ou (last_seq, None, None)
+                se não houver frame novo
+        """
+        for _ in range(self.slots):
+            seq = self.latest_seq
+            if seq <= last_seq:
+                return last_seq, None, None
+
+            slot = seq % self.slots
+            if out is None:
+                out = np.empty(self.shape, dtype=np.uint8)
+            np.copyto(out, self._frames[slot])
+            timestamp = float(self._times[slot])
+
+            # Se o escritor reutilizou o slot durante a cópia, tentar de novo
+            if self._seqs[slot] == seq:
+                return seq, timestamp, out
+
+        return last_seq, None, None
+
+    def close(self):
+        """Libera o mapeamento (e remove o bloco, se for o criador)"""
+        self._header = self._seqs = self._times = self._frames = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def view(name, window_name="Visualizador"):
+    """
+    Mostra em uma janela os frames publicados por um assistente headless.
+
+    Args:
+        name (str): Nome da memória compartilhada
+        window_name (str): Título da janela
+    """
+    import cv2
+
+    buffer = SharedFrameBuffer.attach(name)
+    print(f"[VIEWER] Conectado a '{name}' ({buffer.width}x{buffer.height})")
+    print("Pressione 'Esc' para sair")
+
+    frame = np.empty(buffer.shape, dtype=np.uint8)
+    last_seq = -1
+    try:
+        while True:
+            seq, _, new_frame = buffer.read_latest(last_seq, out=frame)
+            if new_frame is not None:
+                last_seq = seq
+                cv2.imshow(window_name, new_frame)
+
+            key = cv2.waitKey(10)
+            if key == 27:  # ESC
+                break
+    finally:
+        buffer.close()
+        cv2.destroyAllWindows()
+
+
+# Visualizador standalone
+if __name__ == "__main__":
+    import sys
+
+    buffer_name = sys.argv[1] if len(sys.argv) > 1 else "assistente_frames"
+    view(buffer_name)
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+Fontes de frames para os assistentes
+Abstrai de onde vêm os frames: webcam, arquivo de vídeo, diretório de
+imagens ou sessão de landmarks gravada, com reprodução em tempo real ou
+"o mais rápido possível" para benchmarks sem câmera
+"""
+import os
+import time
+
+import cv2
+import numpy as np
+
+from landmark_recorder import LandmarkStream
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource:
+    """
+    Interface comum das fontes de frames.
+
+    Subclasses implementam `_read_frame`; o controle de ritmo (tempo real
+    ou máxima velocidade) e as estatísticas ficam aqui.
+    """
+
+    # Fontes que já entregam as mãos detectadas (o assistente pula o MediaPipe)
+    provides_landmarks = False
+
+    def __init__(self, fps=30.0, realtime=True):
+        """
+        Args:
+            fps (float): Taxa de quadros nominal da fonte
+            realtime (bool): Se False, entrega frames o mais rápido possível
+        """
+        self.fps = fps or 30.0
+        self.realtime = realtime
+        self.resolution = (0, 0)
+        self.frames_read = 0
+        self._start_time = None
+        self._opened = True
+
+    def is_opened(self):
+        """Retorna True enquanto a fonte pode entregar frames"""
+        return self._opened
+
+    def read(self):
+        """
+        Lê o próximo frame.
+
+        Returns:
+            tuple: (sucesso, frame) no mesmo formato de cv2.VideoCapture.read()
+        """
+        if self._start_time is None:
+            self._start_time = time.perf_counter()
+
+        ret, frame = self._read_frame()
+        if not ret:
+            self._opened = False
+            return False, None
+
+        self.frames_read += 1
+        if self.realtime:
+            # Segurar o frame até o instante em que ele "aconteceria" ao vivo
+            due = self._start_time + self._frame_due()
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        return True, frame
+
+    def elapsed(self):
+        """Segundos desde o primeiro frame lido"""
+        if self._start_time is None:
+            return 0.0
+        return time.perf_counter() - self._start_time
+
+    def measured_fps(self):
+        """Taxa média de frames efetivamente entregues"""
+        elapsed = self.elapsed()
+        return self.frames_read / elapsed if elapsed > 0 else 0.0
+
+    def release(self):
+        """Libera os recursos da fonte"""
+        self._opened = False
+
+    def _read_frame(self):
+        raise NotImplementedError
+
+    def _frame_due(self):
+        """Segundos após o 1º frame em que o frame recém-lido deve sair (ritmo nominal)"""
+        return self.frames_read / self.fps
+
+
+class CameraSource(FrameSource):
+    """Webcam ao vivo (a própria câmera dita o ritmo)"""
+
+    def __init__(self, index=0, width=1280, height=720, fourcc="MJPG", buffer_size=1):
+        """
+        Args:
+            index (int): Índice da câmera para cv2.VideoCapture
+            width (int): Largura de captura solicitada
+            height (int): Altura de captura solicitada
+            fourcc (str): Formato pedido à câmera; MJPG permite 720p a 30 FPS
+                em USB 2.0, onde o YUYV cai para ~10 FPS (None mantém o padrão)
+            buffer_size (int): Frames enfileirados no driver; 1 entrega sempre
+                o mais recente (None mantém o padrão)
+        """
+        super().__init__(realtime=False)
+        self.capture = cv2.VideoCapture(index)
+        # O formato vem antes da resolução: alguns drivers só aceitam 720p em MJPG
+        if fourcc:
+            self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if buffer_size:
+            self.capture.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+        # Resolução negociada (os assistentes desenham a UI com ela)
+        self.resolution = (int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)) or width,
+                           int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) or height)
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        code = int(self.capture.get(cv2.CAP_PROP_FOURCC))
+        self.fourcc = code.to_bytes(4, "little").decode("ascii", "replace") if code else None
+        if self.capture.isOpened():
+            print(f"[CAMERA] {self.resolution[0]}x{self.resolution[1]} @ {self.fps:.0f} FPS, "
+                  f"formato {self.fourcc or '?'}")
+
+    def is_opened(self):
+        return self._opened and self.capture.isOpened()
+
+    def _read_frame(self):
+        return self.capture.read()
+
+    def release(self):
+        super().release()
+        self.capture.release()
+
+
+class VideoFileSource(FrameSource):
+    """Arquivo de vídeo gravado (mp4, avi, ...)"""
+
+    def __init__(self, path, realtime=True, loop=False):
+        """
+        Args:
+            path (str): Caminho do arquivo de vídeo
+            realtime (bool): Respeitar o FPS do arquivo
+            loop (bool): Recomeçar do início ao chegar no fim
+        """
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError(f"Não foi possível abrir o vídeo '{path}'")
+
+        super().__init__(fps=self.capture.get(cv2.CAP_PROP_FPS), realtime=realtime)
+        self.path = path
+        self.loop = loop
+        self.resolution = (
+            int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        )
+
+    def _read_frame(self):
+        ret, frame = self.capture.read()
+        if not ret and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        return ret, frame
+
+    def release(self):
+        super().release()
+        self.capture.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Sequência de imagens em um diretório, em ordem alfabética"""
+
+    def __init__(self, path, fps=30.0, realtime=True, loop=False):
+        """
+        Args:
+            path (str): Diretório com as imagens
+            fps (float): Taxa de quadros simulada
+            realtime (bool): Respeitar o FPS simulado
+            loop (bool): Recomeçar do início ao chegar no fim
+        """
+        super().__init__(fps=fps, realtime=realtime)
+        self.path = path
+        self.loop = loop
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.files:
+            raise IOError(f"Nenhuma imagem encontrada em '{path}'")
+
+        first = cv2.imread(self.files[0])
+        self.resolution = (first.shape[1], first.shape[0])
+        self._next_index = 0
+
+    def _read_frame(self):
+        if self._next_index >= len(self.files):
+            if not self.loop:
+                return False, None
+            self._next_index = 0
+
+        frame = cv2.imread(self.files[self._next_index])
+        self._next_index += 1
+        return frame is not None, frame
+
+
+class LandmarkStreamSource(FrameSource):
+    """
+    Sessão de landmarks gravada com `LandmarkRecorder`.
+
+    Entrega um frame preto (para a UI) e as mãos gravadas em `last_hands`,
+    já no espaço de coordenadas da tela; o assistente não roda detecção.
+    """
+
+    provides_landmarks = True
+
+    def __init__(self, path, realtime=True, loop=False):
+        """
+        Args:
+            path (str): Caminho base da gravação
+            realtime (bool): Respeitar o ritmo original da gravação
+            loop (bool): Recomeçar do início ao chegar no fim
+        """
+        self.stream = LandmarkStream(path)
+        duration = self.stream.duration()
+        fps = (len(self.stream) - 1) / duration if duration > 0 else 30.0
+
+        super().__init__(fps=fps, realtime=realtime)
+        self.loop = loop
+        self.resolution = self.stream.resolution
+        self.last_hands = []
+        self._blank = np.zeros((self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
+        self._next_index = 0
+        self._loop_offset = 0.0   # Duração das voltas já tocadas (loop)
+        self._due = 0.0
+
+    def _read_frame(self):
+        if self._next_index >= len(self.stream):
+            if not self.loop or not len(self.stream):
+                return False, None
+            self._next_index = 0
+            self._loop_offset += self.stream.duration() + 1.0 / self.fps
+
+        timestamps = self.stream.timestamps
+        self._due = self._loop_offset + float(timestamps[self._next_index] - timestamps[0])
+        self.last_hands = self.stream.hands(self._next_index)
+        self._next_index += 1
+        return True, self._blank.copy()
+
+    def _frame_due(self):
+        """Instante gravado do frame: gravações com taxa variável não derivam"""
+        return self._due
+
+
+def open_source(spec=0, realtime=True, width=1280, height=720):
+    """
+    Cria a fonte de frames adequada a partir de uma especificação.
+
+    Args:
+        spec (int or str): Índice da câmera, arquivo de vídeo, diretório de
+            imagens ou gravação de landmarks (.lmk)
+        realtime (bool): Para fontes gravadas, False reproduz o mais rápido possível
+        width (int): Largura de captura (apenas câmera)
+        height (int): Altura de captura (apenas câmera)
+
+    Returns:
+        FrameSource: Fonte pronta para leitura
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec), width, height)
+
+    if spec.endswith(".lmk") or os.path.exists(spec + ".lmk"):
+        return LandmarkStreamSource(spec, realtime=realtime)
+
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, realtime=realtime)
+
+    return VideoFileSource(spec, realtime=realtime)
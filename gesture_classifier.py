@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+Classificador de gestos aprendido
+Uma rede neural pequena (uma camada oculta, NumPy puro) sobre os landmarks
+normalizados: origem no pulso, escala pelo tamanho da palma e mão esquerda
+espelhada, para que o mesmo modelo sirva às duas mãos e a qualquer
+distância da câmera. Treinada a partir de sessões gravadas com
+--record-landmarks; a predição é uma multiplicação de matrizes por mão
+(microssegundos) e devolve a confiança de cada classe.
+
+Treino:
+    python gesture_classifier.py train PINCH=gravacoes/pinca OK=gravacoes/ok
+    python gesture_classifier.py train gravacoes/sessao   # sem rótulo: usa as regras atuais
+    python gesture_classifier.py evaluate gesture_model.npz PINCH=gravacoes/pinca2
+
+Gravações rotuladas como UNKNOWN servem de exemplos negativos ("nenhum gesto").
+"""
+import numpy as np
+
+
+NUM_LANDMARKS = 21
+NUM_FEATURES = NUM_LANDMARKS * 3
+
+# Classe de "nenhum gesto" (mesmo nome usado pelo GestureRecognizer)
+UNKNOWN = 'UNKNOWN'
+
+
+def hand_features(points, left):
+    """
+    Normaliza landmarks (vetorizado para várias mãos).
+
+    Args:
+        points (numpy.ndarray): (N, 21, 3) coordenadas em pixels
+        left (numpy.ndarray): (N,) True para mãos esquerdas (espelhadas em x)
+
+    Returns:
+        numpy.ndarray: (N, 63) float32
+    """
+    points = np.asarray(points, dtype=np.float32)
+    relative = points - points[:, :1]
+    # Tamanho da palma: pulso (0) -> base do dedo médio (9), só em x/y
+    palm = np.linalg.norm(relative[:, 9, :2], axis=1)
+    relative /= np.maximum(palm, 1e-6)[:, None, None]
+    relative[np.asarray(left, dtype=bool), :, 0] *= -1
+    return relative.reshape(len(points), NUM_FEATURES)
+
+
+def features(hand):
+    """Vetor de features (63,) de uma mão no formato de `detect_hands`"""
+    relative = np.asarray(hand['coordenadas'], dtype=np.float32)
+    relative -= relative[0]
+    dx, dy = float(relative[9, 0]), float(relative[9, 1])
+    relative *= 1.0 / max((dx * dx + dy * dy) ** 0.5, 1e-6)
+    if hand.get('side') == 'Left':
+        relative[:, 0] *= -1
+    return relative.reshape(NUM_FEATURES)
+
+
+class GestureClassifier:
+    """
+    MLP (63 -> oculta -> classes) com softmax.
+
+    Uso:
+        classifier = GestureClassifier.load("gesture_model.npz")
+        gesture, confidence = classifier.predict(hand)
+    """
+
+    def __init__(self, classes, hidden=32, seed=0):
+        """
+        Args:
+            classes (list): Nomes das classes (gestos)
+            hidden (int): Neurônios da camada oculta
+            seed (int): Semente da inicialização dos pesos
+        """
+        self.classes = [str(name) for name in classes]
+        rng = np.random.default_rng(seed)
+        self.mean = np.zeros(NUM_FEATURES, dtype=np.float32)
+        self.std = np.ones(NUM_FEATURES, dtype=np.float32)
+        self.w1 = (rng.standard_normal((NUM_FEATURES, hidden)) * np.sqrt(2 / NUM_FEATURES)).astype(np.float32)
+        self.b1 = np.zeros(hidden, dtype=np.float32)
+        self.w2 = (rng.standard_normal((hidden, len(self.classes))) * np.sqrt(1 / hidden)).astype(np.float32)
+        self.b2 = np.zeros(len(self.classes), dtype=np.float32)
+        self._fold()
+
+    def _fold(self):
+        """Incorpora a padronização (média/desvio) na 1ª camada para a predição"""
+        self._w1 = (self.w1 / self.std[:, None]).astype(np.float32)
+        self._b1 = (self.b1 - (self.mean / self.std) @ self.w1).astype(np.float32)
+
+    def _forward(self, x):
+        hidden = np.maximum((x - self.mean) / self.std @ self.w1 + self.b1, 0)
+        logits = hidden @ self.w2 + self.b2
+        logits -= logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return hidden, exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict_proba(self, x):
+        """
+        Probabilidade de cada classe.
+
+        Args:
+            x (numpy.ndarray): Features (63,) ou (N, 63)
+
+        Returns:
+            numpy.ndarray: (classes,) ou (N, classes), na ordem de `classes`
+        """
+        return self._forward(x)[1]
+
+    def predict(self, hand):
+        """
+        Classifica uma mão.
+
+        Args:
+            hand (dict): Mão no formato de `detect_hands`
+
+        Returns:
+            tuple: (gesto, confiança)
+        """
+        hidden = features(hand) @ self._w1
+        hidden += self._b1
+        np.maximum(hidden, 0, out=hidden)
+        logits = hidden @ self.w2
+        logits += self.b2
+        best = int(logits.argmax())
+        # Softmax só para a confiança da classe vencedora
+        confidence = 1.0 / float(np.exp(logits - logits[best]).sum())
+        return self.classes[best], confidence
+
+    def fit(self, x, y, epochs=300, learning_rate=0.01, weight_decay=1e-4,
+            batch_size=256, seed=0):
+        """
+        Treina com Adam e entropia cruzada.
+
+        Args:
+            x (numpy.ndarray): (N, 63) features
+            y (numpy.ndarray): (N,) índice da classe de cada amostra
+            epochs (int): Passadas sobre os dados
+            learning_rate (float): Taxa de aprendizado
+            weight_decay (float): Regularização L2
+            batch_size (int): Amostras por passo
+            seed (int): Semente do embaralhamento
+
+        Returns:
+            float: Perda média da última época
+        """
+        x = np.asarray(x, dtype=np.float32)
+        y = np.asarray(y, dtype=np.int64)
+        self.mean = x.mean(axis=0)
+        self.std = np.maximum(x.std(axis=0), 1e-3)
+
+        params = [self.w1, self.b1, self.w2, self.b2]
+        moments = [np.zeros_like(p) for p in params]
+        velocities = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        rng = np.random.default_rng(seed)
+        onehot = np.eye(len(self.classes), dtype=np.float32)[y]
+        step = 0
+        loss = 0.0
+
+        for _ in range(epochs):
+            order = rng.permutation(len(x))
+            losses = []
+            for start in range(0, len(x), batch_size):
+                batch = order[start:start + batch_size]
+                inputs = (x[batch] - self.mean) / self.std
+                hidden, probabilities = self._forward(x[batch])
+                losses.append(-np.log(probabilities[np.arange(len(batch)), y[batch]] + 1e-9).mean())
+
+                # Retropropagação
+                d_logits = (probabilities - onehot[batch]) / len(batch)
+                d_hidden = (d_logits @ self.w2.T) * (hidden > 0)
+                grads = [inputs.T @ d_hidden + weight_decay * self.w1, d_hidden.sum(axis=0),
+                         hidden.T @ d_logits + weight_decay * self.w2, d_logits.sum(axis=0)]
+
+                step += 1
+                for param, grad, m, v in zip(params, grads, moments, velocities):
+                    m *= beta1
+                    m += (1 - beta1) * grad
+                    v *= beta2
+                    v += (1 - beta2) * grad * grad
+                    m_hat = m / (1 - beta1 ** step)
+                    v_hat = v / (1 - beta2 ** step)
+                    param -= (learning_rate * m_hat / (np.sqrt(v_hat) + eps)).astype(param.dtype)
+            loss = float(np.mean(losses))
+        self._fold()
+        return loss
+
+    def accuracy(self, x, y):
+        """Fração de amostras classificadas corretamente"""
+        if len(x) == 0:
+            return 0.0
+        return float((self.predict_proba(x).argmax(axis=1) == np.asarray(y)).mean())
+
+    def save(self, path):
+        """Salva o modelo em um .npz"""
+        np.savez(path, classes=np.array(self.classes), mean=self.mean, std=self.std,
+                 w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2)
+
+    @classmethod
+    def load(cls, path):
+        """Carrega um modelo salvo por `save`"""
+        with np.load(path) as data:
+            classifier = cls(data['classes'].tolist(), hidden=data['w1'].shape[1])
+            for name in ('mean', 'std', 'w1', 'b1', 'w2', 'b2'):
+                setattr(classifier, name, data[name].astype(np.float32))
+        classifier._fold()
+        return classifier
+
+
+def load_session(path, label=None, recognizer=None):
+    """
+    Amostras de uma sessão gravada (primeira mão de cada frame).
+
+    Args:
+        path (str): Gravação do LandmarkRecorder
+        label (str): Gesto de todos os frames; None rotula cada frame com
+            `recognizer` (as regras atuais), descartando os desconhecidos
+        recognizer (GestureRecognizer): Usado quando `label` é None
+
+    Returns:
+        tuple: (features (N, 63), rótulos (N,))
+    """
+    from landmark_recorder import LandmarkStream, SIDE_CODES
+
+    stream = LandmarkStream(path)
+    present = np.flatnonzero(stream.index['n_hands'] > 0)
+    points = np.asarray(stream.landmarks[present, 0], dtype=np.float32)
+    left = stream.index['sides'][present, 0] == SIDE_CODES['Left']
+    x = hand_features(points, left)
+
+    if label is not None:
+        return x, np.full(len(x), label, dtype=object)
+
+    labels = np.array([recognizer.recognize_gesture(stream.hands(i)[0]) for i in present], dtype=object)
+    keep = (labels != UNKNOWN) & (labels != 'NONE')
+    return x[keep], labels[keep]
+
+
+def load_dataset(sessions, recognizer=None):
+    """
+    Junta várias sessões.
+
+    Args:
+        sessions (list): Itens "GESTO=caminho" ou "caminho" (rotulado pelas regras)
+
+    Returns:
+        tuple: (features, rótulos)
+    """
+    xs, ys = [], []
+    for item in sessions:
+        label, _, path = item.rpartition("=")
+        x, y = load_session(path, label or None, recognizer)
+        print(f"[TREINO] {path}: {len(x)} amostras ({label or 'rotuladas pelas regras'})")
+        xs.append(x)
+        ys.append(y)
+    if not xs:
+        return np.zeros((0, NUM_FEATURES), dtype=np.float32), np.zeros(0, dtype=object)
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+# Treino e avaliação pela linha de comando
+if __name__ == "__main__":
+    import argparse
+    import time
+    from collections import Counter
+    from gesture_recognition import GestureRecognizer
+
+    parser = argparse.ArgumentParser(description="Classificador de gestos aprendido")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="Treinar a partir de gravações de landmarks")
+    train.add_argument("sessions", nargs="+", help="GESTO=gravacao ou gravacao (rótulo pelas regras)")
+    train.add_argument("-o", "--output", default="gesture_model.npz", help="Arquivo do modelo")
+    train.add_argument("--hidden", type=int, default=32, help="Neurônios da camada oculta")
+    train.add_argument("--epochs", type=int, default=300)
+    train.add_argument("--holdout", type=float, default=0.2, help="Fração reservada para validação")
+
+    evaluate = commands.add_parser("evaluate", help="Acurácia de um modelo em gravações")
+    evaluate.add_argument("model")
+    evaluate.add_argument("sessions", nargs="+", help="GESTO=gravacao ou gravacao")
+    args = parser.parse_args()
+
+    recognizer = GestureRecognizer()
+    x, labels = load_dataset(args.sessions, recognizer)
+    if len(x) == 0:
+        parser.error("nenhuma amostra com mão nas gravações")
+    print(f"[TREINO] {len(x)} amostras: " +
+          ", ".join(f"{name}={count}" for name, count in Counter(labels).most_common()))
+
+    if args.command == "train":
+        classes = sorted(set(labels))
+        y = np.searchsorted(np.array(classes), labels.astype(str))
+        order = np.random.default_rng(0).permutation(len(x))
+        split = int(len(x) * (1 - args.holdout))
+        train_idx, valid_idx = order[:split], order[split:]
+
+        classifier = GestureClassifier(classes, hidden=args.hidden)
+        start = time.perf_counter()
+        loss = classifier.fit(x[train_idx], y[train_idx], epochs=args.epochs)
+        print(f"[TREINO] {time.perf_counter() - start:.1f}s, perda {loss:.4f}, "
+              f"treino {classifier.accuracy(x[train_idx], y[train_idx]):.1%}, "
+              f"validação {classifier.accuracy(x[valid_idx], y[valid_idx]):.1%}")
+        classifier.save(args.output)
+        print(f"[TREINO] Modelo salvo em {args.output} (classes: {', '.join(classes)})")
+    else:
+        classifier = GestureClassifier.load(args.model)
+        known = np.isin(labels.astype(str), classifier.classes)
+        y = np.array([classifier.classes.index(name) for name in labels[known]])
+        print(f"Acurácia: {classifier.accuracy(x[known], y):.1%} "
+              f"({known.sum()} amostras de classes conhecidas)")
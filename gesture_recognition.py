@@ -2,7 +2,74 @@
 """
 Módulo de reconhecimento de gestos
 Identifica gestos específicos das mãos usando os landmarks do MediaPipe
+
+Gestos e ações extras (ex.: de um classificador treinado) podem ser
+declarados em gesture_actions.json, sem mudar o código:
+    {"PINCH": {"action": "RECORD", "description": "Pinça"}, "OK": "ACTIVATE"}
 """
+import json
+import os
+
+import numpy as np
+
+
+DEFAULT_ACTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gesture_actions.json")
+
+# Cadeia de landmarks de cada dedo, do pulso à ponta (polegar ao mínimo);
+# o ângulo entre segmentos vizinhos mede o quanto o dedo dobra em cada junta
+FINGER_CHAINS = np.array([
+    [0, 1, 2, 3, 4],
+    [0, 5, 6, 7, 8],
+    [0, 9, 10, 11, 12],
+    [0, 13, 14, 15, 16],
+    [0, 17, 18, 19, 20],
+])
+
+# Dobra total máxima (graus) para considerar o dedo esticado
+FINGER_BEND_LIMIT = 100.0
+# Polegar: dobra máxima nas duas últimas juntas e distância mínima da ponta
+# até a base do indicador (em tamanhos de palma), para não contar o polegar
+# encolhido sobre a palma
+THUMB_BEND_LIMIT = 50.0
+THUMB_REACH = 0.55
+
+
+def finger_states_from_angles(points):
+    """
+    Dedos esticados pelos ângulos das articulações (vetorizado).
+
+    Ângulos e distâncias relativas ao tamanho da palma não mudam com
+    rotação, inclinação ou distância da mão até a câmera, nem dependem do
+    lado da mão.
+
+    Args:
+        points (numpy.ndarray): (21, 3) ou (N, 21, 3) landmarks
+
+    Returns:
+        numpy.ndarray: (5,) ou (N, 5) bool [polegar, indicador, médio, anelar, mínimo]
+    """
+    points = np.asarray(points, dtype=np.float32)
+    single = points.ndim == 2
+    if single:
+        points = points[None]
+
+    # Uma só passada pelos 20 segmentos (4 por dedo), normalizados
+    chains = points[:, FINGER_CHAINS]                        # (N, 5, 5, 3)
+    segments = chains[:, :, 1:] - chains[:, :, :-1]          # (N, 5, 4, 3)
+    lengths = np.sqrt((segments * segments).sum(axis=-1, keepdims=True))
+    segments /= np.maximum(lengths, 1e-6)
+    cos = (segments[:, :, 1:] * segments[:, :, :-1]).sum(axis=-1)
+    bend = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))   # (N, 5, 3), 0 = reto
+
+    states = bend.sum(axis=-1) < FINGER_BEND_LIMIT
+
+    # Polegar: a junta da base varia muito com a pose, então conta só a
+    # dobra das duas últimas juntas e o afastamento da palma
+    palm = np.maximum(lengths[:, 2, 0, 0], 1e-6)             # Pulso -> base do médio
+    reach = np.sqrt(((points[:, 4] - points[:, 5]) ** 2).sum(axis=-1)) / palm
+    states[:, 0] = (bend[:, 0, 1:].sum(axis=-1) < THUMB_BEND_LIMIT) & (reach > THUMB_REACH)
+
+    return states[0] if single else states
 
 
 class GestureRecognizer:
@@ -10,9 +77,29 @@ class GestureRecognizer:
     Classe para reconhecer gestos específicos baseados nos landmarks da mão
     """
 
-    def __init__(self):
-        """Inicializa o reconhecedor de gestos"""
-        pass
+    def __init__(self, classifier=None, min_confidence=0.6, finger_mode="position"):
+        """
+        Inicializa o reconhecedor de gestos
+
+        Args:
+            classifier: GestureClassifier ou caminho de um modelo .npz; None
+                usa apenas as regras por contagem de dedos
+            min_confidence (float): Confiança mínima do classificador
+                (abaixo dela o gesto é 'UNKNOWN')
+            finger_mode (str): Como decidir se um dedo está levantado:
+                "position" (ponta acima da junta, mão de pé) ou "angles"
+                (ângulos das articulações, vale com a mão inclinada/girada)
+        """
+        if finger_mode not in ("position", "angles"):
+            raise ValueError(f"Modo de dedos desconhecido: {finger_mode}")
+        self.finger_mode = finger_mode
+        if isinstance(classifier, str):
+            from gesture_classifier import GestureClassifier
+            classifier = GestureClassifier.load(classifier)
+            print(f"[GESTOS] Classificador carregado: {', '.join(classifier.classes)}")
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        self.last_confidence = 1.0
 
     def count_fingers(self, hand):
         """
@@ -31,6 +118,10 @@ class GestureRecognizer:
             return 0, [False, False, False, False, False]
 
         coords = hand['coordenadas']
+        if self.finger_mode == "angles":
+            fingers = finger_states_from_angles(coords).tolist()
+            return sum(fingers), fingers
+
         fingers = []
 
         # Verificar polegar (lógica diferente dos outros dedos)
@@ -67,6 +158,10 @@ class GestureRecognizer:
         if not hand:
             return 'NONE'
 
+        if self.classifier is not None:
+            gesture, self.last_confidence = self.classifier.predict(hand)
+            return gesture if self.last_confidence >= self.min_confidence else 'UNKNOWN'
+
         total, fingers = self.count_fingers(hand)
 
         # Gestos específicos
@@ -112,20 +207,30 @@ class GestureRecognizer:
         Returns:
             str: Descrição do gesto
         """
-        descriptions = {
-            'NONE': 'Nenhuma mão detectada',
-            'FIST': 'Punho fechado',
-            'OPEN_HAND': 'Mão aberta',
-            'ONE_FINGER': 'Um dedo (indicador)',
-            'THUMBS_UP': 'Polegar para cima',
-            'PEACE': 'Sinal de paz (V)',
-            'CALL_ME': 'Me liga (polegar + mínimo)',
-            'THREE': 'Três dedos',
-            'FOUR': 'Quatro dedos',
-            'UNKNOWN': 'Gesto não reconhecido'
-        }
-        return descriptions.get(gesture, 'Desconhecido')
-
+        if gesture in GESTURE_DESCRIPTIONS:
+            return GESTURE_DESCRIPTIONS[gesture]
+        if self.classifier is not None and gesture in self.classifier.classes:
+            return gesture  # Gesto aprendido sem descrição cadastrada
+        return 'Desconhecido'
+
+
+GESTURE_DESCRIPTIONS = {
+    'NONE': 'Nenhuma mão detectada',
+    'FIST': 'Punho fechado',
+    'OPEN_HAND': 'Mão aberta',
+    'ONE_FINGER': 'Um dedo (indicador)',
+    'THUMBS_UP': 'Polegar para cima',
+    'PEACE': 'Sinal de paz (V)',
+    'CALL_ME': 'Me liga (polegar + mínimo)',
+    'THREE': 'Três dedos',
+    'FOUR': 'Quatro dedos',
+    'UNKNOWN': 'Gesto não reconhecido',
+    # Gestos dinâmicos (dynamic_gestures.py)
+    'SWIPE_LEFT': 'Deslizar para a esquerda',
+    'SWIPE_RIGHT': 'Deslizar para a direita',
+    'CIRCLE_CW': 'Círculo horário',
+    'CIRCLE_CCW': 'Círculo anti-horário',
+}
 
 # Mapeamento de gestos para ações do assistente
 GESTURE_ACTIONS = {
@@ -133,9 +238,66 @@ GESTURE_ACTIONS = {
     'ONE_FINGER': 'RECORD',       # Um dedo = Iniciar gravação
     'FIST': 'DEACTIVATE',         # Punho = Desativar assistente
     'PEACE': 'CANCEL',            # Dois dedos = Cancelar operação
+    'SWIPE_RIGHT': 'NEXT',        # Deslizar para a direita = Próxima faixa
+    'SWIPE_LEFT': 'PREVIOUS',     # Deslizar para a esquerda = Faixa anterior
+    'CIRCLE_CW': 'VOLUME_UP',     # Círculo horário = Aumentar volume
+    'CIRCLE_CCW': 'VOLUME_DOWN',  # Círculo anti-horário = Diminuir volume
+}
+
+# Ações executadas como o comando de voz equivalente (CommandExecutor)
+ACTION_COMMANDS = {
+    'NEXT': 'próxima faixa',
+    'PREVIOUS': 'faixa anterior',
+    'VOLUME_UP': 'aumentar volume',
+    'VOLUME_DOWN': 'diminuir volume',
 }
 
 
+def load_gesture_actions(path=None):
+    """
+    Acrescenta gestos/ações de um arquivo JSON a GESTURE_ACTIONS.
+
+    Cada entrada é "GESTO": "AÇÃO" ou "GESTO": {"action": ..., "description": ...};
+    uma ação null remove o gesto do mapeamento.
+
+    Um arquivo inválido é ignorado com um aviso (os gestos padrão continuam
+    valendo), para não derrubar os assistentes na importação.
+
+    Args:
+        path (str): Arquivo JSON (padrão: GESTURE_ACTIONS_FILE ou gesture_actions.json)
+
+    Returns:
+        int: Gestos lidos (0 se o arquivo não existe ou é inválido)
+    """
+    path = path or os.getenv("GESTURE_ACTIONS_FILE") or DEFAULT_ACTIONS_FILE
+    if not os.path.exists(path):
+        return 0
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        if not isinstance(entries, dict):
+            raise ValueError("o arquivo deve conter um objeto {\"GESTO\": \"AÇÃO\"}")
+    except (OSError, ValueError) as e:   # json.JSONDecodeError é um ValueError
+        print(f"[GESTOS] {path} inválido, usando os gestos padrão: {e}")
+        return 0
+
+    for gesture, entry in entries.items():
+        if isinstance(entry, dict):
+            action = entry.get("action")
+            if entry.get("description"):
+                GESTURE_DESCRIPTIONS[gesture] = entry["description"]
+        else:
+            action = entry
+        if action is None:
+            GESTURE_ACTIONS.pop(gesture, None)
+        else:
+            GESTURE_ACTIONS[gesture] = action
+    return len(entries)
+
+
+load_gesture_actions()
+
+
 def get_action_from_gesture(gesture):
     """
     Mapeia um gesto para uma ação do assistente.
@@ -149,6 +311,35 @@ def get_action_from_gesture(gesture):
     return GESTURE_ACTIONS.get(gesture, None)
 
 
+def gesture_events(recognizer, hands, last_gesture, dynamic_gestures=None, timestamp=None):
+    """
+    Gestos a processar em um frame: o gesto da primeira mão, quando muda, e
+    os gestos de movimento (deslizar, círculos).
+
+    Args:
+        recognizer (GestureRecognizer): Reconhecedor de gestos estáticos
+        hands (list): Mãos detectadas no frame atual
+        last_gesture (str): Gesto do frame anterior ('NONE' sem mão)
+        dynamic_gestures (DynamicGestureRecognizer): Opcional
+        timestamp (float): Instante do frame (exigido com `dynamic_gestures`)
+
+    Returns:
+        tuple: (gesto atual, lista de gestos/eventos a processar em ordem)
+    """
+    events = []
+    if hands:
+        gesture = recognizer.recognize_gesture(hands[0])
+        # Só processar se o gesto mudou
+        if gesture != last_gesture:
+            events.append(gesture)
+    else:
+        gesture = 'NONE'
+
+    if dynamic_gestures is not None:
+        events.extend(dynamic_gestures.update(hands, timestamp))
+    return gesture, events
+
+
 # Exemplo de uso
 if __name__ == "__main__":
     # Teste do reconhecedor
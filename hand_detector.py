@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Detector de mãos compartilhado
+Um só lugar para a detecção com MediaPipe e a extração dos landmarks,
+usado pelos dois assistentes, pelo multi_stream e pelo detect_webcam.
+Reaproveita o buffer RGB entre frames e separa o desenho da detecção.
+
+Resolução dupla: com `inference_width` o MediaPipe roda em uma cópia
+reduzida do frame (ex.: 320x180) e os landmarks, que ele devolve
+normalizados, são convertidos para pixels da resolução de exibição.
+
+Backends (`create_hand_detector`):
+    solutions  mp.solutions.hands (síncrono; model_complexity 0 ou 1)
+    tasks      HandLandmarker do MediaPipe Tasks em LIVE_STREAM: o frame é
+               enviado e o loop segue; o resultado chega por callback e
+               `detect` devolve a detecção mais recente já concluída
+
+Configuração: HAND_LANDMARKER_MODEL (padrão: hand_landmarker.task ao lado
+deste arquivo; download em HAND_LANDMARKER_URL)
+"""
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from startup import lazy_import
+
+mp = lazy_import("mediapipe")
+
+# Ligações entre landmarks (as mesmas de mp.solutions.hands.HAND_CONNECTIONS)
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+DEFAULT_LANDMARKER_MODEL = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        "hand_landmarker.task")
+HAND_LANDMARKER_URL = ("https://storage.googleapis.com/mediapipe-models/hand_landmarker/"
+                       "hand_landmarker/float16/latest/hand_landmarker.task")
+
+BACKENDS = ("solutions", "tasks")
+
+
+def downscale(frame, width, dst=None):
+    """
+    Reduz um frame para a largura dada, mantendo a proporção.
+
+    Args:
+        frame (numpy.ndarray): Frame BGR
+        width (int): Largura desejada (None ou >= largura atual: sem redução)
+        dst (numpy.ndarray): Buffer reaproveitado, se já tiver o tamanho certo
+
+    Returns:
+        numpy.ndarray: Frame reduzido (em `dst`, quando possível) ou o próprio frame
+    """
+    height, frame_width = frame.shape[:2]
+    if not width or frame_width <= width:
+        return frame
+    size = (width, max(1, round(height * width / frame_width)))
+    if dst is None or dst.shape[:2] != (size[1], size[0]):
+        dst = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+    # INTER_AREA: média dos pixels, sem serrilhado na redução
+    return cv2.resize(frame, size, dst=dst, interpolation=cv2.INTER_AREA)
+
+
+class HandDetector:
+    """
+    Detecta mãos em frames BGR e devolve os landmarks em pixels.
+
+    Uso:
+        detector = HandDetector(max_num_hands=1)
+        hands = detector.detect(frame)   # [{'coordenadas': [(x, y, z)] * 21, 'side': 'Left'}]
+        detector.draw(frame)             # opcional: desenha a última detecção
+    """
+
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.7,
+                 min_tracking_confidence=0.5, side_inverted=True, hands=None,
+                 inference_width=None, model_complexity=1):
+        """
+        Args:
+            max_num_hands (int): Mãos detectadas por frame
+            min_detection_confidence (float): Confiança mínima da detecção
+            min_tracking_confidence (float): Confiança mínima do rastreamento
+            side_inverted (bool): Trocar Left/Right (frame espelhado com cv2.flip)
+            hands: Objeto com `process(rgb)` no lugar do MediaPipe (testes/benchmarks)
+            inference_width (int): Largura do frame entregue ao MediaPipe
+                (None usa a resolução original)
+            model_complexity (int): 0 = modelo leve (mais rápido), 1 = completo
+        """
+        self.max_num_hands = max_num_hands
+        self.inference_width = inference_width
+        self.side_inverted = side_inverted
+        self.hands = hands if hands is not None else mp.solutions.hands.Hands(
+            max_num_hands=max_num_hands,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self.result = None       # Último resultado do MediaPipe (para desenhar)
+        self.last_hands = []     # Última detecção, no formato de `detect`
+        self._rgb = None
+        self._small = None
+
+    def _to_rgb(self, frame):
+        """Converte BGR -> RGB no mesmo buffer a cada frame"""
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+        self._rgb.flags.writeable = True
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        # Somente leitura: o MediaPipe usa o array sem copiar
+        self._rgb.flags.writeable = False
+        return self._rgb
+
+    def detect(self, frame, display_size=None):
+        """
+        Detecta as mãos de um frame BGR.
+
+        Args:
+            frame (numpy.ndarray): Frame da câmera
+            display_size (tuple): (largura, altura) das coordenadas devolvidas;
+                padrão: tamanho do próprio frame (use quando o frame recebido
+                já foi reduzido, ex.: multi_stream)
+
+        Returns:
+            list: Mãos no formato {'coordenadas': [(x, y, z), ...], 'side': 'Left'|'Right'}
+        """
+        small = downscale(frame, self.inference_width, self._small)
+        if small is not frame:
+            self._small = small
+        self.result = self.hands.process(self._to_rgb(small))
+        if display_size is None:
+            display_size = (frame.shape[1], frame.shape[0])
+        return self.extract(self.result, *display_size)
+
+    def extract(self, result, width, height):
+        """Converte um resultado do MediaPipe em mãos com coordenadas em pixels"""
+        all_hands = []
+        if result.multi_hand_landmarks:
+            for hand_side, hand_landmarks in zip(result.multi_handedness, result.multi_hand_landmarks):
+                # z usa a mesma escala de x, como no MediaPipe. Para 21 pontos a
+                # compreensão de lista é mais rápida que montar um array NumPy
+                coords = [(int(mark.x * width), int(mark.y * height), int(mark.z * width))
+                          for mark in hand_landmarks.landmark]
+                side = hand_side.classification[0].label
+                if self.side_inverted:
+                    side = "Right" if side == "Left" else "Left"
+                all_hands.append({'coordenadas': coords, 'side': side})
+        self.last_hands = all_hands
+        return all_hands
+
+    @property
+    def landmarks(self):
+        """Última detecção como array (mãos, 21, 3) int32, em pixels"""
+        if not self.last_hands:
+            return np.zeros((0, 21, 3), dtype=np.int32)
+        return np.array([hand['coordenadas'] for hand in self.last_hands], dtype=np.int32)
+
+    def draw(self, frame, result=None):
+        """
+        Desenha os landmarks (da última detecção, por padrão) sobre o frame.
+
+        Returns:
+            numpy.ndarray: O próprio frame
+        """
+        result = result if result is not None else self.result
+        if result is not None and result.multi_hand_landmarks:
+            for hand_landmarks in result.multi_hand_landmarks:
+                mp.solutions.drawing_utils.draw_landmarks(
+                    frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS
+                )
+        return frame
+
+    @staticmethod
+    def draw_hands(frame, hands, color=(0, 255, 0)):
+        """
+        Desenha mãos no formato de `detect` (ex.: suavizadas ou previstas,
+        sem resultado do MediaPipe correspondente).
+
+        Returns:
+            numpy.ndarray: O próprio frame
+        """
+        for hand in hands:
+            points = [point[:2] for point in hand['coordenadas']]
+            for start, end in HAND_CONNECTIONS:
+                cv2.line(frame, points[start], points[end], color, 2)
+            for point in points:
+                cv2.circle(frame, point, 4, (0, 0, 255), -1)
+        return frame
+
+    def close(self):
+        """Libera o grafo do MediaPipe"""
+        close = getattr(self.hands, "close", None)
+        if close is not None:
+            close()
+
+
+class HandLandmarkerDetector(HandDetector):
+    """
+    Detector com o HandLandmarker do MediaPipe Tasks, mesma interface de
+    HandDetector.
+
+    Em LIVE_STREAM `detect` não espera a inferência: envia o frame e devolve
+    a última detecção concluída (de um ou dois frames antes). Em VIDEO a
+    chamada é síncrona, útil para comparar o custo de inferência.
+    """
+
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.7,
+                 min_tracking_confidence=0.5, side_inverted=True, model_path=None,
+                 inference_width=None, running_mode="live_stream"):
+        """
+        Args:
+            max_num_hands, min_detection_confidence, min_tracking_confidence,
+            side_inverted, inference_width: Como em HandDetector
+            model_path (str): Modelo .task (padrão: HAND_LANDMARKER_MODEL ou
+                hand_landmarker.task ao lado deste arquivo)
+            running_mode (str): "live_stream" (assíncrono) ou "video" (síncrono)
+        """
+        model_path = model_path or os.getenv("HAND_LANDMARKER_MODEL") or DEFAULT_LANDMARKER_MODEL
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Modelo do HandLandmarker não encontrado: {model_path} "
+                                    f"(baixe em {HAND_LANDMARKER_URL})")
+
+        self.max_num_hands = max_num_hands
+        self.inference_width = inference_width
+        self.side_inverted = side_inverted
+        self.live = running_mode == "live_stream"
+        self.result = None
+        self.last_hands = []
+        self.latency = None        # Envio -> resultado da última detecção (s)
+        self._rgb = None
+        self._small = None
+        self._latest = None        # (resultado, timestamp_ms) entregue pelo callback
+        self._extracted = None     # Resultado já convertido em `last_hands`
+        self._sent = {}            # timestamp_ms -> instante do envio
+        self._lock = threading.Lock()
+        self._last_timestamp = -1
+
+        vision = mp.tasks.vision
+        options = vision.HandLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM if self.live else vision.RunningMode.VIDEO,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result if self.live else None
+        )
+        self.hands = vision.HandLandmarker.create_from_options(options)
+
+    def _timestamp(self):
+        """Timestamps em ms estritamente crescentes (exigência do MediaPipe)"""
+        timestamp = max(int(time.monotonic() * 1000), self._last_timestamp + 1)
+        self._last_timestamp = timestamp
+        return timestamp
+
+    def _on_result(self, result, image, timestamp_ms):
+        """Callback do MediaPipe (roda na thread dele)"""
+        with self._lock:
+            sent = self._sent.pop(timestamp_ms, None)
+            # Envios anteriores a este não terão mais resultado
+            for old in [t for t in self._sent if t < timestamp_ms]:
+                del self._sent[old]
+        if sent is not None:
+            self.latency = time.perf_counter() - sent
+        self._latest = (result, timestamp_ms)   # Troca atômica
+
+    def detect(self, frame, display_size=None):
+        """
+        Envia um frame BGR ao HandLandmarker.
+
+        Returns:
+            list: Mãos da detecção mais recente já concluída (LIVE_STREAM) ou
+                deste frame (VIDEO), no formato de HandDetector.detect
+        """
+        small = downscale(frame, self.inference_width, self._small)
+        if small is not frame:
+            self._small = small
+        # mp.Image copia os pixels: o buffer RGB pode ser reaproveitado já no próximo frame
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=self._to_rgb(small))
+        timestamp = self._timestamp()
+        if display_size is None:
+            display_size = (frame.shape[1], frame.shape[0])
+
+        if not self.live:
+            start = time.perf_counter()
+            self.result = self.hands.detect_for_video(image, timestamp)
+            self.latency = time.perf_counter() - start
+            return self.extract(self.result, *display_size)
+
+        with self._lock:
+            self._sent[timestamp] = time.perf_counter()
+        self.hands.detect_async(image, timestamp)
+
+        latest = self._latest
+        if latest is not None and latest is not self._extracted:
+            self._extracted = latest
+            self.result = latest[0]
+            self.extract(self.result, *display_size)
+        return self.last_hands
+
+    def extract(self, result, width, height):
+        """Converte um HandLandmarkerResult em mãos com coordenadas em pixels"""
+        all_hands = []
+        for handedness, hand_landmarks in zip(result.handedness, result.hand_landmarks):
+            coords = [(int(mark.x * width), int(mark.y * height), int(mark.z * width))
+                      for mark in hand_landmarks]
+            side = handedness[0].category_name
+            if self.side_inverted:
+                side = "Right" if side == "Left" else "Left"
+            all_hands.append({'coordenadas': coords, 'side': side})
+        self.last_hands = all_hands
+        return all_hands
+
+    def draw(self, frame, result=None):
+        """Desenha a última detecção (os resultados do Tasks não usam drawing_utils)"""
+        return self.draw_hands(frame, self.last_hands)
+
+
+def create_hand_detector(backend="solutions", model_complexity=1, **options):
+    """
+    Cria o detector do backend escolhido.
+
+    Args:
+        backend (str): "solutions" ou "tasks" (ver BACKENDS)
+        model_complexity (int): Complexidade do modelo (apenas "solutions"; o
+            HandLandmarker usa o modelo do arquivo .task)
+        **options: Repassadas ao construtor (max_num_hands, inference_width...)
+
+    Returns:
+        HandDetector: Detector pronto para `detect(frame)`
+    """
+    if backend == "tasks":
+        return HandLandmarkerDetector(**options)
+    if backend != "solutions":
+        raise ValueError(f"Backend de detecção desconhecido: {backend} (opções: {', '.join(BACKENDS)})")
+    return HandDetector(model_complexity=model_complexity, **options)
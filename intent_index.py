@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+"""
+Índice semântico de intenções sobre o catálogo de comandos
+Quando nenhuma palavra-chave do catálogo aparece no texto ("aumenta o som",
+"tira um print"), a frase é comparada com a descrição e os apelidos de cada
+comando antes de ir para a IA. Cada texto do catálogo vira um vetor uma única
+vez; os vetores ficam em disco (ao lado do catálogo) e só são recalculados
+quando o catálogo ou o embedder mudam. Cada frase nova custa um embedding e
+um produto matriz-vetor.
+
+Embedders:
+    hash                    n-gramas de caracteres com hashing + IDF do catálogo
+                            (NumPy puro, sem modelo; tolera conjugação e erros
+                            de transcrição: "aumenta" ~ "aumentar")
+    ollama:<modelo>         embeddings do Ollama (ex.: ollama:nomic-embed-text)
+
+Com o embedder hash, além da similaridade mínima, pelo menos duas palavras
+da frase precisam aparecer no comando escolhido: uma única palavra em comum
+com um apelido curto ("tela", "música", "anterior") não basta, e a frase vai
+para a IA.
+
+Configuração: INTENT_EMBEDDER (padrão: hash), INTENT_THRESHOLD (similaridade
+mínima; padrão por embedder), INTENT_INDEX (arquivo .npz; padrão:
+<catálogo>.intents.npz)
+"""
+import hashlib
+import json
+import os
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+from startup import lazy_import
+
+ollama = lazy_import("ollama")
+
+
+# Similaridade mínima (cosseno) por embedder
+DEFAULT_THRESHOLDS = {"hash": 0.35, "ollama": 0.70}
+
+# Fração dos n-gramas de uma palavra presentes no comando para ela contar como
+# encontrada ("aumenta" ~ "aumentar" passa, "posterior" ~ "anterior" não)
+WORD_MATCH = 0.7
+
+# Palavras sem conteúdo para a intenção (pedidos, artigos, preposições)
+STOPWORDS = frozenset("""
+a o as os um uma uns umas de da do das dos e em no na nos nas ao aos pra pro para
+por com me mim meu minha te se eu voce vc ai la aqui agora ja isso esse essa este
+esta quero queria gostaria pode poderia consegue favor por favor ver vai vamos
+""".split())
+
+
+def tokenize(text):
+    """Palavras em minúsculas, sem acentos e sem stopwords"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [word for word in re.findall(r"[a-z0-9]+", text) if word not in STOPWORDS]
+
+
+class HashingEmbedder:
+    """
+    Vetor esparso (em array denso) de palavras e n-gramas de 3 e 4 letras,
+    com hashing estável (crc32) em `dim` posições.
+    """
+
+    name = "hash"
+    uses_idf = True
+
+    def __init__(self, dim=4096):
+        self.dim = dim
+
+    def word_features(self, word):
+        """Features de uma palavra: a palavra inteira seguida dos seus n-gramas"""
+        features = [zlib.crc32(b"w:" + word.encode()) % self.dim]
+        padded = f"<{word}>".encode()
+        for n in (3, 4):
+            features.extend(zlib.crc32(padded[i:i + n]) % self.dim
+                            for i in range(len(padded) - n + 1))
+        return features
+
+    def features(self, text):
+        """Índices das features de um texto (com repetição)"""
+        features = []
+        for word in tokenize(text):
+            features.extend(self.word_features(word))
+        return features
+
+    def embed(self, texts):
+        """
+        Returns:
+            numpy.ndarray: (len(texts), dim) float32 com a contagem de cada feature
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vectors[row] = np.bincount(self.features(text), minlength=self.dim)
+        return vectors
+
+
+class OllamaEmbedder:
+    """Embeddings de um modelo do Ollama (ex.: nomic-embed-text)"""
+
+    uses_idf = False
+
+    def __init__(self, model):
+        self.model = model
+        self.name = f"ollama:{model}"
+
+    def embed(self, texts):
+        response = ollama.embed(model=self.model, input=list(texts))
+        return np.asarray(response["embeddings"], dtype=np.float32)
+
+
+def create_embedder(spec=None):
+    """
+    Embedder a partir de "hash" ou "ollama:<modelo>" (padrão: INTENT_EMBEDDER ou hash).
+    """
+    spec = spec or os.getenv("INTENT_EMBEDDER") or "hash"
+    if spec.startswith("ollama:"):
+        return OllamaEmbedder(spec.split(":", 1)[1])
+    if spec != "hash":
+        raise ValueError(f"Embedder desconhecido: {spec} (use 'hash' ou 'ollama:<modelo>')")
+    return HashingEmbedder()
+
+
+def _normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class IntentVectors:
+    """Vetores de um catálogo (imutável; trocado inteiro a cada recarga)"""
+
+    def __init__(self, source, keywords, starts, columns, idf, present):
+        """
+        Args:
+            source (CatalogIndex): Índice do catálogo que gerou os vetores
+            keywords (list): Palavra-chave (ação) de cada linha
+            starts (numpy.ndarray): Primeira linha de cada comando
+            columns (numpy.ndarray): (dim, linhas) vetores normalizados, transpostos
+            idf (numpy.ndarray): Peso de cada feature
+            present (numpy.ndarray): (comandos, dim) features de cada comando
+                (só com o embedder hash; senão None)
+        """
+        self.source = source
+        self.keywords = keywords
+        self.starts = starts
+        self.columns = columns
+        self.idf = idf
+        self.present = present
+
+
+class IntentIndex:
+    """
+    Busca por similaridade entre uma frase e os textos do catálogo.
+
+    Uso:
+        intents = IntentIndex()
+        keyword, score = intents.match("aumenta o som", catalog.index)
+        action = catalog.index.actions[keyword] if keyword else None
+    """
+
+    def __init__(self, embedder=None, threshold=None, margin=0.03, path=None, min_words=2):
+        """
+        Args:
+            embedder: HashingEmbedder, OllamaEmbedder ou especificação em texto
+            threshold (float): Similaridade mínima (padrão: INTENT_THRESHOLD ou
+                DEFAULT_THRESHOLDS do embedder)
+            margin (float): Vantagem mínima sobre o segundo comando mais
+                parecido (evita escolher entre dois quase empatados)
+            path (str): Arquivo .npz dos vetores (padrão: INTENT_INDEX ou
+                <catálogo>.intents.npz)
+            min_words (int): Palavras da frase que precisam aparecer no
+                comando escolhido (só com o embedder hash; frases mais curtas
+                precisam de todas)
+        """
+        if embedder is None or isinstance(embedder, str):
+            embedder = create_embedder(embedder)
+        self.embedder = embedder
+        kind = embedder.name.split(":", 1)[0]
+        if threshold is None:
+            threshold = float(os.getenv("INTENT_THRESHOLD") or DEFAULT_THRESHOLDS[kind])
+        self.threshold = threshold
+        self.margin = margin
+        self.path = path or os.getenv("INTENT_INDEX")
+        self.min_words = min_words
+
+        self.vectors = None     # IntentVectors do catálogo atual
+
+    def _rows(self, catalog_index):
+        """Textos do catálogo: cada palavra-chave e a descrição de cada comando"""
+        rows = []
+        first_keyword = {}
+        for keyword in catalog_index.keywords:
+            entry = catalog_index.entry_of[keyword]
+            first_keyword.setdefault(id(entry), keyword)
+            rows.append((keyword, keyword))
+        for entry in catalog_index.entries:
+            keyword = first_keyword.get(id(entry))
+            if keyword is not None and entry.get("description"):
+                rows.append((keyword, entry["description"]))
+        return rows
+
+    def _fingerprint(self, rows):
+        data = json.dumps([self.embedder.name, getattr(self.embedder, "dim", None), rows],
+                          ensure_ascii=False)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def _cache_path(self, catalog_path):
+        if self.path:
+            return self.path
+        if catalog_path:
+            return os.path.splitext(catalog_path)[0] + ".intents.npz"
+        return None
+
+    def build(self, catalog_index, catalog_path=None):
+        """
+        Vetoriza o catálogo (ou carrega os vetores salvos, se o catálogo e o
+        embedder não mudaram).
+
+        Args:
+            catalog_index (CatalogIndex): Índice atual do catálogo
+            catalog_path (str): Caminho do catálogo (define o arquivo .npz padrão)
+
+        Returns:
+            IntentVectors: Os vetores publicados
+        """
+        rows = self._rows(catalog_index)
+        fingerprint = self._fingerprint(rows)
+        cache = self._cache_path(catalog_path)
+
+        raw = idf = None
+        if cache and os.path.exists(cache):
+            try:
+                with np.load(cache) as data:
+                    if str(data["fingerprint"]) == fingerprint:
+                        raw, idf = data["vectors"], data["idf"]
+            except (OSError, ValueError, KeyError, EOFError) as e:
+                print(f"[INTENÇÕES] Índice em disco ignorado: {e}")
+
+        if raw is None:
+            raw = self.embedder.embed([text for _, text in rows]) if rows else np.zeros((0, 1), np.float32)
+            if self.embedder.uses_idf and rows:
+                df = np.count_nonzero(raw, axis=0)
+                idf = (np.log((1 + len(rows)) / (1 + df)) + 1.0).astype(np.float32)
+            else:
+                idf = np.ones(raw.shape[1], dtype=np.float32)
+            if cache:
+                try:
+                    tmp = cache + ".tmp.npz"
+                    np.savez(tmp, fingerprint=fingerprint, vectors=raw, idf=idf)
+                    os.replace(tmp, cache)
+                except OSError as e:
+                    print(f"[INTENÇÕES] Não foi possível salvar o índice: {e}")
+            print(f"[INTENÇÕES] Índice criado: {len(rows)} textos ({self.embedder.name})")
+
+        # Linhas agrupadas por comando: o máximo de cada um sai de um reduceat
+        entry_ids = {}
+        groups = [entry_ids.setdefault(id(catalog_index.entry_of[keyword]), len(entry_ids))
+                  for keyword, _ in rows]
+        order = sorted(range(len(rows)), key=groups.__getitem__)
+        starts = [i for i, row in enumerate(order) if i == 0 or groups[row] != groups[order[i - 1]]]
+
+        vectors = IntentVectors(
+            source=catalog_index,
+            keywords=[rows[row][0] for row in order],
+            starts=np.array(starts, dtype=np.intp),
+            # Transposto (dim, linhas): a consulta esparsa lê só as features presentes
+            columns=np.ascontiguousarray(_normalize_rows(raw[order] * idf).T),
+            idf=idf,
+            present=(np.logical_or.reduceat(raw[order] > 0, starts, axis=0)
+                     if hasattr(self.embedder, "word_features") and rows else None),
+        )
+        # Troca completa (uma atribuição): uma busca em andamento termina com os vetores antigos
+        self.vectors = vectors
+        return vectors
+
+    def scores(self, text, vectors=None):
+        """Similaridade (cosseno) da frase com cada linha do índice"""
+        vectors = vectors or self.vectors
+        if hasattr(self.embedder, "features"):
+            features = self.embedder.features(text)
+            if not features:
+                return np.zeros(len(vectors.keywords), dtype=np.float32)
+            features, counts = np.unique(features, return_counts=True)
+            weights = counts * vectors.idf[features]
+            norm = np.linalg.norm(weights)
+            return (weights / norm).astype(np.float32) @ vectors.columns[features]
+        vector = self.embedder.embed([text])[0] * vectors.idf
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm > 0 else vector) @ vectors.columns
+
+    def matched_words(self, text, present):
+        """
+        Palavras da frase encontradas em um comando: a palavra inteira ou pelo
+        menos WORD_MATCH dos seus n-gramas.
+
+        Returns:
+            tuple: (palavras encontradas, palavras da frase)
+        """
+        words = tokenize(text)
+        matched = 0
+        for word in words:
+            whole, *ngrams = self.embedder.word_features(word)
+            if present[whole] or present[ngrams].mean() >= WORD_MATCH:
+                matched += 1
+        return matched, len(words)
+
+    def match(self, text, catalog_index, catalog_path=None):
+        """
+        Comando mais parecido com a frase.
+
+        Args:
+            text (str): Frase transcrita
+            catalog_index (CatalogIndex): Índice atual do catálogo (o índice
+                semântico é refeito quando ele é trocado)
+            catalog_path (str): Caminho do catálogo
+
+        Returns:
+            tuple: (palavra-chave, similaridade) ou (None, melhor similaridade)
+        """
+        # Uma leitura só: uma recarga no meio da busca não mistura vetores
+        vectors = self.vectors
+        if vectors is None or vectors.source is not catalog_index:
+            vectors = self.build(catalog_index, catalog_path)
+        if not vectors.keywords:
+            return None, 0.0
+
+        scores = self.scores(text, vectors)
+        starts = vectors.starts
+        # Melhor similaridade de cada comando (descrição ou qualquer apelido)
+        best = np.maximum.reduceat(scores, starts)
+        winner = int(best.argmax())
+        top = float(best[winner])
+        best[winner] = -1.0
+        second = float(best.max()) if len(best) > 1 else -1.0
+        if top < self.threshold or top - second < self.margin:
+            return None, top
+        if vectors.present is not None:
+            matched, words = self.matched_words(text, vectors.present[winner])
+            if matched < min(self.min_words, words):
+                return None, top
+        end = starts[winner + 1] if winner + 1 < len(starts) else len(scores)
+        row = int(starts[winner] + scores[starts[winner]:end].argmax())
+        return vectors.keywords[row], top
+
+
+# Testa frases contra o catálogo (sem argumentos: confere os exemplos abaixo)
+if __name__ == "__main__":
+    import sys
+    from command_catalog import CommandCatalog
+
+    # Frase -> ação esperada (None = vai para a IA)
+    EXAMPLES = {
+        "aumenta o som": "volume_up", "abaixa o volume": "volume_down",
+        "tira um print da tela": "screenshot", "toca a próxima": "next_track",
+        "volta a música": "previous_track", "abre a calculadora pra mim": "open_calculator",
+        "qual a capital da frança": None, "me conte uma piada": None,
+        "quem descobriu o brasil": None, "como funciona a fotossíntese": None,
+        # Uma palavra em comum com um comando não é um comando
+        "o que é uma tela de pintura": None, "qual a música mais tocada": None,
+        "explique anterior e posterior": None, "pausa a música": None,
+    }
+
+    catalog = CommandCatalog()
+    intents = IntentIndex()
+    phrases = sys.argv[1:] or list(EXAMPLES)
+    failures = 0
+    for phrase in phrases:
+        keyword = catalog.index.match(phrase.lower())
+        if keyword:
+            how = "palavra-chave"
+        else:
+            keyword, score = intents.match(phrase, catalog.index, catalog.path)
+            how = f"semântico {score:.2f}"
+        action = catalog.index.entry_of[keyword]["action"] if keyword else None
+        status = ""
+        if not sys.argv[1:] and action != EXAMPLES[phrase]:
+            failures += 1
+            status = f"  FALHOU (esperado {EXAMPLES[phrase] or 'IA'})"
+        print(f"  {phrase!r:<36} {how} -> {action or 'IA'}{status}")
+    sys.exit(1 if failures else 0)
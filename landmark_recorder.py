@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Gravação de sessões de landmarks
+Persiste o que o MediaPipe detectou (timestamp, lado da mão e os 21
+landmarks x, y, z) em um formato binário compacto e mapeável em memória,
+para reprocessar horas de sessões sem decodificar vídeo nem rodar o modelo
+de mãos novamente
+
+Formato (mesmo nome base, três arquivos):
+    <base>.json  Cabeçalho: versão, dtype, máximo de mãos, resolução, início
+    <base>.lmk   Array bruto (frames, max_hands, 21, 3) em float16/float32
+    <base>.idx   Array bruto de registros (t, n_hands, sides[max_hands])
+
+Todos os frames têm o mesmo tamanho em disco, então o frame N está sempre
+no offset N * tamanho_do_frame de cada arquivo (acesso aleatório O(1)).
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+FORMAT_VERSION = 1
+NUM_LANDMARKS = 21
+
+# Códigos do lado da mão no índice
+SIDES = ('Left', 'Right')
+SIDE_CODES = {side: code for code, side in enumerate(SIDES)}
+NO_SIDE = 255
+
+
+def index_dtype(max_hands):
+    """Tipo do registro de índice de um frame"""
+    return np.dtype([
+        ('t', '<f8'),                     # Segundos desde o início da gravação
+        ('n_hands', 'u1'),                # Quantas mãos foram detectadas
+        ('sides', 'u1', (max_hands,)),    # Lado de cada mão (SIDE_CODES)
+    ])
+
+
+class LandmarkRecorder:
+    """
+    Grava os landmarks retornados por `detect_hands` frame a frame.
+
+    Os arquivos são abertos em modo append e cada frame é escrito
+    imediatamente, então uma gravação interrompida continua legível até o
+    último frame completo.
+    """
+
+    def __init__(self, base_path, dtype="float16", max_hands=2, resolution=(1280, 720)):
+        """
+        Args:
+            base_path (str): Caminho base dos arquivos (sem extensão)
+            dtype (str): "float16" (compacto) ou "float32" (precisão total)
+            max_hands (int): Número máximo de mãos guardadas por frame
+            resolution (tuple): (largura, altura) do espaço das coordenadas
+        """
+        self.base_path = base_path
+        self.dtype = np.dtype(dtype)
+        self.max_hands = max_hands
+        self.frames_written = 0
+
+        directory = os.path.dirname(os.path.abspath(base_path))
+        os.makedirs(directory, exist_ok=True)
+
+        header = {
+            "version": FORMAT_VERSION,
+            "dtype": self.dtype.name,
+            "max_hands": max_hands,
+            "num_landmarks": NUM_LANDMARKS,
+            "resolution": list(resolution),
+            "start_time": datetime.now().isoformat(),
+        }
+        with open(base_path + ".json", 'w', encoding='utf-8') as f:
+            json.dump(header, f, indent=2)
+
+        self._data_file = open(base_path + ".lmk", 'wb')
+        self._index_file = open(base_path + ".idx", 'wb')
+
+        # Buffers reutilizados a cada frame
+        self._frame = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=self.dtype)
+        self._record = np.zeros(1, dtype=index_dtype(max_hands))
+        self._start = time.perf_counter()
+
+    def write(self, hands, timestamp=None):
+        """
+        Grava as mãos detectadas em um frame.
+
+        Args:
+            hands (list): Lista de mãos no formato de `detect_hands`
+            timestamp (float): Segundos desde o início (None mede agora)
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter() - self._start
+
+        hands = hands[:self.max_hands]
+        self._frame.fill(0)
+        record = self._record[0]
+        record['t'] = timestamp
+        record['n_hands'] = len(hands)
+        record['sides'] = NO_SIDE
+
+        for i, hand in enumerate(hands):
+            self._frame[i] = hand['coordenadas']
+            record['sides'][i] = SIDE_CODES.get(hand.get('side'), NO_SIDE)
+
+        self._data_file.write(self._frame.tobytes())
+        self._index_file.write(self._record.tobytes())
+        self.frames_written += 1
+
+    def close(self):
+        """Fecha os arquivos da gravação"""
+        if self._data_file is not None:
+            self._data_file.close()
+            self._index_file.close()
+            self._data_file = self._index_file = None
+            print(f"[GRAVAÇÃO] {self.frames_written} frames salvos em {self.base_path}.lmk")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class LandmarkStream:
+    """
+    Leitura de uma sessão gravada via `numpy.memmap` (sem carregar tudo na
+    memória).
+    """
+
+    def __init__(self, base_path):
+        """
+        Args:
+            base_path (str): Caminho base da gravação (com ou sem extensão)
+        """
+        base_path = os.path.splitext(base_path)[0] if base_path.endswith(
+            (".json", ".lmk", ".idx")) else base_path
+        self.base_path = base_path
+
+        with open(base_path + ".json", 'r', encoding='utf-8') as f:
+            self.header = json.load(f)
+
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Versão de gravação não suportada: {self.header.get('version')}")
+
+        self.max_hands = self.header["max_hands"]
+        self.resolution = tuple(self.header["resolution"])
+        frame_shape = (self.max_hands, self.header["num_landmarks"], 3)
+        dtype = np.dtype(self.header["dtype"])
+        idx_dtype = index_dtype(self.max_hands)
+
+        # Número de frames completos nos dois arquivos (tolera gravação interrompida)
+        frame_bytes = int(np.prod(frame_shape)) * dtype.itemsize
+        count = min(os.path.getsize(base_path + ".lmk") // frame_bytes,
+                    os.path.getsize(base_path + ".idx") // idx_dtype.itemsize)
+
+        if count:
+            self.landmarks = np.memmap(base_path + ".lmk", dtype=dtype, mode='r',
+                                       shape=(count,) + frame_shape)
+            self.index = np.memmap(base_path + ".idx", dtype=idx_dtype, mode='r',
+                                   shape=(count,))
+        else:
+            self.landmarks = np.zeros((0,) + frame_shape, dtype=dtype)
+            self.index = np.zeros(0, dtype=idx_dtype)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def timestamps(self):
+        """Array com o timestamp de cada frame"""
+        return self.index['t']
+
+    def duration(self):
+        """Duração da gravação em segundos"""
+        if len(self) < 2:
+            return 0.0
+        return float(self.index['t'][-1] - self.index['t'][0])
+
+    def hands(self, frame_index):
+        """
+        Reconstrói as mãos de um frame no formato de `detect_hands`.
+
+        Args:
+            frame_index (int): Índice do frame
+
+        Returns:
+            list: Lista de dicts com 'coordenadas' e 'side'
+        """
+        record = self.index[frame_index]
+        frame = np.rint(self.landmarks[frame_index]).astype(np.int32)
+
+        all_hands = []
+        for i in range(int(record['n_hands'])):
+            side_code = int(record['sides'][i])
+            all_hands.append({
+                'coordenadas': [tuple(point) for point in frame[i].tolist()],
+                'side': SIDES[side_code] if side_code < len(SIDES) else None
+            })
+        return all_hands
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield float(self.index['t'][i]), self.hands(i)
+
+
+# Reprocessar uma gravação com o reconhecedor de gestos
+if __name__ == "__main__":
+    import sys
+    from collections import Counter
+    from gesture_recognition import GestureRecognizer
+
+    if len(sys.argv) < 2:
+        print("Uso: python landmark_recorder.py <gravacao>")
+        sys.exit(1)
+
+    stream = LandmarkStream(sys.argv[1])
+    print(f"Gravação: {stream.base_path}")
+    print(f"Frames: {len(stream)} ({stream.duration():.1f}s gravados)")
+    print(f"Resolução: {stream.resolution[0]}x{stream.resolution[1]}, dtype: {stream.header['dtype']}")
+
+    recognizer = GestureRecognizer()
+    gestures = Counter()
+    start = time.perf_counter()
+    for _, hands in stream:
+        gestures[recognizer.recognize_gesture(hands[0]) if hands else 'NONE'] += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"\nReprocessado em {elapsed:.2f}s ({len(stream) / max(elapsed, 1e-9):.0f} frames/s)")
+    for gesture, count in gestures.most_common():
+        print(f"  {gesture:<12} {count}")
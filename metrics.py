@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação de latência por etapa
+Spans com relógio monotônico para cada etapa do caminho gesto -> resposta
+falada, com percentis p50/p95/p99 sobre uma janela móvel, exportados em
+texto no formato Prometheus (HTTP local) e/ou em log JSONL
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def quantiles(samples, qs=QUANTILES):
+    """Percentis (quantil -> valor) de uma sequência de amostras"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {q: 0.0 for q in qs}
+    last_index = len(ordered) - 1
+    return {q: ordered[int(round(q * last_index))] for q in qs}
+
+
+class StageStats:
+    """Janela móvel das durações de uma etapa"""
+
+    def __init__(self, window=500):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+
+
+class Tracer:
+    """
+    Coleta durações por etapa.
+
+    Uso:
+        with tracer.span("transcribe_audio"):
+            ...
+    """
+
+    def __init__(self, window=500, enabled=True):
+        """
+        Args:
+            window (int): Quantidade de amostras mantidas por etapa
+            enabled (bool): Se False, spans não medem nada
+        """
+        self.window = window
+        self.enabled = enabled
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._log_file = None
+        self._server = None
+
+    @contextmanager
+    def span(self, stage, **fields):
+        """
+        Mede a duração de um bloco.
+
+        Args:
+            stage (str): Nome da etapa
+            **fields: Campos extras gravados no log JSONL
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, **fields)
+
+    def record(self, stage, seconds, **fields):
+        """
+        Registra uma duração já medida.
+
+        Args:
+            stage (str): Nome da etapa
+            seconds (float): Duração em segundos
+            **fields: Campos extras gravados no log JSONL
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(self.window)
+            stats.add(seconds)
+
+            if self._log_file is not None:
+                entry = {"ts": time.time(), "stage": stage, "ms": round(seconds * 1000, 3)}
+                entry.update(fields)
+                self._log_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self._log_file.flush()
+
+    def snapshot(self):
+        """
+        Retorna as estatísticas atuais.
+
+        Returns:
+            dict: etapa -> {count, total, last, p50, p95, p99} (segundos)
+        """
+        with self._lock:
+            items = [(stage, stats.count, stats.total, stats.last, list(stats.samples))
+                     for stage, stats in self.stages.items()]
+
+        result = {}
+        for stage, count, total, last, samples in items:
+            window = quantiles(samples)
+            result[stage] = {
+                "count": count,
+                "total": total,
+                "last": last,
+                "p50": window[0.5],
+                "p95": window[0.95],
+                "p99": window[0.99],
+            }
+        return result
+
+    def prometheus_text(self, prefix="assistente"):
+        """Estatísticas no formato de exposição de texto do Prometheus"""
+        name = f"{prefix}_stage_seconds"
+        lines = [
+            f"# HELP {name} Duração das etapas do pipeline gesto -> resposta",
+            f"# TYPE {name} summary",
+        ]
+        for stage, stats in sorted(self.snapshot().items()):
+            for q in QUANTILES:
+                key = f"p{int(q * 100)}"
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {stats[key]:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {stats["total"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def open_log(self, path):
+        """
+        Grava cada span como uma linha JSON em `path` (modo append).
+
+        Args:
+            path (str): Caminho do arquivo JSONL
+        """
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+            self._log_file = open(path, 'a', encoding='utf-8')
+        print(f"[METRICAS] Log de latência em: {path}")
+
+    def start_http_server(self, port=9464, host="127.0.0.1"):
+        """
+        Expõe as métricas em http://host:port/metrics (e /metrics.json).
+
+        Args:
+            port (int): Porta local
+            host (str): Interface (apenas localhost por padrão)
+        """
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body = json.dumps(tracer.snapshot()).encode("utf-8")
+                    content_type = "application/json"
+                elif self.path.startswith("/metrics"):
+                    body = tracer.prometheus_text().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Sem log de cada requisição no console
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        print(f"[METRICAS] Endpoint em http://{host}:{port}/metrics")
+
+    def close(self):
+        """Encerra o servidor HTTP e fecha o log"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+    def reset(self):
+        """Descarta todas as amostras"""
+        with self._lock:
+            self.stages = {}
+
+
+# Tracer global compartilhado pelos módulos do assistente
+tracer = Tracer()
+
+
+def draw_metrics_overlay(frame, snapshot, origin=(20, 130), stages=None):
+    """
+    Desenha uma tabela de latências (p50/p95/p99 em ms) sobre o frame.
+
+    Args:
+        frame: Frame da câmera
+        snapshot (dict): Resultado de Tracer.snapshot()
+        origin (tuple): Canto superior esquerdo da tabela
+        stages (list): Etapas a mostrar, em ordem (None mostra todas)
+
+    Returns:
+        frame: Frame com a tabela desenhada
+    """
+    import cv2
+
+    rows = [stage for stage in (stages or sorted(snapshot)) if stage in snapshot]
+    if not rows:
+        return frame
+
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    x, y = origin
+    line_height = 20
+    cv2.rectangle(frame, (x - 10, y - 18),
+                  (x + 420, y + line_height * len(rows) + 6), (0, 0, 0), -1)
+    cv2.putText(frame, f"{'etapa':<18}{'p50':>8}{'p95':>8}{'p99':>8}  ms", (x, y),
+                font, 0.45, (200, 200, 200), 1)
+
+    for i, stage in enumerate(rows, start=1):
+        stats = snapshot[stage]
+        text = (f"{stage[:18]:<18}{stats['p50'] * 1000:>8.1f}"
+                f"{stats['p95'] * 1000:>8.1f}{stats['p99'] * 1000:>8.1f}")
+        cv2.putText(frame, text, (x, y + i * line_height),
+                    font, 0.45, (0, 255, 255), 1)
+    return frame
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    import random
+
+    for _ in range(200):
+        with tracer.span("exemplo"):
+            time.sleep(random.uniform(0.0005, 0.002))
+
+    print(tracer.prometheus_text())
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Modo multi-câmera / multi-usuário
+Várias fontes de frames (ex.: câmeras de quiosques) alimentam um pool de
+processos de inferência MediaPipe; cada stream mantém sua própria máquina
+de estados do assistente
+
+Os frames vão para os processos por memória compartilhada (SharedFrameBuffer),
+sem serialização. Cada stream é fixado em um worker, para que o rastreamento
+do MediaPipe entre frames consecutivos continue funcionando. Com
+`inference_width` o frame é reduzido antes de ir para a memória
+compartilhada (menos cópia e menos inferência) e o worker devolve as
+coordenadas já na resolução de exibição.
+"""
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from assistente_gestos import AssistenteGestos
+from frame_buffer import SharedFrameBuffer
+from hand_detector import HandDetector, downscale, mp
+from metrics import tracer
+from startup import BootSequence
+
+
+# ===== PROCESSO DE INFERÊNCIA =====
+
+_worker_detectors = {}  # stream -> HandDetector (um por stream)
+_worker_buffers = {}    # nome do buffer -> SharedFrameBuffer anexado
+_worker_options = {}
+
+
+def _init_worker(options):
+    """Inicializador do processo: importa o MediaPipe uma única vez"""
+    _worker_options.update(options)
+    mp.__version__   # Primeiro acesso ao proxy preguiçoso (hand_detector.mp): importa aqui
+
+
+def _worker_ready():
+    """Tarefa vazia: obriga o executor a criar o processo (e rodar o inicializador)"""
+    return True
+
+
+def _detect_worker(stream_id, buffer_name, width, height):
+    """
+    Detecta mãos no frame mais recente do buffer de um stream.
+
+    Executa no processo de inferência. O frame do buffer pode estar reduzido;
+    as coordenadas saem em pixels de `width` x `height` (exibição).
+
+    Returns:
+        list: Mãos detectadas (dicts simples, serializáveis)
+    """
+    detector = _worker_detectors.get(stream_id)
+    if detector is None:
+        detector = _worker_detectors[stream_id] = HandDetector(
+            max_num_hands=_worker_options.get("max_num_hands", 1),
+            model_complexity=_worker_options.get("model_complexity", 1),
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.5
+        )
+
+    buffer = _worker_buffers.get(buffer_name)
+    if buffer is None:
+        buffer = _worker_buffers[buffer_name] = SharedFrameBuffer.attach(buffer_name)
+
+    _, _, frame = buffer.read_latest()
+    if frame is None:
+        return []
+
+    return detector.detect(frame, display_size=(width, height))
+
+
+# ===== PROCESSO PRINCIPAL =====
+
+class Stream:
+    """Um stream: fonte de frames + assistente com estado próprio"""
+
+    def __init__(self, stream_id, assistant, worker):
+        self.stream_id = stream_id
+        self.assistant = assistant
+        self.worker = worker
+        self.input_buffer = None
+        self.small = None   # Frame reduzido reaproveitado (inference_width)
+        self.thread = None
+
+
+class MultiStreamAssistant:
+    """
+    Atende vários streams em uma só máquina, distribuindo a inferência de
+    mãos entre vários núcleos.
+    """
+
+    def __init__(self, sources, workers=None, frame_buffer_prefix=None, max_num_hands=1,
+                 transcription_service=True, inference_width=None, model_complexity=1):
+        """
+        Args:
+            sources (list): Fontes de frames (FrameSource), uma por stream
+            workers (int): Processos de inferência (padrão: min(streams, núcleos))
+            frame_buffer_prefix (str): Se definido, publica os frames anotados
+                de cada stream em '<prefixo>_<n>'
+            max_num_hands (int): Mãos detectadas por frame
+            transcription_service (bool): Transcrever todos os streams em um
+                único processo Whisper, que agrupa pedidos simultâneos em lote
+            inference_width (int): Reduzir os frames para esta largura antes
+                da inferência (None envia a resolução da câmera)
+            model_complexity (int): Modelo de mãos 0 (leve) ou 1 (completo)
+        """
+        count = workers or min(len(sources), multiprocessing.cpu_count())
+        context = multiprocessing.get_context("spawn")
+        options = {"max_num_hands": max_num_hands, "model_complexity": model_complexity}
+        self.inference_width = inference_width
+
+        # Um executor de 1 processo por worker: permite fixar cada stream em um processo
+        self.workers = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                initializer=_init_worker, initargs=(options,))
+            for _ in range(count)
+        ]
+
+        # Processos de inferência sobem (e importam o MediaPipe) em paralelo,
+        # enquanto os assistentes são criados
+        self.boot = BootSequence(max_workers=count)
+        for n, worker in enumerate(self.workers):
+            self.boot.start(f"inferência_{n}", lambda worker=worker: worker.submit(_worker_ready).result())
+
+        self.streams = []
+        for i, source in enumerate(sources):
+            buffer_name = f"{frame_buffer_prefix}_{i}" if frame_buffer_prefix else None
+            assistant = AssistenteGestos(headless=True, frame_buffer_name=buffer_name,
+                                         source=source, hand_detection=False,
+                                         transcription_service=transcription_service)
+            self.streams.append(Stream(i, assistant, self.workers[i % count]))
+
+        self.running = False
+        print(f"[MULTI] {len(self.streams)} streams, {count} processos de inferência")
+
+    def _run_stream(self, stream):
+        """Loop de captura de um stream (uma thread por stream)"""
+        assistant = stream.assistant
+        source = assistant.camera
+        render = assistant.frame_buffer_name is not None
+
+        try:
+            while self.running and source.is_opened():
+                ret, frame = source.read()
+                if not ret:
+                    break
+
+                frame_start = time.perf_counter()
+                if source.provides_landmarks:
+                    hands = source.last_hands
+                else:
+                    frame = cv2.flip(frame, 1)
+                    small = downscale(frame, self.inference_width, stream.small)
+                    if small is not frame:
+                        stream.small = small
+                    if stream.input_buffer is None:
+                        height, width = small.shape[:2]
+                        stream.input_buffer = SharedFrameBuffer.create(None, width, height)
+                    stream.input_buffer.publish(small)
+
+                    # A thread espera (sem segurar o GIL) enquanto o worker processa
+                    with tracer.span("detect_hands", stream=stream.stream_id):
+                        hands = stream.worker.submit(
+                            _detect_worker, stream.stream_id, stream.input_buffer.name,
+                            assistant.resolution_x, assistant.resolution_y
+                        ).result()
+
+                assistant.update_gesture(hands)
+
+                if render:
+                    assistant.publish_frame(assistant.draw_ui(frame))
+
+                tracer.record(f"frame.stream{stream.stream_id}", time.perf_counter() - frame_start)
+
+        except Exception as e:
+            print(f"[MULTI] Stream {stream.stream_id} encerrado com erro: {e}")
+
+        finally:
+            source.release()
+            if stream.input_buffer is not None:
+                stream.input_buffer.close()
+            if assistant.frame_buffer is not None:
+                assistant.frame_buffer.close()
+
+    def run(self):
+        """Roda todos os streams até que terminem ou Ctrl+C"""
+        self.running = True
+        for stream in self.streams:
+            stream.thread = threading.Thread(target=self._run_stream, args=(stream,), daemon=True)
+            stream.thread.start()
+
+        start = time.perf_counter()
+        try:
+            while any(stream.thread.is_alive() for stream in self.streams):
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            elapsed = time.perf_counter() - start
+            self.print_report(elapsed)
+
+    def stop(self):
+        """Encerra os streams, o áudio e o boot de cada assistente e os processos de inferência"""
+        self.running = False
+        for stream in self.streams:
+            if stream.thread is not None:
+                stream.thread.join(timeout=5)
+            stream.assistant.voice_recorder.stop_stream()
+            stream.assistant.boot.shutdown()
+        self.boot.shutdown()
+        for worker in self.workers:
+            worker.shutdown(wait=True, cancel_futures=True)
+
+    def print_report(self, elapsed):
+        """Mostra o FPS de cada stream e o throughput total"""
+        print("\n" + "="*60)
+        print("DESEMPENHO MULTI-STREAM")
+        print("="*60)
+        total = 0
+        for stream in self.streams:
+            source = stream.assistant.camera
+            total += source.frames_read
+            print(f"  Stream {stream.stream_id}: {source.frames_read} frames "
+                  f"({source.measured_fps():.1f} FPS), estado {stream.assistant.state}")
+        if elapsed > 0:
+            print(f"  Total: {total / elapsed:.1f} frames/s em {elapsed:.1f}s")
+        print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    import argparse
+    from frame_source import open_source
+
+    parser = argparse.ArgumentParser(description="Assistente por gestos com várias câmeras")
+    parser.add_argument("sources", nargs="+",
+                        help="Índices de câmera, arquivos de vídeo, diretórios ou gravações .lmk")
+    parser.add_argument("--workers", type=int, default=None, help="Processos de inferência")
+    parser.add_argument("--frame-buffer-prefix", default=None,
+                        help="Publicar frames anotados em memória compartilhada '<prefixo>_<n>'")
+    parser.add_argument("--fast", action="store_true",
+                        help="Reproduzir fontes gravadas o mais rápido possível (benchmark)")
+    parser.add_argument("--inference-width", type=int, metavar="PX", default=None,
+                        help="Detectar mãos em uma cópia reduzida do frame (ex.: 320)")
+    parser.add_argument("--model-complexity", type=int, choices=(0, 1), default=1,
+                        help="Modelo de mãos: 0 = leve, 1 = completo")
+    args = parser.parse_args()
+
+    sources = [open_source(spec, realtime=not args.fast) for spec in args.sources]
+    MultiStreamAssistant(sources, workers=args.workers,
+                         frame_buffer_prefix=args.frame_buffer_prefix,
+                         inference_width=args.inference_width,
+                         model_complexity=args.model_complexity).run()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Inicialização rápida dos assistentes
+Importação preguiçosa de módulos pesados (mediapipe, whisper/torch,
+pyttsx3, clientes de IA) e sequência de boot em paralelo, com relatório do
+tempo gasto por subsistema
+"""
+import importlib
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+# Referência de tempo: quando este módulo foi importado (início do processo, na prática)
+PROCESS_START = time.perf_counter()
+
+# Tempo de importação de cada módulo carregado via lazy_import
+import_timings = {}
+_import_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """
+    Módulo que só é importado no primeiro acesso a um atributo.
+
+    Uso:
+        whisper = lazy_import("whisper")
+        ...
+        whisper.load_model("base")   # importa aqui, não no topo do arquivo
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    import_timings[self.__name__] = time.perf_counter() - start
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """
+    Retorna um proxy que importa o módulo `name` no primeiro uso.
+
+    Args:
+        name (str): Nome do módulo (ex.: "whisper", "scipy.io.wavfile")
+
+    Returns:
+        LazyModule: Proxy do módulo
+    """
+    return LazyModule(name)
+
+
+class BootSequence:
+    """
+    Executa a inicialização dos subsistemas em paralelo, em segundo plano,
+    e registra quanto tempo cada um levou.
+    """
+
+    def __init__(self, max_workers=4):
+        """
+        Args:
+            max_workers (int): Subsistemas inicializados ao mesmo tempo
+        """
+        self.start_time = PROCESS_START
+        self.timings = {}      # nome -> (início relativo, duração, sucesso)
+        self.milestones = {}   # nome -> instante relativo
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="boot")
+
+    def _now(self):
+        return time.perf_counter() - self.start_time
+
+    def mark(self, name):
+        """Registra um marco (ex.: primeiro frame exibido)"""
+        with self._lock:
+            self.milestones.setdefault(name, self._now())
+
+    @contextmanager
+    def step(self, name):
+        """Mede uma etapa síncrona (executada na thread atual)"""
+        start = self._now()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            with self._lock:
+                self.timings[name] = (start, self._now() - start, ok)
+
+    def start(self, name, func, *args, **kwargs):
+        """
+        Inicializa um subsistema em segundo plano.
+
+        Args:
+            name (str): Nome do subsistema no relatório
+            func (callable): Função de inicialização
+
+        Returns:
+            concurrent.futures.Future: Resultado da inicialização
+        """
+        def run():
+            with self.step(name):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    print(f"[BOOT] Falha ao inicializar '{name}': {e}")
+                    raise
+
+        future = self._executor.submit(run)
+        self._futures[name] = future
+        return future
+
+    def ready(self, name):
+        """True se o subsistema terminou de inicializar sem erro"""
+        future = self._futures.get(name)
+        return future is not None and future.done() and future.exception() is None
+
+    def wait(self, name=None, timeout=None):
+        """
+        Aguarda um subsistema (ou todos, se `name` for None).
+
+        Returns:
+            Resultado da função de inicialização (None para todos)
+        """
+        if name is not None:
+            return self._futures[name].result(timeout)
+        for future in list(self._futures.values()):
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+        return None
+
+    def report(self):
+        """
+        Monta o relatório de inicialização.
+
+        Returns:
+            str: Tabela com duração de cada subsistema, importação e marcos
+        """
+        lines = ["=" * 60, "RELATÓRIO DE INICIALIZAÇÃO", "=" * 60]
+        with self._lock:
+            timings = sorted(self.timings.items(), key=lambda item: item[1][0])
+            milestones = sorted(self.milestones.items(), key=lambda item: item[1])
+
+        lines.append(f"{'subsistema':<24}{'início':>10}{'duração':>10}")
+        for name, (start, duration, ok) in timings:
+            status = "" if ok else "  (falhou)"
+            lines.append(f"{name:<24}{start:>9.2f}s{duration:>9.2f}s{status}")
+
+        if import_timings:
+            lines.append("-" * 60)
+            lines.append("importações preguiçosas:")
+            for name, duration in sorted(import_timings.items(), key=lambda item: -item[1]):
+                lines.append(f"  {name:<22}{duration:>19.2f}s")
+
+        if milestones:
+            lines.append("-" * 60)
+            for name, instant in milestones:
+                lines.append(f"{name:<24}{instant:>9.2f}s")
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+    def print_report_when_done(self):
+        """Imprime o relatório quando todos os subsistemas terminarem"""
+        def wait_and_print():
+            self.wait()
+            print("\n" + self.report() + "\n")
+
+        threading.Thread(target=wait_and_print, daemon=True).start()
+
+    def shutdown(self):
+        """Libera as threads de boot (não cancela tarefas em andamento)"""
+        self._executor.shutdown(wait=False)
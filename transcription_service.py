@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+"""
+Serviço de transcrição Whisper em processo separado
+O Whisper roda fora do processo da interface (sem disputar GIL/CPU com o
+loop do MediaPipe) e atende pedidos por um socket local. Pedidos que chegam
+juntos (vários assistentes ou streams) são transcritos em lote, com uma
+única passada do decodificador
+
+As mensagens trafegam como pickle (multiprocessing.connection), então o
+socket só aceita quem conhece a chave da sessão. Não há chave fixa: o
+serviço iniciado pelo assistente recebe uma chave aleatória gerada a cada
+inicialização; um serviço iniciado à parte exige TRANSCRIPTION_AUTHKEY.
+
+Uso standalone:
+    export TRANSCRIPTION_AUTHKEY=$(python -c "import secrets; print(secrets.token_hex(32))")
+    python transcription_service.py --model base
+"""
+import os
+import queue
+import secrets
+import threading
+import time
+import multiprocessing
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from startup import lazy_import
+
+whisper = lazy_import("whisper")
+torch = lazy_import("torch")
+
+
+DEFAULT_ADDRESS = ("127.0.0.1", 47800)
+
+# Chave (hexadecimal) de um serviço iniciado à parte, compartilhada com os clientes
+AUTHKEY_ENV = "TRANSCRIPTION_AUTHKEY"
+MIN_AUTHKEY_BYTES = 16
+
+# Chave do serviço iniciado por este processo (reaproveitada pelos outros clientes daqui)
+_launch_authkey = None
+
+# Serializa o início do serviço quando vários assistentes conectam ao mesmo tempo
+_spawn_lock = threading.Lock()
+
+# Áudios até este tamanho cabem em uma janela do Whisper e podem ser decodificados em lote
+BATCHABLE_SECONDS = 30
+
+# Opções de model.transcribe que a decodificação em lote reproduz; pedidos com
+# outras opções (ou com beam search / fallback de temperatura) vão um a um
+BATCHABLE_OPTIONS = frozenset({
+    "temperature", "beam_size", "best_of", "without_timestamps", "initial_prompt",
+    "condition_on_previous_text", "compression_ratio_threshold",
+    "no_speech_threshold", "logprob_threshold",
+})
+
+
+def batch_key(language, options):
+    """
+    Chave de lote de um pedido curto, ou None se as opções não forem gulosas.
+
+    Só entram no lote pedidos com uma única temperatura (sem fallback), sem
+    beam search e sem timestamps, como DECODING_PROFILES["command"]: nesse
+    caso uma passada de whisper.decode dá o mesmo resultado que
+    model.transcribe. Pedidos no mesmo lote têm as mesmas opções.
+    """
+    if not set(options) <= BATCHABLE_OPTIONS:
+        return None
+    temperature = options.get("temperature", (0.0, 0.2, 0.4, 0.6, 0.8, 1.0))
+    if not isinstance(temperature, (int, float)):
+        return None   # Fallback de temperatura: o resultado depende de cada áudio
+    if options.get("beam_size") is not None or options.get("best_of") is not None:
+        return None
+    if not options.get("without_timestamps", False):
+        return None
+    return (language, options.get("initial_prompt"), float(temperature),
+            options.get("no_speech_threshold", 0.6), options.get("logprob_threshold", -1.0))
+
+
+def configured_authkey():
+    """
+    Chave definida em TRANSCRIPTION_AUTHKEY.
+
+    Returns:
+        bytes or None: Chave, ou None se a variável não estiver definida
+    """
+    value = os.getenv(AUTHKEY_ENV)
+    if not value:
+        return None
+    try:
+        key = bytes.fromhex(value)
+    except ValueError:
+        raise ValueError(f"{AUTHKEY_ENV} deve ser hexadecimal (ex.: secrets.token_hex(32))")
+    return _require_authkey(key)
+
+
+def _require_authkey(authkey):
+    """Recusa chave ausente ou curta (o socket desserializa pickles)"""
+    if not authkey or len(authkey) < MIN_AUTHKEY_BYTES:
+        raise ValueError(f"Serviço de transcrição exige uma chave aleatória de pelo menos "
+                         f"{MIN_AUTHKEY_BYTES} bytes (defina {AUTHKEY_ENV})")
+    return authkey
+
+
+class _Request:
+    """Pedido pendente de transcrição"""
+
+    def __init__(self, request_id, audio, language, reply, options=None):
+        self.request_id = request_id
+        self.audio = audio
+        self.language = language
+        self.reply = reply
+        self.options = options or {}
+
+
+class TranscriptionService:
+    """
+    Servidor de transcrição: uma thread por cliente recebe os pedidos e uma
+    thread de lote agrupa os que chegam dentro de `batch_window`.
+    """
+
+    def __init__(self, model_size="base", address=DEFAULT_ADDRESS, authkey=None,
+                 batch_window=0.05, max_batch=8):
+        """
+        Args:
+            model_size (str): Tamanho do modelo Whisper
+            address (tuple): (host, porta) do socket local
+            authkey (bytes): Chave aleatória compartilhada com os clientes (obrigatória)
+            batch_window (float): Segundos esperando mais pedidos para o lote
+            max_batch (int): Tamanho máximo do lote
+        """
+        self.model_size = model_size
+        self.address = address
+        self.authkey = _require_authkey(authkey)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.model = None
+        self.requests = queue.Queue()
+        self.running = False
+
+    def serve_forever(self):
+        """Carrega o modelo e atende pedidos até o processo ser encerrado"""
+        print(f"[ASR] Carregando modelo Whisper '{self.model_size}'...")
+        self.model = whisper.load_model(self.model_size)
+        self.running = True
+
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"[ASR] Serviço de transcrição em {self.address[0]}:{self.address[1]}")
+            while self.running:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"[ASR] Conexão recusada: {e}")
+                    continue
+                threading.Thread(target=self._client_loop, args=(conn,), daemon=True).start()
+
+    def _client_loop(self, conn):
+        """Recebe os pedidos de um cliente"""
+        reply_lock = threading.Lock()
+
+        def reply(message):
+            with reply_lock:
+                conn.send(message)
+
+        try:
+            while True:
+                message = conn.recv()
+                kind = message.get("type")
+                if kind == "ping":
+                    reply({"type": "pong", "id": message.get("id"), "model": self.model_size})
+                elif kind == "transcribe":
+                    self.requests.put(_Request(message["id"], message["audio"],
+                                               message.get("language", "pt"), reply,
+                                               message.get("options")))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _batch_loop(self):
+        """Agrupa pedidos que chegam juntos e transcreve em lote"""
+        while self.running:
+            batch = [self.requests.get()]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            start = time.perf_counter()
+            results = self.transcribe_batch(batch)
+            elapsed = time.perf_counter() - start
+            for request, result in zip(batch, results):
+                result["batch_size"] = len(batch)
+                result["service_seconds"] = elapsed
+                try:
+                    request.reply({"type": "result", "id": request.request_id, "result": result})
+                except (EOFError, OSError):
+                    pass  # Cliente desconectou antes da resposta
+
+    def transcribe_batch(self, batch):
+        """
+        Transcreve um lote de pedidos.
+
+        Áudios curtos com as mesmas opções gulosas (ver `batch_key`) são
+        decodificados juntos, em um tensor de mels empilhados; os demais
+        (áudios longos, beam search, fallback de temperatura) usam
+        model.transcribe individualmente, com as opções do pedido.
+
+        Returns:
+            list: Um dict {text, segments, language} (ou {error}) por pedido
+        """
+        results = [None] * len(batch)
+        audios = []
+        for request in batch:
+            try:
+                audios.append(self._load_audio(request.audio))
+            except Exception as e:
+                audios.append(e)
+
+        groups = {}
+        for i, (request, audio) in enumerate(zip(batch, audios)):
+            if isinstance(audio, Exception):
+                results[i] = {"error": str(audio)}
+            else:
+                key = None
+                if len(audio) <= BATCHABLE_SECONDS * whisper.audio.SAMPLE_RATE:
+                    key = batch_key(request.language, request.options)
+                if key is None:
+                    results[i] = self._transcribe_one(audio, request.language, request.options)
+                else:
+                    groups.setdefault(key, []).append(i)
+
+        for key, indices in groups.items():
+            language, prompt, temperature, no_speech_threshold, logprob_threshold = key
+            try:
+                mel_batch = torch.stack([
+                    whisper.log_mel_spectrogram(whisper.pad_or_trim(audios[i]),
+                                                self.model.dims.n_mels)
+                    for i in indices
+                ]).to(self.model.device)
+                options = whisper.DecodingOptions(
+                    language=language,
+                    prompt=prompt,
+                    temperature=temperature,
+                    without_timestamps=True,
+                    fp16=self.model.device.type != "cpu"
+                )
+                decoded = whisper.decode(self.model, mel_batch, options)
+                for i, result in zip(indices, decoded):
+                    text = result.text
+                    # Mesmo descarte de silêncio que model.transcribe faz por segmento
+                    if (no_speech_threshold is not None and result.no_speech_prob > no_speech_threshold
+                            and (logprob_threshold is None or result.avg_logprob < logprob_threshold)):
+                        text = ""
+                    results[i] = {"text": text, "segments": [], "language": result.language}
+            except Exception as e:
+                # Lote falhou: tentar um a um para isolar o pedido problemático
+                print(f"[ASR] Falha no lote ({e}), transcrevendo individualmente")
+                for i in indices:
+                    results[i] = self._transcribe_one(audios[i], language, batch[i].options)
+
+        return results
+
+    def _transcribe_one(self, audio, language, options=None):
+        try:
+            result = self.model.transcribe(audio, language=language,
+                                           fp16=self.model.device.type != "cpu",
+                                           **(options or {}))
+            return {"text": result["text"], "segments": result.get("segments", []),
+                    "language": result.get("language", language)}
+        except Exception as e:
+            return {"error": str(e)}
+
+    @staticmethod
+    def _load_audio(audio):
+        """Aceita caminho de arquivo ou array float32 mono 16 kHz"""
+        if isinstance(audio, str):
+            return whisper.load_audio(audio)
+        return np.asarray(audio, dtype=np.float32).reshape(-1)
+
+
+class TranscriptionClient:
+    """
+    Cliente do serviço de transcrição (uma conexão por cliente, segura
+    entre threads).
+    """
+
+    def __init__(self, address, authkey, timeout=120.0):
+        """
+        Args:
+            address (tuple): (host, porta) do serviço
+            authkey (bytes): Chave da sessão do serviço
+            timeout (float): Segundos máximos esperando uma transcrição
+        """
+        self.address = address
+        self.authkey = _require_authkey(authkey)
+        self.timeout = timeout
+        # Autenticação mútua: um processo sem a chave ouvindo na porta é recusado aqui
+        self.conn = Client(address, authkey=self.authkey)
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # Handshake: o serviço informa o modelo que carregou
+        self.model = self.ping()
+
+    def _request(self, message):
+        with self._lock:
+            self._next_id += 1
+            message["id"] = self._next_id
+            self.conn.send(message)
+            deadline = time.monotonic() + self.timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.conn.poll(remaining):
+                    raise TimeoutError("Serviço de transcrição não respondeu")
+                reply = self.conn.recv()
+                if reply.get("id") == message["id"]:
+                    return reply
+                # Resposta atrasada de um pedido que já estourou o tempo: descarta
+
+    def ping(self):
+        """Retorna o nome do modelo carregado no serviço"""
+        return self._request({"type": "ping"})["model"]
+
+    def transcribe(self, audio, language="pt", options=None):
+        """
+        Transcreve um áudio no serviço.
+
+        Args:
+            audio (str or numpy.ndarray): Caminho do arquivo ou áudio float32 16 kHz
+            language (str): Idioma do áudio
+            options (dict): Opções extras de decodificação (ex.: initial_prompt)
+
+        Returns:
+            dict: Resultado no formato de whisper.transcribe (text, segments, language)
+        """
+        reply = self._request({"type": "transcribe", "audio": audio, "language": language,
+                               "options": options})
+        result = reply["result"]
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+
+    def close(self):
+        self.conn.close()
+
+
+def _serve(model_size, address, authkey, batch_window, max_batch):
+    TranscriptionService(model_size, address, authkey, batch_window, max_batch).serve_forever()
+
+
+def start_service_process(model_size="base", address=DEFAULT_ADDRESS, authkey=None,
+                          batch_window=0.05, max_batch=8):
+    """
+    Inicia o serviço em um processo filho (daemon).
+
+    Args:
+        authkey (bytes): Chave da sessão (None gera uma aleatória)
+
+    Returns:
+        tuple: (multiprocessing.Process, chave da sessão)
+    """
+    authkey = authkey or secrets.token_bytes(32)
+    # Com "spawn" os argumentos vão ao filho pelo pipe de inicialização,
+    # não pela linha de comando (não aparecem em ps)
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(
+        target=_serve,
+        args=(model_size, address, authkey, batch_window, max_batch),
+        daemon=True,
+        name="whisper-service"
+    )
+    process.start()
+    return process, authkey
+
+
+def connect(model_size="base", address=DEFAULT_ADDRESS, authkey=None,
+            spawn=True, timeout=120.0):
+    """
+    Conecta-se ao serviço, iniciando um processo local se ainda não houver um.
+
+    Args:
+        model_size (str): Modelo usado se for preciso iniciar o serviço
+        address (tuple): (host, porta) do serviço
+        authkey (bytes): Chave da sessão (padrão: TRANSCRIPTION_AUTHKEY ou a
+            do serviço já iniciado por este processo)
+        spawn (bool): Iniciar o serviço (com chave aleatória) se não houver
+            um acessível
+        timeout (float): Segundos aguardando o serviço ficar pronto
+
+    Returns:
+        TranscriptionClient: Cliente conectado (`client.model` é o modelo do
+            serviço, que pode diferir de `model_size` se ele já estava rodando)
+    """
+    global _launch_authkey
+    with _spawn_lock:
+        authkey = authkey or configured_authkey() or _launch_authkey
+        if authkey is not None:
+            try:
+                return _check_model(TranscriptionClient(address, authkey), model_size)
+            except ConnectionRefusedError:
+                if not spawn:
+                    raise
+        elif not spawn:
+            raise ValueError(f"Sem chave para o serviço de transcrição (defina {AUTHKEY_ENV})")
+
+        print(f"[ASR] Iniciando serviço de transcrição local ('{model_size}')...")
+        process, authkey = start_service_process(model_size, address, authkey)
+        _launch_authkey = authkey
+
+        # O Listener só abre depois que o modelo carregou
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                return TranscriptionClient(address, authkey)
+            except ConnectionRefusedError:
+                if not process.is_alive():
+                    raise ConnectionError(
+                        f"O serviço de transcrição não iniciou (porta {address[1]} ocupada por "
+                        f"outro serviço? Para usá-lo, defina {AUTHKEY_ENV} com a chave dele)")
+                if time.perf_counter() > deadline:
+                    raise
+                time.sleep(0.2)
+
+
+def _check_model(client, model_size):
+    """Avisa quando o serviço já em execução usa outro modelo"""
+    if client.model != model_size:
+        print(f"[ASR] AVISO: o serviço em {client.address[0]}:{client.address[1]} usa o modelo "
+              f"'{client.model}', não '{model_size}'; as transcrições usarão '{client.model}'")
+    return client
+
+
+def parse_address(text):
+    """Converte 'host:porta' em tupla"""
+    host, _, port = text.rpartition(":")
+    return (host or DEFAULT_ADDRESS[0], int(port))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serviço de transcrição Whisper")
+    parser.add_argument("--model", default="base", help="Tamanho do modelo Whisper")
+    parser.add_argument("--address", default=f"{DEFAULT_ADDRESS[0]}:{DEFAULT_ADDRESS[1]}",
+                        help="host:porta do socket local")
+    parser.add_argument("--batch-window", type=float, default=0.05,
+                        help="Segundos esperando pedidos simultâneos para o lote")
+    parser.add_argument("--max-batch", type=int, default=8, help="Tamanho máximo do lote")
+    args = parser.parse_args()
+
+    try:
+        authkey = configured_authkey()
+    except ValueError as e:
+        parser.error(str(e))
+    if authkey is None:
+        parser.error(f"defina {AUTHKEY_ENV} com uma chave aleatória, ex.: "
+                     f"export {AUTHKEY_ENV}=$(python -c \"import secrets; print(secrets.token_hex(32))\")")
+
+    TranscriptionService(args.model, parse_address(args.address), authkey,
+                         args.batch_window, args.max_batch).serve_forever()
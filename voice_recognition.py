@@ -1,9 +1,123 @@
-import sounddevice as sd
-import whisper
 import numpy as np
-from scipy.io.wavfile import write
 import os
-from datetime import datetime
+import threading
+import time
+from audio_store import shared_store
+from echo_cancel import BargeInDetector, EchoCanceller, PlaybackQueue, resample
+from metrics import tracer
+from startup import lazy_import
+
+# Módulos pesados importados só no primeiro uso (whisper carrega o torch)
+sd = lazy_import("sounddevice")
+whisper = lazy_import("whisper")
+wavfile = lazy_import("scipy.io.wavfile")
+
+
+class AudioRingBuffer:
+    """
+    Buffer circular de áudio mono float32 alimentado pelo callback do microfone.
+
+    As posições são absolutas (amostras desde o início do stream), então o
+    leitor pode pedir "as últimas N amostras antes de agora" e esperar pelas
+    próximas sem copiar nada além do trecho lido.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Número de amostras mantidas
+        """
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.total = 0  # Amostras escritas desde o início
+        self._cond = threading.Condition()
+
+    def write(self, samples):
+        """Acrescenta amostras (chamado pelo callback do sounddevice)"""
+        count = len(samples)
+        samples = samples[-self.capacity:]
+        n = len(samples)
+        start = (self.total + count - n) % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:n - first] = samples[first:]
+        with self._cond:
+            self.total += count
+            self._cond.notify_all()
+
+    def read(self, start, end):
+        """
+        Copia as amostras entre as posições absolutas [start, end).
+
+        Returns:
+            numpy.ndarray: Amostras (mais antigas que a capacidade viram zero)
+        """
+        out = np.zeros(end - start, dtype=np.float32)
+        begin = max(start, self.total - self.capacity, 0)
+        if begin >= end:
+            return out
+
+        index = begin % self.capacity
+        count = end - begin
+        first = min(count, self.capacity - index)
+        offset = begin - start
+        out[offset:offset + first] = self.data[index:index + first]
+        out[offset + first:offset + count] = self.data[:count - first]
+        return out
+
+    def wait_until(self, position, timeout=None):
+        """Bloqueia até que `position` amostras tenham sido escritas"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.total >= position, timeout)
+
+
+# O Whisper trabalha em 16 kHz
+WHISPER_SAMPLE_RATE = 16000
+
+# Opções de decodificação do Whisper por perfil
+DECODING_PROFILES = {
+    # Padrão do whisper.transcribe (fallback de temperatura, condicionamento no texto anterior)
+    "default": {},
+    # Comandos curtos: gulosa, uma única temperatura (sem fallback), sem timestamps
+    "command": {
+        "beam_size": None,
+        "best_of": None,
+        "temperature": 0.0,
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+    },
+}
+
+
+def trim_silence(audio, sample_rate, threshold=0.01, frame_ms=20, margin=0.25):
+    """
+    Remove o silêncio do início e do fim do áudio.
+
+    Args:
+        audio (numpy.ndarray): Áudio mono float32
+        sample_rate (int): Taxa de amostragem
+        threshold (float): RMS mínimo de uma janela para contar como voz
+        frame_ms (int): Tamanho da janela de análise
+        margin (float): Segundos mantidos antes e depois da voz
+
+    Returns:
+        numpy.ndarray: Trecho com voz (vazio se só houver silêncio)
+    """
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    count = len(audio) // frame
+    if count == 0:
+        return audio
+
+    rms = np.sqrt(np.mean(audio[:count * frame].reshape(count, frame) ** 2, axis=1))
+    voiced = np.flatnonzero(rms > threshold)
+    if len(voiced) == 0:
+        return audio[:0]
+
+    pad = int(margin * sample_rate)
+    start = max(0, voiced[0] * frame - pad)
+    end = min(len(audio), (voiced[-1] + 1) * frame + pad)
+    return audio[start:end]
 
 
 class VoiceRecorder:
@@ -11,7 +125,12 @@ class VoiceRecorder:
     Classe responsável pela gravação de áudio e transcrição usando Whisper.
     """
 
-    def __init__(self, sample_rate=16000, model_size="base"):
+    # Modelos Whisper já carregados, compartilhados entre instâncias (ex.: vários streams)
+    _shared_models = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, sample_rate=16000, model_size="base", use_service=False, service_address=None,
+                 decoding="default", audio_store=None):
         """
         Inicializa o gravador de voz.
 
@@ -21,31 +140,211 @@ class VoiceRecorder:
                              - tiny: mais rápido, menos preciso
                              - base: equilíbrio entre velocidade e precisão
                              - small: melhor precisão, mais lento
+            use_service (bool): Transcrever no serviço Whisper em processo separado
+                (transcription_service.py), iniciando-o se necessário
+            service_address (tuple): (host, porta) do serviço (None usa o padrão)
+            decoding (str): Perfil de DECODING_PROFILES; "command" também remove
+                o silêncio antes de decodificar (ver `set_vocabulary`)
+            audio_store (AudioStore): Onde os áudios gravados são guardados, com
+                cota de disco (None usa o compartilhado do diretório configurado
+                no ambiente, ver `audio_store.shared_store`)
         """
         self.sample_rate = sample_rate
         self.model_size = model_size
         self.model = None
+        self.use_service = use_service
+        self.service_address = service_address
+        self.transcription_client = None
+
+        # Decodificação
+        self.decoding = decoding
+        self.decode_options = dict(DECODING_PROFILES[decoding])
+        self.trim_silence = decoding == "command"
+        self.initial_prompt = None
+        self.last_rtf = None
+
+        # Captura contínua com pré-gravação (pre-roll)
+        self.stream = None
+        self.ring_buffer = None
+        self.preroll = 0.0
+        self.playback = None        # Fila do alto-falante (modo com cancelamento de eco)
+        self.echo_canceller = None
         self.is_recording = False
         self.audio_data = None
 
-        # Criar diretório temp se não existir
-        if not os.path.exists("temp"):
-            os.makedirs("temp")
+        # Áudios salvos ficam em um diretório com cota de tamanho/idade
+        self.audio_store = audio_store if audio_store is not None else shared_store()
 
     def load_model(self):
         """
         Carrega o modelo Whisper. Esta operação pode demorar alguns segundos
         na primeira execução, pois faz o download do modelo.
+
+        Com `use_service`, o modelo é carregado no processo do serviço de
+        transcrição e aqui apenas se abre a conexão.
         """
+        if self.use_service:
+            if self.transcription_client is None:
+                import transcription_service
+                address = self.service_address or transcription_service.DEFAULT_ADDRESS
+                self.transcription_client = transcription_service.connect(self.model_size, address)
+                # O modelo veio no handshake da conexão
+                print(f"Serviço de transcrição pronto (modelo '{self.transcription_client.model}')")
+            return
+
         if self.model is None:
-            print(f"Carregando modelo Whisper '{self.model_size}'...")
-            self.model = whisper.load_model(self.model_size)
-            print("Modelo carregado com sucesso!")
+            with VoiceRecorder._models_lock:
+                model = VoiceRecorder._shared_models.get(self.model_size)
+                if model is None:
+                    print(f"Carregando modelo Whisper '{self.model_size}'...")
+                    model = whisper.load_model(self.model_size)
+                    VoiceRecorder._shared_models[self.model_size] = model
+                    print("Modelo carregado com sucesso!")
+            self.model = model
+
+    def set_vocabulary(self, phrases, max_chars=400):
+        """
+        Enviesa o Whisper para o vocabulário dos comandos (initial_prompt).
+
+        Args:
+            phrases (list): Palavras-chave dos comandos (ex.: CommandExecutor.get_available_commands())
+            max_chars (int): Tamanho máximo do prompt (o Whisper aceita ~224 tokens)
+        """
+        # Frases cujas palavras já apareceram (ex.: "abrir chrome") não acrescentam nada
+        included = []
+        words = set()
+        for phrase in phrases:
+            phrase = phrase.strip().lower()
+            if not phrase or set(phrase.split()) <= words:
+                continue
+            if len("Comandos: ") + len(", ".join(included + [phrase])) > max_chars:
+                break
+            included.append(phrase)
+            words.update(phrase.split())
+        self.initial_prompt = "Comandos: " + ", ".join(included) if included else None
+
+    def start_stream(self, preroll=1.0, max_duration=10, device=None,
+                     echo_cancel=False, on_barge_in=None):
+        """
+        Mantém o microfone sempre aberto, guardando os últimos segundos de
+        áudio em um buffer circular.
+
+        Com o stream ativo, `record_audio` começa `preroll` segundos antes do
+        pedido, então não há risco de cortar a primeira palavra e a contagem
+        regressiva antes de gravar deixa de ser necessária.
+
+        Args:
+            preroll (float): Segundos de áudio anteriores ao pedido incluídos na gravação
+            max_duration (float): Maior gravação esperada (dimensiona o buffer)
+            device (int): ID do dispositivo de áudio (None usa o padrão do sistema)
+            echo_cancel (bool): Abrir um stream duplex: o áudio tocado com `play`
+                sai pelo mesmo stream e é subtraído do microfone (NLMS)
+            on_barge_in (callable): Chamado (em outra thread) quando o usuário
+                fala por cima do que está tocando; a reprodução é interrompida
+        """
+        if self.stream is not None:
+            return
+
+        # Folga de alguns segundos para o leitor nunca alcançar o escritor
+        capacity = int((preroll + max_duration + 5) * self.sample_rate)
+        self.ring_buffer = AudioRingBuffer(capacity)
+        self.preroll = preroll
+
+        if echo_cancel:
+            self.stream = self._open_duplex_stream(device, on_barge_in)
+        else:
+            def callback(indata, frames, time_info, status):
+                self.ring_buffer.write(indata[:, 0])
+
+            self.stream = sd.InputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype='float32',
+                device=device,
+                callback=callback
+            )
+        self.stream.start()
+        print(f"[MICROFONE] Captura contínua ativa (pre-roll de {preroll:.1f}s"
+              f"{', cancelamento de eco' if echo_cancel else ''})")
+
+    def _open_duplex_stream(self, device, on_barge_in):
+        """Stream entrada+saída: o bloco tocado é a referência do cancelamento de eco"""
+        self.playback = PlaybackQueue()
+        self.echo_canceller = EchoCanceller()
+        detector = BargeInDetector()
+
+        def callback(indata, outdata, frames, time_info, status):
+            reference = self.playback.read(frames)
+            outdata[:, 0] = reference
+            residual, _ = self.echo_canceller.process(indata[:, 0], reference,
+                                                      adapt=not detector.talking)
+            self.ring_buffer.write(residual)
+
+            if not self.playback.active:
+                # Cada fala recomeça a medir o eco: um turno alto não pesa no próximo
+                detector.reset()
+            elif detector.update(residual):
+                detector.reset()
+                self.playback.stop()
+                if on_barge_in is not None:
+                    # Nunca bloquear o callback de áudio
+                    threading.Thread(target=on_barge_in, daemon=True).start()
+
+        return sd.Stream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype='float32',
+            device=device,
+            callback=callback
+        )
+
+    def play(self, samples, sample_rate, wait=True):
+        """
+        Toca áudio mono. Com cancelamento de eco ativo, toca pelo stream
+        duplex (o eco é removido da gravação e a fala pode ser interrompida).
+
+        Args:
+            samples (numpy.ndarray): Áudio a tocar
+            sample_rate (int): Taxa de amostragem de `samples`
+            wait (bool): Bloquear até terminar
+
+        Returns:
+            bool: True se tocou até o fim, False se foi interrompido
+        """
+        if self.playback is None:
+            sd.play(samples, sample_rate)
+            if wait:
+                sd.wait()
+            return True
+
+        self.playback.play(resample(samples, sample_rate, self.sample_rate))
+        return self.playback.wait() if wait else True
+
+    def play_file(self, filename, wait=True):
+        """Toca um arquivo WAV/FLAC/Opus (ver `play`)"""
+        data, sample_rate = self.audio_store.load(filename)
+        return self.play(data, sample_rate, wait=wait)
+
+    def stop_playback(self):
+        """Interrompe o que estiver tocando pelo stream duplex"""
+        if self.playback is not None:
+            self.playback.stop()
+
+    def stop_stream(self):
+        """Fecha o stream contínuo do microfone"""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+            self.playback = None
 
     def record_audio(self, duration=5, device=None):
         """
         Grava áudio do microfone por uma duração específica.
 
+        Se o stream contínuo estiver ativo (`start_stream`), a gravação sai do
+        buffer circular e inclui o pre-roll; senão abre o microfone agora.
+
         Args:
             duration (int): Duração da gravação em segundos (padrão: 5)
             device (int): ID do dispositivo de áudio (None usa o padrão do sistema)
@@ -57,15 +356,23 @@ class VoiceRecorder:
         self.is_recording = True
 
         try:
+            if self.stream is not None:
+                with tracer.span("record_audio"):
+                    self.audio_data = self._record_from_buffer(duration)
+                self.is_recording = False
+                print("Gravação concluída!")
+                return self.audio_data
+
             # Gravar áudio
-            self.audio_data = sd.rec(
-                int(duration * self.sample_rate),
-                samplerate=self.sample_rate,
-                channels=1,  # Mono
-                dtype='float32',
-                device=device
-            )
-            sd.wait()  # Aguardar conclusão da gravação
+            with tracer.span("record_audio"):
+                self.audio_data = sd.rec(
+                    int(duration * self.sample_rate),
+                    samplerate=self.sample_rate,
+                    channels=1,  # Mono
+                    dtype='float32',
+                    device=device
+                )
+                sd.wait()  # Aguardar conclusão da gravação
             self.is_recording = False
             print("Gravação concluída!")
             return self.audio_data
@@ -75,13 +382,23 @@ class VoiceRecorder:
             print(f"Erro ao gravar áudio: {e}")
             return None
 
+    def _record_from_buffer(self, duration):
+        """Recorta do buffer circular o pre-roll + `duration` segundos a partir de agora"""
+        ring = self.ring_buffer
+        start = max(0, ring.total - int(self.preroll * self.sample_rate))
+        end = ring.total + int(duration * self.sample_rate)
+        if not ring.wait_until(end, timeout=duration + 2.0):
+            raise RuntimeError("Stream do microfone parou de entregar áudio")
+        return ring.read(start, end).reshape(-1, 1)
+
     def save_audio(self, audio_data=None, filename=None):
         """
         Salva os dados de áudio em um arquivo WAV.
 
         Args:
             audio_data (numpy.ndarray): Dados de áudio (usa self.audio_data se None)
-            filename (str): Nome do arquivo (gera automaticamente se None)
+            filename (str): Nome do arquivo WAV (None grava no audio_store,
+                que aplica a cota de disco)
 
         Returns:
             str: Caminho do arquivo salvo
@@ -93,17 +410,15 @@ class VoiceRecorder:
             print("Nenhum áudio para salvar!")
             return None
 
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"temp/comando_{timestamp}.wav"
-
-        # Garantir caminho absoluto
-        if not os.path.isabs(filename):
-            filename = os.path.abspath(filename)
-
-        # Normalizar e converter para int16
-        audio_normalized = np.int16(audio_data * 32767)
-        write(filename, self.sample_rate, audio_normalized)
+        with tracer.span("save_audio"):
+            if filename is None:
+                filename = self.audio_store.save(audio_data, self.sample_rate)
+            else:
+                # Garantir caminho absoluto
+                filename = os.path.abspath(filename)
+                # Normalizar e converter para int16
+                audio_normalized = np.int16(audio_data * 32767)
+                wavfile.write(filename, self.sample_rate, audio_normalized)
         print(f"Áudio salvo em: {filename}")
         return filename
 
@@ -112,7 +427,8 @@ class VoiceRecorder:
         Transcreve um arquivo de áudio usando Whisper.
 
         Args:
-            audio_file (str): Caminho do arquivo de áudio (usa o último gravado se None)
+            audio_file (str or numpy.ndarray): Caminho do arquivo de áudio ou
+                áudio float32 na taxa do gravador
             language (str): Idioma do áudio (padrão: "pt" para português)
 
         Returns:
@@ -120,29 +436,73 @@ class VoiceRecorder:
                 - text: texto transcrito
                 - segments: segmentos detalhados
                 - language: idioma detectado
+                - rtf: tempo de transcrição / duração do áudio
         """
-        # Carregar modelo se ainda não foi carregado
-        if self.model is None:
+        # Carregar modelo (ou conectar ao serviço) se ainda não foi feito
+        if self.model is None and self.transcription_client is None:
             self.load_model()
 
         if audio_file is None:
             print("Erro: Nenhum arquivo de áudio especificado!")
             return None
 
-        if not os.path.exists(audio_file):
+        if isinstance(audio_file, str) and not os.path.exists(audio_file):
             print(f"Erro: Arquivo '{audio_file}' não encontrado!")
             return None
 
         print(f"Transcrevendo áudio...")
         try:
-            result = self.model.transcribe(audio_file, language=language)
-            print(f"Transcrição concluída: \"{result['text']}\"")
+            start = time.perf_counter()
+            audio = self._load_audio(audio_file)
+            duration = len(audio) / WHISPER_SAMPLE_RATE
+            if self.trim_silence:
+                audio = trim_silence(audio, WHISPER_SAMPLE_RATE)
+
+            options = dict(self.decode_options)
+            if self.initial_prompt:
+                options["initial_prompt"] = self.initial_prompt
+
+            if len(audio) == 0:
+                result = {"text": "", "segments": [], "language": language}
+            elif self.transcription_client is not None:
+                result = self.transcription_client.transcribe(audio, language=language,
+                                                              options=options)
+            else:
+                result = self.model.transcribe(audio, language=language, **options)
+
+            elapsed = time.perf_counter() - start
+            self.last_rtf = elapsed / duration if duration > 0 else 0.0
+            result["rtf"] = self.last_rtf
+            tracer.record("transcribe_audio", elapsed, rtf=round(self.last_rtf, 3),
+                          audio_seconds=round(duration, 2),
+                          speech_seconds=round(len(audio) / WHISPER_SAMPLE_RATE, 2),
+                          decoding=self.decoding)
+
+            print(f"Transcrição concluída: \"{result['text']}\" "
+                  f"(RTF {self.last_rtf:.2f}, {duration:.1f}s de áudio)")
             return result
 
         except Exception as e:
             print(f"Erro ao transcrever áudio: {e}")
             return None
 
+    def _load_audio(self, audio):
+        """
+        Áudio mono float32 a 16 kHz (o que o Whisper espera): arrays na taxa do
+        gravador são reamostrados, arquivos do gravador são lidos sem ffmpeg.
+        """
+        if not isinstance(audio, str):
+            return resample(audio, self.sample_rate, WHISPER_SAMPLE_RATE)
+
+        try:
+            data, sample_rate = self.audio_store.load(audio)
+            if sample_rate == self.sample_rate == WHISPER_SAMPLE_RATE:
+                return data
+        except Exception:
+            pass  # Formato que só o ffmpeg lê
+
+        return whisper.load_audio(audio)
+
     def record_and_transcribe(self, duration=5, save_file=True, language="pt"):
         """
         Método conveniente que grava áudio e transcreve em uma única operação.
@@ -165,15 +525,15 @@ class VoiceRecorder:
         if audio_file is None:
             return None, None
 
-        # Transcrever
-        result = self.transcribe_audio(audio_file, language)
+        # Transcrever direto da memória (o arquivo fica só como registro)
+        result = self.transcribe_audio(audio_data, language)
         if result is None:
             return None, audio_file
 
         # Deletar arquivo temporário se não for necessário mantê-lo
         if not save_file:
             try:
-                os.remove(audio_file)
+                self.audio_store.remove(audio_file)
                 print(f"Arquivo temporário removido: {audio_file}")
             except Exception as e:
                 print(f"Erro ao remover arquivo: {e}")